@@ -1,8 +1,14 @@
 from PIL import Image
 import time
-a=Image.open("istockphoto-455302535-612x612.jpg")
-a.show()
-a.close()
+
+
+def show_background():
+	# open the background picture only when the game is run, not on import
+	a=Image.open("istockphoto-455302535-612x612.jpg")
+	a.show()
+	a.close()
+
+
 class GamePlayer:
 	"""
 	Encapsulates a player properties
@@ -232,4 +238,6 @@ def sample_run():
 	game.play()
 
 
-sample_run()
+if __name__ == "__main__":
+	show_background()
+	sample_run()
@@ -101,8 +101,55 @@ class BoardDrawer:
         self.pen.goto((start_x + end_x) / 2, (start_y + end_y) / 2 + SQUARE_SIZE // 5)
         self.pen.write(str(start) + "->" + str(end), align="center")
 
+    def square_origin(self, number):
+        """
+        Get the bottom-left corner of a square, numbered the same way as draw_arrow.
+
+        Parameters:
+        - number (int): The square number.
+
+        Returns:
+        - tuple: The (x, y) coordinates of the bottom-left corner.
+        """
+        x = START_POS[0] + ((number - 1) % self.size) * SQUARE_SIZE
+        y = START_POS[1] + ((number - 1) // self.size) * SQUARE_SIZE
+        return x, y
+
+    def draw_heatmap(self, values, max_value=None):
+        """
+        Draw the board with every square coloured by a per-square value.
+
+        Parameters:
+        - values (sequence): Values indexed by square number, e.g. an array of
+          OccupancyMap; index 0 is ignored.
+        - max_value (float, optional): Value drawn with the full colour.
+          Defaults to the largest value on the board.
+        """
+        squares = range(1, self.size * self.size + 1)
+        if max_value is None:
+            max_value = max(values[number] for number in squares)
+        for number in squares:
+            level = values[number] / max_value if max_value else 0
+            level = min(max(level, 0), 1)
+            # white for unvisited squares through to red for the busiest
+            fade = int(255 * (1 - level))
+            self.pen.color(f"#ff{fade:02x}{fade:02x}")
+            x, y = self.square_origin(number)
+            self.draw_square(x, y, SQUARE_SIZE, number)
+        self.draw_snakes_and_ladders()
+
 
 if __name__ == "__main__":
+    import sys
+
     board_drawer = BoardDrawer(BOARD_SIZE)
-    board_drawer.draw_board()
+    if "--heatmap" in sys.argv:
+        # colour squares by how often a token sits on them
+        from compiled_board import CompiledBoard
+        from occupancy import OccupancyMap
+
+        compiled = CompiledBoard.from_layout(BOARD_SIZE * BOARD_SIZE, SNAKES, LADDERS)
+        board_drawer.draw_heatmap(OccupancyMap.exact(compiled).visits)
+    else:
+        board_drawer.draw_board()
     turtle.done()
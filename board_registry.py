@@ -0,0 +1,123 @@
+"""
+Versioned, immutable boards that can be swapped under a running host.
+
+A BoardRegistry hands out the current CompiledBoard to new games. Publishing
+a new layout freezes a private copy of its arrays, stamps it with the next
+version number and makes it current with a single reference assignment, so
+the swap takes microseconds and games already running keep the version they
+started on. Rolls never go through the registry: a game looks squares up in
+the board it holds, so the per-roll path has no lock and no indirection.
+
+The registry only keeps a strong reference to the current version. Older
+versions stay alive exactly as long as some game holds them and are
+reclaimed by the garbage collector when the last of those games ends.
+
+Classes:
+- BoardRegistry: The current board version and every version still in use.
+"""
+
+import threading
+import weakref
+
+import numpy as np
+
+from compiled_board import CompiledBoard
+
+
+def _frozen(compiled):
+    """Copy a compiled board into read-only arrays nobody else can write."""
+    arrays = []
+    for values in (compiled.dest, compiled.kind, compiled.branch_dest,
+                   compiled.branch_cdf):
+        values = np.array(values)
+        values.flags.writeable = False
+        arrays.append(values)
+    dest, kind, branch_dest, branch_cdf = arrays
+    return CompiledBoard(compiled.size, compiled.dice_sides, dest, kind,
+                         compiled.start, branch_dest, branch_cdf)
+
+
+def _reclaimed(registry_ref, version):
+    """Tell a registry, if it still exists, that a version was collected."""
+    registry = registry_ref()
+    if registry is not None and registry.on_reclaim is not None:
+        registry.on_reclaim(version)
+
+
+class BoardRegistry:
+    """
+    Current board version for new games, and the versions still in use.
+
+    Every published board gets a version attribute with its version number.
+    """
+
+    def __init__(self, compiled=None):
+        """
+        Initialize a BoardRegistry object.
+
+        Parameters:
+        - compiled (CompiledBoard, optional): The first version.
+        """
+        self._current = None
+        self._versions = weakref.WeakValueDictionary()
+        self._last_version = 0
+        # serializes publishers only, readers never take it
+        self._publish_lock = threading.Lock()
+        self.on_reclaim = None
+        if compiled is not None:
+            self.publish(compiled)
+
+    def publish(self, board, dice_sides=6):
+        """
+        Make a new layout the version every new game is played on.
+
+        Parameters:
+        - board (CompiledBoard or Board): The new layout.
+        - dice_sides (int, optional): Dice sides, when board is a Board.
+
+        Returns:
+        - CompiledBoard: The frozen new version.
+        """
+        if not isinstance(board, CompiledBoard):
+            board = CompiledBoard.from_board(board, dice_sides)
+        compiled = _frozen(board)
+        with self._publish_lock:
+            self._last_version += 1
+            compiled.version = self._last_version
+            self._versions[compiled.version] = compiled
+            # the callback must not hold the registry, or the finalize
+            # registry would keep it and its current board alive
+            weakref.finalize(compiled, _reclaimed, weakref.ref(self), compiled.version)
+            # the swap: games created from here on get the new version
+            self._current = compiled
+        return compiled
+
+    def current(self):
+        """
+        Get the board new games are played on.
+
+        Returns:
+        - CompiledBoard: The current version.
+        """
+        return self._current
+
+    def get(self, version):
+        """
+        Get a version that is still in use.
+
+        Parameters:
+        - version (int): The version number.
+
+        Returns:
+        - CompiledBoard or None: The board, None once it was reclaimed.
+        """
+        return self._versions.get(version)
+
+    def live_versions(self):
+        """
+        Get the versions still held by the registry or a game.
+
+        Returns:
+        - list: Sorted version numbers.
+        """
+        return sorted(self._versions.keys())
@@ -0,0 +1,280 @@
+"""
+"Choose your die" variant with an optimal policy table.
+
+In this variant a player rolls two dice and moves by the one they choose.
+The turn rules of Game.change_turn apply to the chosen die: choosing a six
+earns another roll, and the third six in a row passes the turn. Unlike
+Game, the six counter starts again at zero for every turn, including when
+the player before finished on a six.
+
+ChooseDiePolicy solves the variant by value iteration over the compiled
+board, minimising the expected number of turns a player needs to finish.
+Every sweep of the value iteration is a handful of vectorized NumPy
+operations over all squares, so a 100 square board solves in milliseconds;
+the number of sweeps grows with the expected length of a game, so large
+boards take longer but never loop over squares in Python. The policy is
+stored as one byte per (six count, square, unordered roll pair) saying
+whether to move by the smaller or the larger die, so a bot move is a single
+table lookup.
+
+Classes:
+- ChooseDiePolicy: Optimal choice for every position and roll pair.
+- ChooseDieGame: Headless game of the variant played by strategies.
+
+Functions:
+- greedy: Strategy that always moves by the larger die.
+"""
+
+import random
+
+import numpy as np
+
+from compiled_board import CompiledBoard
+from headless import HeadlessGame
+
+SIX = 6
+MAX_SIXES = 3
+
+
+def greedy(game, pos, small, large):
+    """Move by the larger die."""
+    return large
+
+
+class ChooseDiePolicy:
+    """
+    Optimal die choice for every six count, square and roll pair.
+
+    Attributes:
+    - compiled: The CompiledBoard the policy was solved for.
+    - values: Expected further turns to finish, shape (MAX_SIXES, size + 1),
+      indexed by sixes already rolled this turn and square.
+    - table: 1 to move by the larger die, shape (MAX_SIXES, size + 1, pairs).
+    - iterations: The number of value-iteration sweeps used.
+    """
+
+    def __init__(self, compiled, values, table, iterations=0):
+        """
+        Initialize a ChooseDiePolicy object from solved arrays; see solve.
+        """
+        self.compiled = compiled
+        self.values = values
+        self.table = table
+        self.iterations = iterations
+        sides = compiled.dice_sides
+        # unordered pair (small, large) -> column of the table
+        self._pair_index = [[0] * (sides + 1) for _ in range(sides + 1)]
+        column = 0
+        for small in range(1, sides + 1):
+            for large in range(small, sides + 1):
+                self._pair_index[small][large] = column
+                column += 1
+        self._pairs = column
+        self._flat = table.tobytes()
+
+    @classmethod
+    def solve(cls, compiled, tol=1e-9, max_iter=1000000):
+        """
+        Compute the optimal policy by value iteration.
+
+        Parameters:
+        - compiled (CompiledBoard): The board to solve.
+        - tol (float, optional): Stop when no value changes by more than this.
+        - max_iter (int, optional): Maximum number of sweeps.
+
+        Returns:
+        - ChooseDiePolicy: The solved policy.
+        """
+        size, sides = compiled.size, compiled.dice_sides
+        squares = np.arange(size + 1)
+        pmf = np.diff(compiled.branch_cdf, axis=1, prepend=0.0)
+        # where each die value can take a token from every square
+        dest, prob = [], []
+        for die in range(1, sides + 1):
+            landing = squares + die
+            blocked = landing > size
+            landing[blocked] = 0
+            die_dest = compiled.branch_dest[landing].copy()
+            die_prob = pmf[landing].copy()
+            die_dest[blocked] = squares[blocked, None]
+            die_prob[blocked] = 0.0
+            die_prob[blocked, 0] = 1.0
+            dest.append(die_dest)
+            prob.append(die_prob)
+        not_done = [(p * (d != size)).sum(axis=1) for d, p in zip(dest, prob)]
+
+        pairs = [(small, large) for small in range(1, sides + 1)
+                 for large in range(small, sides + 1)]
+        weights = [(1.0 if small == large else 2.0) / sides ** 2
+                   for small, large in pairs]
+        values = np.zeros((MAX_SIXES, size + 1))
+
+        def choices(values):
+            """Expected further turns after moving by each die, per six count."""
+            q = np.empty((MAX_SIXES, sides, size + 1))
+            passed = [not_done[die] + (prob[die] * values[0][dest[die]]).sum(axis=1)
+                      for die in range(sides)]
+            for sixes in range(MAX_SIXES):
+                for die in range(sides):
+                    if die + 1 == SIX and sixes + 1 < MAX_SIXES:
+                        q[sixes, die] = (prob[die] * values[sixes + 1][dest[die]]).sum(axis=1)
+                    else:
+                        q[sixes, die] = passed[die]
+            return q
+
+        iterations = 0
+        for iterations in range(1, max_iter + 1):
+            q = choices(values)
+            new_values = np.zeros_like(values)
+            for (small, large), weight in zip(pairs, weights):
+                new_values += weight * np.minimum(q[:, small - 1], q[:, large - 1])
+            new_values[:, size] = 0.0
+            change = np.abs(new_values - values).max()
+            values = new_values
+            if change < tol:
+                break
+
+        q = choices(values)
+        table = np.empty((MAX_SIXES, size + 1, len(pairs)), dtype=np.uint8)
+        for column, (small, large) in enumerate(pairs):
+            table[:, :, column] = q[:, large - 1] < q[:, small - 1]
+        return cls(compiled, values, table, iterations)
+
+    def choose(self, pos, first, second, sixes=0):
+        """
+        Get the die to move by.
+
+        Parameters:
+        - pos (int): The player's position.
+        - first (int): One die.
+        - second (int): The other die.
+        - sixes (int, optional): Sixes already chosen this turn.
+
+        Returns:
+        - int: The die value to move by.
+        """
+        small, large = (first, second) if first <= second else (second, first)
+        ix = ((sixes * (self.compiled.size + 1) + pos) * self._pairs
+              + self._pair_index[small][large])
+        return large if self._flat[ix] else small
+
+    def expected_turns(self, pos=None):
+        """
+        Get the expected number of turns to finish when playing the policy.
+
+        Parameters:
+        - pos (int, optional): Position at the start of a turn, the start
+          square by default.
+
+        Returns:
+        - float: The expected number of turns, including the current one.
+        """
+        pos = self.compiled.start if pos is None else pos
+        return 1.0 + float(self.values[0, pos]) if pos != self.compiled.size else 0.0
+
+    def save(self, path):
+        """
+        Save the policy table and values to an .npz file.
+
+        Parameters:
+        - path (str): The file to write.
+        """
+        np.savez_compressed(path, table=self.table, values=self.values,
+                            fingerprint=np.uint64(self.compiled.fingerprint()))
+
+    @classmethod
+    def load(cls, path, compiled):
+        """
+        Load a policy saved by save.
+
+        Parameters:
+        - path (str): The file to read.
+        - compiled (CompiledBoard): The board the policy was solved for.
+
+        Returns:
+        - ChooseDiePolicy: The loaded policy.
+        """
+        with np.load(path) as data:
+            if int(data["fingerprint"]) != compiled.fingerprint():
+                raise ValueError("the policy was solved for a different board")
+            return cls(compiled, data["values"], data["table"])
+
+    def strategy(self, game, pos, small, large):
+        """Strategy for ChooseDieGame that plays this policy."""
+        return self.choose(pos, small, large, game.consecutive_six)
+
+
+class ChooseDieGame(HeadlessGame):
+    """
+    Headless game of the choose-your-die variant.
+
+    A strategy is a callable (game, pos, small, large) returning the die
+    to move by, such as ChooseDiePolicy.strategy or greedy.
+    """
+
+    def __init__(self, compiled, strategies, rng=None):
+        """
+        Initialize a ChooseDieGame object.
+
+        Parameters:
+        - compiled (CompiledBoard): The board to play on.
+        - strategies (list): The strategy of every seat.
+        - rng (random.Random, optional): Random source, a fresh one by default.
+        """
+        super(ChooseDieGame, self).__init__(compiled, len(strategies), rng)
+        self.strategies = strategies
+
+    def play_roll(self):
+        """
+        Roll two dice, let the current seat choose and play the chosen die.
+
+        Returns:
+        - tuple: (seat, chosen die, end_pos).
+        """
+        seat = self.current_seat()
+        sides = self.compiled.dice_sides
+        first = self.rng.randint(1, sides)
+        second = self.rng.randint(1, sides)
+        small, large = (first, second) if first <= second else (second, first)
+        chosen = self.strategies[seat](self, self.positions[seat], small, large)
+        passes = chosen != SIX or self.consecutive_six + 1 == MAX_SIXES
+        seat, _, pos = self.apply_roll(chosen)
+        # a player who finishes on a six keeps the turn in apply_roll, but
+        # the next player to roll is another seat
+        if passes or not self.can_play() or self.current_seat() != seat:
+            self.consecutive_six = 0
+        return seat, chosen, pos
+
+    def play(self, max_rolls=None):
+        """
+        Play the game until every player has a rank.
+
+        Parameters:
+        - max_rolls (int, optional): Stop after this many rolls.
+
+        Returns:
+        - list: Rank of every player, -1 for players who did not finish.
+        """
+        while self.can_play():
+            if max_rolls is not None and self.rolls >= max_rolls:
+                break
+            self.play_roll()
+        return self.ranks
+
+
+if __name__ == "__main__":
+    from updated_Code import BoardSetup
+
+    compiled = CompiledBoard.from_board(BoardSetup.setup(), 6)
+    policy = ChooseDiePolicy.solve(compiled)
+    print(f"solved in {policy.iterations} sweeps,"
+          f" {policy.expected_turns():.2f} expected turns to finish")
+    rng = random.Random(1)
+    wins = [0, 0]
+    for game_ix in range(10000):
+        # alternate seats so neither strategy always moves first
+        strategies = [policy.strategy, greedy] if game_ix % 2 == 0 else [greedy, policy.strategy]
+        ranks = ChooseDieGame(compiled, strategies, rng).play()
+        winner = ranks.index(1)
+        wins[(winner + game_ix) % 2] += 1
+    print(f"optimal policy beat greedy in {wins[0] / sum(wins):.1%} of games")
@@ -0,0 +1,242 @@
+"""
+Compiled, array-based representation of a Snake and Ladder board.
+
+The object-based Board keeps a {pos: moving_entity} map and resolves every
+landing through a Python method call. The analytic solver and the vectorized
+simulator need the same information as flat arrays, so this module compiles a
+Board once into a destination table and an entity-kind table indexed by square.
+
+Classes:
+- CompiledBoard: Read-only array form of a board together with its dice.
+"""
+
+import hashlib
+import random
+
+import numpy as np
+
+from updated_Code import START_POS, Board, Ladder, MovingEntity, Snake
+
+# entity kinds stored in CompiledBoard.kind
+PLAIN = 0
+SNAKE = 1
+LADDER = 2
+OTHER = 3
+
+KIND_NAMES = {PLAIN: "plain", SNAKE: "snake", LADDER: "ladder", OTHER: "other"}
+
+
+class CompiledBoard:
+    """
+    Array form of a board and the dice used on it.
+
+    Squares are indexed directly by their number, so arrays have size + 1
+    entries and index 0 is unused.
+
+    Entities with several possible destinations (Wormhole, ConditionalLadder)
+    are stored as a fixed-width branch table: row s of branch_dest lists the
+    squares a token landing on s can end on and the same row of branch_cdf
+    holds their cumulative probabilities. Unused branches repeat the last
+    destination with a cumulative probability of 1, so a uniform draw u picks
+    branch (u >= branch_cdf[s]).sum() on every square alike.
+
+    Attributes:
+    - size: The size of the board, i.e. the winning square.
+    - dice_sides: The number of sides in the dice.
+    - dest: Square a token ends on after landing on each square. For squares
+      with several destinations this is the first of them.
+    - kind: Entity kind on each square (PLAIN, SNAKE, LADDER or OTHER).
+    - start: The square every token starts on.
+    - branch_dest: Possible destinations per square, shape (size + 1, k).
+    - branch_cdf: Cumulative branch probabilities, shape (size + 1, k).
+    - deterministic: True if every square has a single destination.
+    """
+
+    def __init__(self, size, dice_sides, dest, kind, start=START_POS,
+                 branch_dest=None, branch_cdf=None):
+        """
+        Initialize a CompiledBoard object.
+
+        Parameters:
+        - size (int): The size of the board.
+        - dice_sides (int): The number of sides in the dice.
+        - dest (array-like): Destination of each square, length size + 1.
+        - kind (array-like): Entity kind of each square, length size + 1.
+        - start (int, optional): The starting square of every token.
+        - branch_dest (array-like, optional): Branch destinations per square.
+        - branch_cdf (array-like, optional): Cumulative branch probabilities.
+        """
+        self.size = size
+        self.dice_sides = dice_sides
+        self.dest = np.asarray(dest, dtype=np.int64)
+        self.kind = np.asarray(kind, dtype=np.int8)
+        self.start = start
+        if self.dest.shape != (size + 1,) or self.kind.shape != (size + 1,):
+            raise ValueError("dest and kind must have size + 1 entries")
+        if branch_dest is None:
+            branch_dest = self.dest[:, None]
+            branch_cdf = np.ones((size + 1, 1))
+        self.branch_dest = np.asarray(branch_dest, dtype=np.int64)
+        self.branch_cdf = np.asarray(branch_cdf, dtype=np.float64)
+        if self.branch_dest.shape != self.branch_cdf.shape:
+            raise ValueError("branch_dest and branch_cdf must have the same shape")
+        self.deterministic = self.branch_dest.shape[1] == 1
+
+    @classmethod
+    def from_board(cls, board: Board, dice_sides):
+        """
+        Compile an object-based Board.
+
+        Parameters:
+        - board (Board): The board to compile.
+        - dice_sides (int): The number of sides in the dice.
+
+        Returns:
+        - CompiledBoard: The compiled board.
+        """
+        size = board.get_size()
+        kind = np.zeros(size + 1, dtype=np.int8)
+        branches = {}
+        for pos, entity in board.board.items():
+            if not 1 <= pos <= size:
+                continue
+            branches[pos] = cls._entity_branches(pos, entity)
+            kind[pos] = cls.entity_kind(pos, entity)
+        width = max([len(b) for b in branches.values()], default=1)
+        branch_dest = np.repeat(np.arange(size + 1, dtype=np.int64)[:, None],
+                                width, axis=1)
+        branch_cdf = np.ones((size + 1, width))
+        for pos, square_branches in branches.items():
+            cumulative = 0.0
+            for ix, (end_pos, probability) in enumerate(square_branches):
+                cumulative += probability
+                branch_dest[pos, ix:] = end_pos
+                branch_cdf[pos, ix] = cumulative
+            branch_cdf[pos, len(square_branches) - 1:] = 1.0
+        return cls(size, dice_sides, branch_dest[:, 0], kind,
+                   branch_dest=branch_dest, branch_cdf=branch_cdf)
+
+    @classmethod
+    def from_layout(cls, size, snakes, ladders, dice_sides=6):
+        """
+        Compile a board from {start: end} maps of snakes and ladders.
+
+        Parameters:
+        - size (int): The size of the board.
+        - snakes (dict): Map of snake head to snake tail.
+        - ladders (dict): Map of ladder foot to ladder top.
+        - dice_sides (int, optional): The number of sides in the dice.
+
+        Returns:
+        - CompiledBoard: The compiled board.
+        """
+        board = Board(size)
+        for start, end in snakes.items():
+            board.set_moving_entity(start, Snake(end))
+        for start, end in ladders.items():
+            board.set_moving_entity(start, Ladder(end))
+        return cls.from_board(board, dice_sides)
+
+    @staticmethod
+    def _entity_branches(pos, entity):
+        """Get the (end position, probability) branches of a moving entity."""
+        if not hasattr(entity, "get_destinations"):
+            # entities from the other game scripts only have get_end_pos
+            return [(entity.get_end_pos(), 1.0)]
+        branches = [(pos if end_pos is None else end_pos, probability)
+                    for end_pos, probability in entity.get_destinations()
+                    if probability > 0]
+        if not branches:
+            raise ValueError(f"entity at {pos} has no reachable destination")
+        return branches
+
+    @staticmethod
+    def entity_kind(pos, entity):
+        """Classify a moving entity, falling back to its direction of travel."""
+        if isinstance(entity, Snake):
+            return SNAKE
+        if isinstance(entity, Ladder):
+            return LADDER
+        if isinstance(entity, MovingEntity):
+            return OTHER
+        # Snake/Ladder from the other game scripts are different classes,
+        # so classify them by where they send the player
+        end_pos = entity.get_end_pos()
+        if end_pos < pos:
+            return SNAKE
+        if end_pos > pos:
+            return LADDER
+        return OTHER
+
+    def fingerprint(self):
+        """
+        Get a 64-bit fingerprint of the board, its dice and its start square.
+
+        The fingerprint covers the size, dice, start square and the branch
+        tables, so the same board compiled again, sent to a worker by sharding
+        or attached from shared memory keeps its fingerprint. Entity kinds are not part of
+        it, and boards that play identically but list their branches in
+        another order or padded to another width fingerprint differently.
+
+        Returns:
+        - int: The fingerprint.
+        """
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(np.array([self.size, self.dice_sides, self.start],
+                               dtype="<i8").tobytes())
+        digest.update(np.ascontiguousarray(self.branch_dest, dtype="<i8").tobytes())
+        digest.update(np.ascontiguousarray(self.branch_cdf, dtype="<f8").tobytes())
+        return int.from_bytes(digest.digest(), "little")
+
+    def entity_squares(self):
+        """
+        Get the squares holding a moving entity.
+
+        Returns:
+        - numpy.ndarray: Sorted square numbers with a non-plain kind.
+        """
+        return np.flatnonzero(self.kind != PLAIN)
+
+    def destinations(self, square):
+        """
+        Get the squares a token landing on square can end on.
+
+        Parameters:
+        - square (int): The landing square.
+
+        Returns:
+        - list: (end square, probability) pairs.
+        """
+        cdf = self.branch_cdf[square]
+        previous = 0.0
+        result = []
+        for end_pos, cumulative in zip(self.branch_dest[square], cdf):
+            if cumulative > previous:
+                result.append((int(end_pos), float(cumulative - previous)))
+            previous = cumulative
+        return result
+
+    def next_pos(self, pos, roll, u=None):
+        """
+        Get the position after rolling from pos, following Game rules.
+
+        A roll that would overshoot the last square leaves the token in place.
+
+        Parameters:
+        - pos (int): The current position of the token.
+        - roll (int): The dice result.
+        - u (float, optional): Uniform draw in [0, 1) that picks the branch of
+          a multi-destination square. Drawn from random when omitted.
+
+        Returns:
+        - int: The position of the token after the roll.
+        """
+        landing = pos + roll
+        if landing > self.size:
+            return pos
+        if self.deterministic:
+            return int(self.dest[landing])
+        if u is None:
+            u = random.random()
+        branch = int((u >= self.branch_cdf[landing]).sum())
+        return int(self.branch_dest[landing, branch])
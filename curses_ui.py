@@ -0,0 +1,245 @@
+"""
+Curses terminal view of the Snake and Ladder game.
+
+The board grid is drawn once when the game starts. After every roll only the
+cells whose tokens changed and the status line are redrawn, so a turn costs a
+few dozen characters on the wire instead of a full game-state block per
+player. Squares are numbered like BoardDrawer.draw_arrow: square 1 in the
+bottom-left corner, left to right along every row, rows going up.
+
+Cells shrink to fit the terminal, down to one line per row of the board.
+Without a terminal (output piped or redirected), or in a terminal too small
+for even the smallest cells, the game falls back to the plain Game.play
+output.
+
+Classes:
+- CursesView: Board grid and status line of one game.
+
+Functions:
+- cell_size: The largest cells that fit a terminal.
+- run: Play a game in the best view the terminal supports.
+"""
+
+import curses
+import sys
+
+from updated_Code import (Blocked, BoardSetup, ExtraTurn, Game, GameOver, Jumped,
+                          Moved, RankAssigned, Rolled, TurnPassed)
+
+COLUMNS = 10
+CELL_W = 6
+CELL_H = 2
+MIN_CELL_W = 3
+# marks used for seats, a cell shows a count once it can not fit them all
+SEAT_MARKS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def cell_size(height, width, rows):
+    """
+    Get the largest cells that fit a board in a terminal.
+
+    Parameters:
+    - height (int): Lines of the terminal.
+    - width (int): Columns of the terminal.
+    - rows (int): Rows of the board.
+
+    Returns:
+    - tuple: (cell_w, cell_h), or None when the board does not fit.
+    """
+    # grid lines around every cell, plus the status line
+    cell_h = min(CELL_H, (height - 2) // rows - 1)
+    cell_w = min(CELL_W, (width - 1) // COLUMNS - 1)
+    if cell_h < 1 or cell_w < MIN_CELL_W:
+        return None
+    return cell_w, cell_h
+
+
+class CursesView:
+    """
+    Board grid and status line of one game in a curses window.
+
+    Attributes:
+    - cell_w: Columns inside a cell.
+    - cell_h: Lines inside a cell; with one line the tokens are drawn over
+      the end of the square's label.
+    """
+
+    def __init__(self, stdscr, game):
+        """
+        Initialize a CursesView object.
+
+        Parameters:
+        - stdscr (curses window): The screen to draw on.
+        - game (Game): The game to show and play.
+
+        Raises:
+        - ValueError: The terminal is too small for the board.
+        """
+        self.stdscr = stdscr
+        self.game = game
+        self.size = game.board.get_size()
+        self.rows = -(-self.size // COLUMNS)
+        height, width = stdscr.getmaxyx()
+        fit = cell_size(height, width, self.rows)
+        if fit is None:
+            raise ValueError(f"a {height}x{width} terminal is too small for the board")
+        self.cell_w, self.cell_h = fit
+        # seats standing on each square, as currently drawn
+        self.occupants = {}
+        for seat, player in enumerate(game.players):
+            self.occupants.setdefault(player.get_pos(), []).append(seat)
+        self.status_y = self.rows * (self.cell_h + 1) + 1
+        self.events = game.events()
+
+    def _addstr(self, y, x, text, attr=0):
+        """Draw text, ignoring what falls off a terminal shrunk mid-game."""
+        try:
+            self.stdscr.addstr(y, x, text, attr)
+        except curses.error:
+            pass
+
+    def _cell_origin(self, square):
+        """Get the top-left screen coordinates of a square's cell."""
+        col = (square - 1) % COLUMNS
+        row = (square - 1) // COLUMNS
+        return ((self.rows - 1 - row) * (self.cell_h + 1) + 1,
+                col * (self.cell_w + 1) + 1)
+
+    def draw_board(self):
+        """Draw the grid lines and every cell."""
+        line = "+" + ("-" * self.cell_w + "+") * COLUMNS
+        for row in range(self.rows + 1):
+            self._addstr(row * (self.cell_h + 1), 0, line)
+            if row == self.rows:
+                break
+            for dy in range(1, self.cell_h + 1):
+                for col in range(COLUMNS + 1):
+                    self._addstr(row * (self.cell_h + 1) + dy, col * (self.cell_w + 1), "|")
+        for square in range(1, self.size + 1):
+            self.draw_cell(square)
+
+    def draw_cell(self, square):
+        """Draw the number, entity and tokens of one square."""
+        y, x = self._cell_origin(square)
+        entity = self.game.board.board.get(square)
+        label = str(square)
+        if entity is not None and entity.end_pos is not None:
+            # ">" marks where a snake or ladder leads
+            label += f">{entity.end_pos}"
+        seats = self.occupants.get(square, [])
+        if len(seats) <= self.cell_w:
+            tokens = "".join(SEAT_MARKS[seat % len(SEAT_MARKS)] for seat in seats)
+        else:
+            tokens = f"{len(seats)}p"[:self.cell_w]
+        if self.cell_h > 1:
+            self._addstr(y, x, label[:self.cell_w].ljust(self.cell_w))
+            self._addstr(y + 1, x, tokens.ljust(self.cell_w), curses.A_BOLD)
+        else:
+            room = self.cell_w - len(tokens)
+            self._addstr(y, x, label[:room].ljust(room))
+            if tokens:
+                self._addstr(y, x + room, tokens, curses.A_BOLD)
+
+    def move_token(self, seat, old_pos, new_pos):
+        """Move a token and redraw only the two affected cells."""
+        if old_pos == new_pos:
+            return
+        self.occupants[old_pos].remove(seat)
+        self.occupants.setdefault(new_pos, []).append(seat)
+        self.draw_cell(old_pos)
+        self.draw_cell(new_pos)
+
+    def set_status(self, text):
+        """Replace the status line."""
+        width = self.stdscr.getmaxyx()[1] - 1
+        self._addstr(self.status_y, 0, text[:width].ljust(width))
+
+    def play_roll(self):
+        """
+        Play one roll of the game and update the view.
+
+        Returns:
+        - str: Description of what happened.
+        """
+        text = ""
+        # pull the events of one roll, up to ExtraTurn or TurnPassed
+        for event in self.events:
+            if isinstance(event, Rolled):
+                text = f"Player {event.seat + 1} rolled {event.dice_result}"
+            elif isinstance(event, Jumped):
+                text += f", {event.entity.desc.lower()} at {event.landing}"
+            elif isinstance(event, Moved):
+                self.move_token(event.seat, event.from_pos, event.to_pos)
+                text += f", now at {event.to_pos}"
+            elif isinstance(event, Blocked):
+                text += ", can not move"
+            elif isinstance(event, RankAssigned):
+                text += f", finished with rank {event.rank}"
+            elif isinstance(event, ExtraTurn):
+                return text + f". One more turn for player {event.seat + 1} after rolling 6"
+            elif isinstance(event, TurnPassed):
+                if event.three_sixes:
+                    text += ". Changing turn due to 3 consecutive sixes"
+                return text
+            elif isinstance(event, GameOver):
+                break
+        return text
+
+    def loop(self):
+        """Play the game: Enter or space rolls, a toggles autoplay, q quits."""
+        curses.curs_set(0)
+        self.stdscr.clear()
+        self.draw_board()
+        self.set_status("Enter/space: roll   a: autoplay   q: quit")
+        auto = False
+        while self.game.can_play():
+            self.stdscr.timeout(50 if auto else -1)
+            key = self.stdscr.getch()
+            if key in (ord("q"), ord("Q")):
+                return
+            if key in (ord("a"), ord("A")):
+                auto = not auto
+                continue
+            if key == curses.KEY_RESIZE:
+                self.stdscr.clear()
+                self.draw_board()
+                continue
+            if auto or key in (ord(" "), ord("\n"), curses.KEY_ENTER):
+                self.set_status(self.play_roll())
+                self.stdscr.refresh()
+        result = ", ".join(f"Player {p._id + 1}: {p.get_rank()}"
+                           for p in sorted(self.game.players, key=lambda x: x.get_rank()))
+        self.set_status(f"Game over. {result}. Press any key")
+        self.stdscr.timeout(-1)
+        self.stdscr.getch()
+
+
+def run(num_players=2):
+    """
+    Play a game on the standard board.
+
+    Parameters:
+    - num_players (int, optional): The number of players.
+    """
+    game = Game()
+    game.initialize_game(BoardSetup.setup(), 6, num_players)
+    if not (sys.stdin.isatty() and sys.stdout.isatty()):
+        game.play()
+        return
+
+    def play(stdscr):
+        try:
+            view = CursesView(stdscr, game)
+        except ValueError as error:
+            return str(error)
+        view.loop()
+        return None
+
+    too_small = curses.wrapper(play)
+    if too_small is not None:
+        print(f"{too_small}, playing without the board view")
+        game.play()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2)
@@ -0,0 +1,359 @@
+"""
+Verifiable dice rolls: commit-reveal seeds and a batched roll hash chain.
+
+Every roll of an audited game comes from a counter-based generator: block i
+of the roll stream is BLAKE2b keyed with the server seed over (game id,
+client seed, i), and each 64-byte block gives 16 little-endian 32-bit words,
+turned into rolls by rejection sampling so every face is exactly equally
+likely. Anyone who knows the seeds can regenerate roll n of a game without
+any generator state.
+
+Before the first roll the server commits to its seed by publishing its hash;
+the client seed is chosen by the players and must be given by the caller,
+so the server can not pick a seed that favours anyone. The rolls are also
+chained as they are played: every batch rolls the chain head becomes
+BLAKE2b(head || rolls of the batch), each head is logged next to the turns
+in the GameEventStore, and the batch size is logged with the commitment.
+Hashing once per batch instead of once per roll keeps the cost to a few
+percent of playing the turns. As soon as the last player finishes the seed
+is revealed; verify_game then checks the commitment, regenerates the rolls,
+and checks them against both the logged turns and the logged chain.
+
+The server seed only exists in memory until it is revealed, so an audited
+game can not be resumed after a crash; GameEventStore.restore_game refuses
+to rebuild one.
+
+verify_games checks many games, such as a whole day, in a process pool.
+
+Classes:
+- AuditedDice: Dice drawing from the counter-based generator.
+- RollChain: Batched hash chain of the rolls of one game.
+- AuditedGame: PersistentGame that plays and logs audited dice.
+
+Functions:
+- new_seed: A random hex seed.
+- commitment: The published hash of a server seed.
+- roll_stream: Regenerate the rolls of a game.
+- verify_game: Check one game of an event store.
+- verify_games: Check many games in parallel.
+"""
+
+import hashlib
+import secrets
+import sqlite3
+import struct
+from multiprocessing import Pool
+
+from persistence import PersistentGame
+from updated_Code import Dice
+
+_WORDS = struct.Struct("<16I")
+CHAIN_BATCH = 64
+
+
+def new_seed():
+    """Get a random 32-byte seed as hex."""
+    return secrets.token_hex(32)
+
+
+def commitment(server_seed):
+    """
+    Get the commitment to a server seed.
+
+    Parameters:
+    - server_seed (str): The hex seed.
+
+    Returns:
+    - str: Hex BLAKE2b hash of the seed.
+    """
+    return hashlib.blake2b(bytes.fromhex(server_seed), digest_size=32).hexdigest()
+
+
+def _blocks(server_seed, game_id, client_seed):
+    """Yield the 32-bit words of a roll stream, one block at a time."""
+    key = bytes.fromhex(server_seed)
+    prefix = game_id.encode() + b"\0" + bytes.fromhex(client_seed)
+    block = 0
+    while True:
+        digest = hashlib.blake2b(prefix + block.to_bytes(8, "little"), key=key).digest()
+        yield _WORDS.unpack(digest)
+        block += 1
+
+
+def _accept(words, sides):
+    # words at or above limit would make low faces more likely
+    limit = (1 << 32) - (1 << 32) % sides
+    return [word % sides + 1 for word in words if word < limit]
+
+
+def roll_stream(server_seed, game_id, client_seed, sides, count):
+    """
+    Regenerate the first rolls of a game.
+
+    Parameters:
+    - server_seed (str): The revealed hex server seed.
+    - game_id (str): The game.
+    - client_seed (str): The hex client seed.
+    - sides (int): The number of sides in the dice.
+    - count (int): The number of rolls.
+
+    Returns:
+    - list: The rolls, in the order they were played.
+    """
+    rolls = []
+    for words in _blocks(server_seed, game_id, client_seed):
+        if len(rolls) >= count:
+            break
+        rolls.extend(_accept(words, sides))
+    return rolls[:count]
+
+
+class AuditedDice(Dice):
+    """
+    Dice drawing from the counter-based generator of one game.
+
+    Attributes:
+    - sides: The number of sides in the dice.
+    - rolls: The number of rolls drawn so far.
+    """
+
+    def __init__(self, sides, server_seed, game_id, client_seed):
+        """
+        Initialize an AuditedDice object.
+
+        Parameters:
+        - sides (int): The number of sides in the dice, at most 256.
+        - server_seed (str): The hex server seed.
+        - game_id (str): The game.
+        - client_seed (str): The hex client seed.
+        """
+        if not 1 <= sides <= 256:
+            raise ValueError("audited dice have between 1 and 256 sides")
+        super(AuditedDice, self).__init__(sides)
+        self.rolls = 0
+        self._blocks = _blocks(server_seed, game_id, client_seed)
+        self._buffer = []
+
+    def roll(self):
+        """
+        Roll the dice and return the result.
+
+        Returns:
+        - int: The next roll of the game's stream.
+        """
+        while not self._buffer:
+            # reversed so pop() hands them out in stream order
+            self._buffer = _accept(next(self._blocks), self.sides)[::-1]
+        self.rolls += 1
+        return self._buffer.pop()
+
+
+class RollChain:
+    """
+    Hash chain over the rolls of one game, one link per batch of rolls.
+
+    Attributes:
+    - head: Hex digest of the last link, or of the genesis before any.
+    - seq: The number of rolls added.
+    """
+
+    def __init__(self, commitment_hex, game_id, batch=CHAIN_BATCH):
+        """
+        Start a chain from the game's seed commitment.
+
+        Parameters:
+        - commitment_hex (str): The commitment to the server seed.
+        - game_id (str): The game.
+        - batch (int, optional): Rolls per link.
+        """
+        self.batch = batch
+        self.seq = 0
+        self._head = hashlib.blake2b(bytes.fromhex(commitment_hex) + game_id.encode(),
+                                     digest_size=32).digest()
+        self._pending = bytearray()
+
+    @property
+    def head(self):
+        return self._head.hex()
+
+    def add(self, roll):
+        """
+        Add one roll.
+
+        Parameters:
+        - roll (int): The dice result, 1 to 256.
+
+        Returns:
+        - tuple: (seq, digest) when the roll closed a link, otherwise None.
+        """
+        self._pending.append(roll - 1)
+        self.seq += 1
+        if len(self._pending) == self.batch:
+            return self.link()
+        return None
+
+    def link(self):
+        """
+        Close a link over the rolls added since the last one.
+
+        Returns:
+        - tuple: (seq, digest), or None when no rolls are pending.
+        """
+        if not self._pending:
+            return None
+        self._head = hashlib.blake2b(self._head + self._pending, digest_size=32).digest()
+        self._pending.clear()
+        return self.seq, self.head
+
+
+class AuditedGame(PersistentGame):
+    """
+    PersistentGame whose dice are audited.
+
+    The commitment is logged when the game starts, a chain link with every
+    CHAIN_BATCH rolls (in the same group commit as the turn that closed it)
+    and the last link and the server seed when the game is over.
+
+    Attributes:
+    - client_seed: The hex client seed.
+    - chain: The RollChain of the game.
+    """
+
+    def __init__(self, store, client_seed, player_ids=None, batch=CHAIN_BATCH):
+        """
+        Initialize an AuditedGame object.
+
+        Parameters:
+        - store (GameEventStore): Where the game is recorded.
+        - client_seed (str): Hex seed chosen by the players, for example
+          with new_seed on their side.
+        - player_ids (list, optional): Player identifiers per seat.
+        - batch (int, optional): Rolls per chain link.
+        """
+        if not client_seed:
+            raise ValueError("the players must choose a client seed")
+        bytes.fromhex(client_seed)
+        super(AuditedGame, self).__init__(store, player_ids)
+        self.client_seed = client_seed
+        self.batch = batch
+        self.chain = None
+        self._server_seed = None
+
+    def initialize_game(self, board, dice_sides, players):
+        super(AuditedGame, self).initialize_game(board, dice_sides, players)
+        self._server_seed = new_seed()
+        committed = commitment(self._server_seed)
+        self.store.commit_dice(self.game_id, committed, self.client_seed, self.batch)
+        self.dice = AuditedDice(dice_sides, self._server_seed, self.game_id,
+                                self.client_seed)
+        self.chain = RollChain(committed, self.game_id, self.batch)
+
+    def change_turn(self, dice_result):
+        """Chain the roll, then change turn and record it as PersistentGame."""
+        link = self.chain.add(dice_result)
+        if link is not None:
+            self.store.record_chain_link(self.game_id, *link)
+        super(AuditedGame, self).change_turn(dice_result)
+
+    def finish(self):
+        """Close the chain and reveal the seed, then record the result."""
+        link = self.chain.link()
+        if link is not None:
+            self.store.record_chain_link(self.game_id, *link)
+        self.store.reveal_dice(self.game_id, self._server_seed, wait=False)
+        super(AuditedGame, self).finish()
+
+
+def _check(game_id, dice_sides, audit, rolls):
+    """Verify one game's audit records; return None or what is wrong."""
+    committed, client_seed, server_seed, batch, links = audit
+    if server_seed is None:
+        return "seed not revealed"
+    if commitment(server_seed) != committed:
+        return "seed does not match its commitment"
+    expected = roll_stream(server_seed, game_id, client_seed, dice_sides, len(rolls))
+    for seq, (roll, fair) in enumerate(zip(rolls, expected), 1):
+        if roll != fair:
+            return f"roll {seq} is {roll}, the seed gives {fair}"
+    chain = RollChain(committed, game_id, batch)
+    rebuilt = []
+    for roll in rolls:
+        link = chain.add(roll)
+        if link is not None:
+            rebuilt.append(link)
+    link = chain.link()
+    if link is not None:
+        rebuilt.append(link)
+    if [tuple(link) for link in links] != rebuilt:
+        return "roll chain does not match the logged rolls"
+    return None
+
+
+def verify_game(path, game_id, conn=None):
+    """
+    Check one audited game of an event store.
+
+    Parameters:
+    - path (str): The GameEventStore database file.
+    - game_id (str): The game.
+    - conn (sqlite3.Connection, optional): Open connection to reuse.
+
+    Returns:
+    - str: None when the game checks out, otherwise what is wrong.
+    """
+    own = conn is None
+    conn = sqlite3.connect(path) if own else conn
+    try:
+        audit = conn.execute(
+            "SELECT commitment, client_seed, server_seed, chain_batch "
+            "FROM dice_commitments WHERE game_id = ?", (game_id,)).fetchone()
+        if audit is None:
+            return "no dice commitment"
+        links = conn.execute("SELECT seq, digest FROM dice_chain WHERE game_id = ? "
+                             "ORDER BY seq", (game_id,)).fetchall()
+        (dice_sides,) = conn.execute("SELECT dice_sides FROM games WHERE game_id = ?",
+                                     (game_id,)).fetchone()
+        rolls = [row[0] for row in conn.execute(
+            "SELECT roll FROM turns WHERE game_id = ? ORDER BY seq", (game_id,))]
+        return _check(game_id, dice_sides, audit + (links,), rolls)
+    finally:
+        if own:
+            conn.close()
+
+
+def _verify_chunk(job):
+    path, game_ids = job
+    conn = sqlite3.connect(path)
+    try:
+        return [(game_id, verify_game(path, game_id, conn))
+                for game_id in game_ids]
+    finally:
+        conn.close()
+
+
+def verify_games(path, game_ids=None, processes=None, chunk=200):
+    """
+    Check many audited games in a process pool.
+
+    Parameters:
+    - path (str): The GameEventStore database file.
+    - game_ids (list, optional): The games, every audited one by default.
+    - processes (int, optional): Worker processes, one per CPU by default.
+    - chunk (int, optional): Games checked per task.
+
+    Returns:
+    - dict: Map of game id to what is wrong, only for games that fail.
+    """
+    if game_ids is None:
+        conn = sqlite3.connect(path)
+        try:
+            game_ids = [row[0] for row in conn.execute(
+                "SELECT game_id FROM dice_commitments ORDER BY game_id")]
+        finally:
+            conn.close()
+    jobs = [(path, game_ids[ix:ix + chunk])
+            for ix in range(0, len(game_ids), chunk)]
+    with Pool(processes) as pool:
+        return {game_id: problem
+                for results in pool.imap_unordered(_verify_chunk, jobs)
+                for game_id, problem in results if problem is not None}
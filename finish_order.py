@@ -0,0 +1,133 @@
+"""
+Exact finish-order distribution of a multiplayer game.
+
+Players move independently of each other; only the order in which they take
+turns couples them. Game.get_next_player skips finished players, so every
+active player gets exactly one turn per round and seat i's k-th turn happens
+in round k. Seat i therefore finishes ahead of seat j exactly when it needs
+fewer turns, or the same number of turns and sits earlier. Given the
+single-token turn distribution, the number of players ahead of seat i in any
+round is a sum of independent Bernoulli variables, which gives every finish
+position probability in O(rounds * N^2) without enumerating joint states.
+
+Game.change_turn never resets consecutive_six when the turn passes, so a
+player who follows a three-sixes turn or a player finishing on a six inherits
+the count. That carry-over couples players and is not modelled here; every
+turn starts with no sixes rolled.
+
+Classes:
+- FinishOrder: Exact finish-order statistics for N players.
+"""
+
+from math import comb
+
+import numpy as np
+
+import markov
+
+
+class FinishOrder:
+    """
+    Exact finish-order statistics for N players on one board.
+
+    Attributes:
+    - num_players: The number of players.
+    - rank_probabilities: P[seat, rank - 1], probability that seat finishes
+      with that rank.
+    - turn_pmf: Distribution of the number of turns one player needs.
+    - rounds_pmf: Distribution of the number of rounds the whole game lasts.
+    - expected_rolls: Expected total number of dice rolls in a game.
+    """
+
+    def __init__(self, compiled, num_players, tol=1e-15):
+        """
+        Compute the finish-order statistics.
+
+        Parameters:
+        - compiled (CompiledBoard): The board to play on.
+        - num_players (int): The number of players in the game.
+        - tol (float, optional): Unfinished probability mass that is ignored.
+        """
+        self.num_players = num_players
+        P, _ = markov.roll_matrices(compiled)
+        self.turn_pmf = markov.turn_finish_distribution(
+            compiled, tol=tol, T=markov.turn_matrix(compiled, P))
+        # every roll a player makes is applied, so rolls add up per player
+        rolls_per_player = markov.expected_visits(compiled, P)[1:compiled.size].sum()
+        self.expected_rolls = num_players * rolls_per_player
+        cdf = np.cumsum(self.turn_pmf)
+        self.rounds_pmf = np.diff(cdf ** num_players, prepend=0.0)
+        self.rank_probabilities = self._rank_probabilities(cdf)
+
+    def _rank_probabilities(self, cdf):
+        """Combine the per-player turn distribution into rank probabilities."""
+        n = self.num_players
+        pmf = self.turn_pmf
+        # F(t) and F(t - 1) for every round t
+        finished_by = cdf
+        finished_before = np.concatenate(([0.0], cdf[:-1]))
+        result = np.zeros((n, n))
+        for seat in range(n):
+            # earlier seats beat this one if they finish in the same round
+            ahead = _binomial_by_round(finished_by, seat)
+            behind = _binomial_by_round(finished_before, n - 1 - seat)
+            for k in range(n):
+                # k players finish ahead of seat
+                count = np.zeros_like(pmf)
+                for a in range(min(k, seat) + 1):
+                    if k - a <= n - 1 - seat:
+                        count += ahead[a] * behind[k - a]
+                result[seat, k] = float((pmf * count).sum())
+        return result
+
+    def win_probabilities(self):
+        """
+        Get every seat's probability of finishing first.
+
+        Returns:
+        - numpy.ndarray: Win probability per seat.
+        """
+        return self.rank_probabilities[:, 0]
+
+    def expected_ranks(self):
+        """
+        Get every seat's expected finishing rank.
+
+        Returns:
+        - numpy.ndarray: Expected rank per seat, ranks starting at 1.
+        """
+        ranks = np.arange(1, self.num_players + 1)
+        return self.rank_probabilities @ ranks
+
+    def first_mover_advantage(self):
+        """
+        Get how much more often seat 1 wins than a fair share.
+
+        Returns:
+        - float: Win probability of the first seat minus 1 / num_players.
+        """
+        return float(self.win_probabilities()[0] - 1.0 / self.num_players)
+
+    def expected_rounds(self):
+        """
+        Get the expected number of rounds until every player has finished.
+
+        Returns:
+        - float: Expected number of rounds.
+        """
+        return float((np.arange(len(self.rounds_pmf)) * self.rounds_pmf).sum())
+
+
+def _binomial_by_round(p, count):
+    """
+    Get P(exactly a of count players finished) for every round at once.
+
+    Parameters:
+    - p (numpy.ndarray): Per-round probability that one player has finished.
+    - count (int): Number of identically distributed players.
+
+    Returns:
+    - list: Element a is an array over rounds of P(exactly a finished).
+    """
+    return [comb(count, a) * p ** a * (1 - p) ** (count - a)
+            for a in range(count + 1)]
@@ -0,0 +1,237 @@
+"""
+Local network host for Snake and Ladder games.
+
+The host keeps any number of HeadlessGame sessions in one process and serves
+them over TCP with asyncio. Every request and reply is one line of JSON:
+
+- {"op": "create", "players": 2} creates a game and replies with its id and
+  the seat to roll first.
+- {"op": "roll", "game": id, "seat": seat} rolls for that seat. Rolling out
+  of turn is an error; the reply carries the dice, the seat's new position
+  and the seat to roll next, following the rules of Game.change_turn.
+- {"op": "stats"} replies with the number of open games and handled requests.
+
+Replies have "ok": true, or "ok": false and an "error" message. A game is
+dropped from the host as soon as every player has finished, when the
+connection that created it closes, or after idle_timeout seconds without a
+roll, so abandoned games neither fill the host nor pin old board versions.
+
+Boards come from a BoardRegistry, so swap_board changes the layout for new
+games while games in progress finish on the version they started on.
+
+Classes:
+- GameHost: Game sessions and the protocol handler.
+
+Functions:
+- main: Run a host from the command line.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import OrderedDict
+
+from board_registry import BoardRegistry
+from compiled_board import CompiledBoard
+from headless import HeadlessGame
+from updated_Code import BoardSetup
+
+
+class GameHost:
+    """
+    Game sessions served over a line-based JSON protocol.
+
+    Attributes:
+    - boards: BoardRegistry with the board new games are played on.
+    - games: Map of game id to HeadlessGame.
+    - requests: The number of requests handled.
+    """
+
+    def __init__(self, compiled, max_games=100000, max_players=8, seed=None,
+                 idle_timeout=600.0):
+        """
+        Initialize a GameHost object.
+
+        Parameters:
+        - compiled (CompiledBoard): The first board version to play on.
+        - max_games (int, optional): Games open at once before create fails.
+        - max_players (int, optional): Largest game that may be created.
+        - seed (int, optional): Seed for the dice of all games.
+        - idle_timeout (float, optional): Seconds without a roll after which
+          an open game is dropped.
+        """
+        self.boards = BoardRegistry(compiled)
+        self.max_games = max_games
+        self.max_players = max_players
+        self.idle_timeout = idle_timeout
+        self.games = {}
+        # game id to time of its last create or roll, least recent first
+        self._last_used = OrderedDict()
+        self.requests = 0
+        self.rng = random.Random(seed)
+        self._ids = itertools.count(1)
+
+    def handle(self, request, created=None):
+        """
+        Handle one request.
+
+        Parameters:
+        - request (dict): The decoded request.
+        - created (set, optional): Receives the id of a game this request
+          creates, so its connection can drop it on closing.
+
+        Returns:
+        - dict: The reply.
+        """
+        self.requests += 1
+        now = time.monotonic()
+        self._expire(now)
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "bad request"}
+        for field in ("players", "game", "seat"):
+            if field in request and not _is_int(request[field]):
+                return {"ok": False, "error": f"{field} must be an integer"}
+        op = request.get("op")
+        if op == "create":
+            reply = self._create(request, now)
+            if reply["ok"] and created is not None:
+                created.add(reply["game"])
+            return reply
+        if op == "roll":
+            return self._roll(request, now)
+        if op == "stats":
+            return {"ok": True, "games": len(self.games), "requests": self.requests,
+                    "versions": self.boards.live_versions()}
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+    def _expire(self, now):
+        while self._last_used:
+            game_id, used = next(iter(self._last_used.items()))
+            if now - used < self.idle_timeout:
+                break
+            self.drop_game(game_id)
+
+    def drop_game(self, game_id):
+        """
+        Remove a game, finished or not.
+
+        Parameters:
+        - game_id (int): The game to remove; unknown ids are ignored.
+        """
+        self.games.pop(game_id, None)
+        self._last_used.pop(game_id, None)
+
+    def _create(self, request, now):
+        players = request.get("players", 2)
+        if not 1 <= players <= self.max_players:
+            return {"ok": False, "error": f"players must be 1..{self.max_players}"}
+        if len(self.games) >= self.max_games:
+            return {"ok": False, "error": "host is full"}
+        game_id = next(self._ids)
+        compiled = self.boards.current()
+        game = HeadlessGame(compiled, players, self.rng)
+        self.games[game_id] = game
+        self._last_used[game_id] = now
+        return {"ok": True, "game": game_id, "turn": game.current_seat(),
+                "version": compiled.version}
+
+    def _roll(self, request, now):
+        game = self.games.get(request.get("game"))
+        if game is None:
+            return {"ok": False, "error": "no such game"}
+        if request.get("seat") != game.current_seat():
+            return {"ok": False, "error": "not your turn", "turn": game.current_seat()}
+        dice_result = game.roll()
+        seat, _, pos = game.apply_roll(dice_result)
+        over = not game.can_play()
+        reply = {"ok": True, "seat": seat, "dice": dice_result, "pos": pos,
+                 "rank": game.ranks[seat], "over": over}
+        if over:
+            self.drop_game(request["game"])
+        else:
+            reply["turn"] = game.current_seat()
+            self._last_used[request["game"]] = now
+            self._last_used.move_to_end(request["game"])
+        return reply
+
+    def swap_board(self, board, dice_sides=6):
+        """
+        Play new games on another layout; games in progress keep theirs.
+
+        Parameters:
+        - board (CompiledBoard or Board): The new layout.
+        - dice_sides (int, optional): Dice sides, when board is a Board.
+
+        Returns:
+        - int: The new version number.
+        """
+        return self.boards.publish(board, dice_sides).version
+
+    async def _serve_client(self, reader, writer):
+        # games created over this connection, dropped when it closes
+        created = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = self.handle(json.loads(line), created)
+                except (ValueError, AttributeError):
+                    reply = {"ok": False, "error": "bad request"}
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for game_id in created:
+                self.drop_game(game_id)
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=7777):
+        """
+        Start serving.
+
+        Parameters:
+        - host (str, optional): Address to listen on.
+        - port (int, optional): Port to listen on, 0 picks a free one.
+
+        Returns:
+        - asyncio.Server: The running server.
+        """
+        return await asyncio.start_server(self._serve_client, host, port,
+                                          backlog=4096)
+
+
+def _is_int(value):
+    # JSON true and false decode to bool, a subclass of int
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Snake and Ladder games.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    async def run():
+        host = GameHost(CompiledBoard.from_board(BoardSetup.setup(), 6), seed=args.seed)
+        server = await host.serve(args.host, args.port)
+        port = server.sockets[0].getsockname()[1]
+        # the load generator waits for this line when it starts the host
+        print(f"listening on {args.host}:{port}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Headless game engine on a compiled board.
+
+Plays exactly the rules of Game (turn order, extra roll on a six, turn change
+after three consecutive sixes, skipping finished players, blocked overshoot)
+but keeps the whole state in plain lists, never prints and never waits for
+input, so it can be driven from simulations, servers and worker pools.
+
+Classes:
+- HeadlessGame: State and rules of one game without any I/O.
+"""
+
+import random
+
+
+class HeadlessGame:
+    """
+    One game of Snake and Ladder without any I/O.
+
+    Attributes:
+    - compiled: The CompiledBoard being played.
+    - positions: Position of every player, indexed by seat.
+    - ranks: Rank of every player, -1 while still playing.
+    - turn: Seat whose turn it is.
+    - last_rank: The rank achieved by the last player to finish.
+    - consecutive_six: The number of consecutive sixes rolled in one turn.
+    - rolls: Number of dice rolls played so far.
+    - rng: random.Random used for dice rolls and multi-destination squares.
+    """
+
+    def __init__(self, compiled, num_players, rng=None):
+        """
+        Initialize a HeadlessGame object.
+
+        Parameters:
+        - compiled (CompiledBoard): The board to play on.
+        - num_players (int): The number of players in the game.
+        - rng (random.Random, optional): Random source, a fresh one by default.
+        """
+        self.compiled = compiled
+        self.positions = [compiled.start] * num_players
+        self.ranks = [-1] * num_players
+        self.turn = 0
+        self.last_rank = 0
+        self.consecutive_six = 0
+        self.rolls = 0
+        self.rng = rng if rng is not None else random.Random()
+
+    def can_play(self):
+        """Check if any player is still playing."""
+        return self.last_rank != len(self.positions)
+
+    def current_seat(self):
+        """
+        Get the seat to roll next, skipping players who already finished.
+
+        Returns:
+        - int: The seat whose turn it is.
+        """
+        while self.ranks[self.turn] != -1:
+            self.turn = (self.turn + 1) % len(self.positions)
+        return self.turn
+
+    def roll(self):
+        """Roll the dice."""
+        return self.rng.randint(1, self.compiled.dice_sides)
+
+    def apply_roll(self, dice_result, u=None):
+        """
+        Play one dice result for the current player and pass the turn on.
+
+        Parameters:
+        - dice_result (int): The result of rolling the dice.
+        - u (float, optional): Uniform draw for multi-destination squares.
+
+        Returns:
+        - tuple: (seat, landing, end_pos) where landing is the square the
+          dice result points at and end_pos is where the token now stands.
+        """
+        compiled = self.compiled
+        seat = self.current_seat()
+        pos = self.positions[seat]
+        landing = pos + dice_result
+        if landing <= compiled.size:
+            if not compiled.deterministic and u is None:
+                u = self.rng.random()
+            pos = compiled.next_pos(pos, dice_result, u)
+            self.positions[seat] = pos
+            if pos == compiled.size:
+                self.last_rank += 1
+                self.ranks[seat] = self.last_rank
+        self.rolls += 1
+        # same rule as Game.change_turn
+        self.consecutive_six = 0 if dice_result != 6 else self.consecutive_six + 1
+        if dice_result != 6 or self.consecutive_six == 3:
+            self.turn = (self.turn + 1) % len(self.positions)
+        return seat, landing, pos
+
+    def play(self, max_rolls=None):
+        """
+        Play the game until every player has a rank.
+
+        Parameters:
+        - max_rolls (int, optional): Stop after this many rolls.
+
+        Returns:
+        - list: Rank of every player, -1 for players who did not finish.
+        """
+        while self.can_play():
+            if max_rolls is not None and self.rolls >= max_rolls:
+                break
+            self.apply_roll(self.roll())
+        return self.ranks
@@ -0,0 +1,482 @@
+"""
+Local simulation job service.
+
+Jobs (a board, dice, rule set, player count and number of games) are
+submitted over HTTP on localhost or a Unix socket. The service runs jobs on
+a worker pool with the vectorized GameBatch engine, split into chunks of
+games, and always hands the next free worker a chunk of the highest
+priority job, so a high priority job overtakes a long running one at the
+next chunk boundary. Every chunk has its own seed derived from the job seed,
+so results do not depend on how chunks were scheduled. The board of a job
+is published once to shared memory (see shared_board) and workers attach to
+it by name, so chunks do not carry a copy of the board.
+
+Jobs are keyed by the board fingerprint and their parameters. Submitting a
+job identical to one that is queued, running or done returns the existing
+job instead of simulating it again.
+
+HTTP API (JSON bodies and replies):
+- POST /jobs: submit {"board": {...}, "dice": 6, "players": 2,
+  "games": 100000, "rules": {"six": 6, "max_sixes": 3}, "seed": 0,
+  "priority": 0}. The board is {"layout": "standard"} or {"size": 100,
+  "snakes": {"17": 7}, "ladders": {"4": 14}}. Replies with the job status.
+- GET /jobs: status of every job.
+- GET /jobs/<id>: status of one job, with its result once done.
+- GET /jobs/<id>/events: one status line per progress update until the job
+  ends (newline-delimited JSON).
+- DELETE /jobs/<id>: cancel a job.
+
+Classes:
+- Job: A submitted job, its progress and its result.
+- JobService: Priority scheduler and worker pool.
+
+Functions:
+- serve: Run the service over TCP or a Unix socket.
+"""
+
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Pool
+
+import numpy as np
+
+from compiled_board import CompiledBoard
+from shared_board import SharedBoard, attach
+from simulator import GameBatch
+from updated_Code import BoardSetup
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+def _compile(board_spec, dice_sides):
+    """Compile the board of a job spec."""
+    if board_spec.get("layout") == "standard":
+        return CompiledBoard.from_board(BoardSetup.setup(), dice_sides)
+    snakes = {int(k): int(v) for k, v in board_spec.get("snakes", {}).items()}
+    ladders = {int(k): int(v) for k, v in board_spec.get("ladders", {}).items()}
+    return CompiledBoard.from_layout(int(board_spec["size"]), snakes, ladders,
+                                     dice_sides)
+
+
+# boards attached by this worker process, by shared memory name
+_attached = {}
+_ATTACHED_MAX = 8
+
+
+def _worker_board(name):
+    """Get a published board, attaching to it on first use in this worker."""
+    compiled = _attached.get(name)
+    if compiled is None:
+        if len(_attached) >= _ATTACHED_MAX:
+            # the oldest board most likely belongs to a finished job
+            del _attached[next(iter(_attached))]
+        compiled = _attached[name] = attach(name)
+    return compiled
+
+
+def _run_chunk(board_name, players, games, six, max_sixes, seed, chunk):
+    """Play one chunk of a job in a worker; returns win counts and length counts."""
+    rng = np.random.default_rng(np.random.SeedSequence([seed, chunk]))
+    batch = GameBatch(_worker_board(board_name), games, players, six, max_sixes)
+    batch.play(rng)
+    return (batch.ranks == 1).sum(axis=0), np.bincount(batch.rolls)
+
+
+class Job:
+    """
+    A submitted simulation job.
+
+    Attributes:
+    - id: The job id.
+    - key: Fingerprint of the board and parameters, used for deduplication.
+    - board: SharedBoard of the job's board, None once the job has ended.
+    - priority: Higher runs first.
+    - state: queued, running, done, cancelled or failed.
+    - chunks: Number of chunks the job is split into.
+    - chunks_done: Number of chunks finished.
+    - result: Summary of the games once done.
+    """
+
+    def __init__(self, job_id, key, board, spec, chunk_games):
+        self.id = job_id
+        self.key = key
+        self.board = board
+        self.players = int(spec.get("players", 2))
+        self.games = int(spec.get("games", 10000))
+        rules = spec.get("rules", {})
+        self.six = int(rules.get("six", 6))
+        self.max_sixes = int(rules.get("max_sixes", 3))
+        self.seed = int(spec.get("seed", 0))
+        self.priority = float(spec.get("priority", 0))
+        self.state = QUEUED
+        self.error = None
+        self.chunk_sizes = [min(chunk_games, self.games - start)
+                            for start in range(0, self.games, chunk_games)]
+        self.chunks = len(self.chunk_sizes)
+        self.next_chunk = 0
+        self.chunks_done = 0
+        self.games_done = 0
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.wins = np.zeros(self.players, dtype=np.int64)
+        self.length_counts = np.zeros(0, dtype=np.int64)
+        self.result = None
+
+    def add_chunk(self, wins, length_counts, games):
+        self.wins += wins
+        if len(length_counts) > len(self.length_counts):
+            length_counts = length_counts.copy()
+            length_counts[:len(self.length_counts)] += self.length_counts
+            self.length_counts = length_counts
+        else:
+            self.length_counts[:len(length_counts)] += length_counts
+        self.chunks_done += 1
+        self.games_done += games
+
+    def summarize(self):
+        """Build the result from the accumulated counts."""
+        lengths = np.arange(len(self.length_counts))
+        cumulative = np.cumsum(self.length_counts)
+        percentiles = {str(q): int(np.searchsorted(cumulative, q / 100 * self.games))
+                       for q in (50, 90, 99)}
+        self.result = {
+            "games": self.games_done,
+            "mean_length": float((lengths * self.length_counts).sum() / self.games_done),
+            "length_percentiles": percentiles,
+            "win_rates": (self.wins / self.games_done).tolist(),
+        }
+
+    def status(self):
+        """
+        Get the job's status.
+
+        Returns:
+        - dict: id, state, priority, progress, eta (seconds, while running),
+          and result once done.
+        """
+        status = {"id": self.id, "state": self.state, "priority": self.priority,
+                  "games": self.games, "games_done": self.games_done,
+                  "progress": self.chunks_done / self.chunks if self.chunks else 1.0}
+        if self.state == RUNNING and self.chunks_done:
+            elapsed = time.time() - self.started
+            status["eta"] = elapsed / self.chunks_done * (self.chunks - self.chunks_done)
+        if self.error is not None:
+            status["error"] = self.error
+        if self.result is not None:
+            status["result"] = self.result
+        return status
+
+
+class JobService:
+    """
+    Priority scheduler feeding chunks of jobs to a worker pool.
+    """
+
+    def __init__(self, processes=None, chunk_games=20000):
+        """
+        Initialize a JobService object.
+
+        Parameters:
+        - processes (int, optional): Worker processes, one per CPU by default.
+        - chunk_games (int, optional): Games per chunk handed to a worker.
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_games = chunk_games
+        self.jobs = {}
+        self._by_key = {}
+        self._queue = []
+        self._ids = itertools.count(1)
+        self._in_flight = 0
+        # guards all job state; notified on every progress change
+        self._changed = threading.Condition()
+        self._pool = Pool(self.processes)
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    @staticmethod
+    def job_key(compiled, spec):
+        """Fingerprint of a job: identical keys produce identical results."""
+        rules = spec.get("rules", {})
+        parts = [compiled.fingerprint(), int(spec.get("players", 2)),
+                 int(spec.get("games", 10000)), int(rules.get("six", 6)),
+                 int(rules.get("max_sixes", 3)), int(spec.get("seed", 0))]
+        return hashlib.blake2b(json.dumps(parts).encode(), digest_size=12).hexdigest()
+
+    def submit(self, spec):
+        """
+        Submit a job, or find the identical job already submitted.
+
+        Parameters:
+        - spec (dict): The job, see the module docstring.
+
+        Returns:
+        - tuple: (Job, deduplicated) where deduplicated is True if an
+          existing job was returned.
+
+        Raises:
+        - ValueError: The job has no games or no players.
+        """
+        if int(spec.get("games", 10000)) < 1:
+            raise ValueError("games must be at least 1")
+        if int(spec.get("players", 2)) < 1:
+            raise ValueError("players must be at least 1")
+        compiled = _compile(spec.get("board", {"layout": "standard"}),
+                            int(spec.get("dice", 6)))
+        key = self.job_key(compiled, spec)
+        with self._changed:
+            existing = self._by_key.get(key)
+            if existing is not None and existing.state in (QUEUED, RUNNING, DONE):
+                # a higher priority request for the same work speeds it up
+                if float(spec.get("priority", 0)) > existing.priority:
+                    existing.priority = float(spec["priority"])
+                    heapq.heappush(self._queue, (-existing.priority, existing.id))
+                return existing, True
+            job = Job(str(next(self._ids)), key, SharedBoard(compiled), spec,
+                      self.chunk_games)
+            self.jobs[job.id] = job
+            self._by_key[key] = job
+            heapq.heappush(self._queue, (-job.priority, job.id))
+            self._changed.notify_all()
+            return job, False
+
+    def cancel(self, job_id):
+        """
+        Cancel a job; chunks already running are discarded when they finish.
+
+        Returns:
+        - bool: True if the job was queued or running.
+        """
+        with self._changed:
+            job = self.jobs.get(job_id)
+            if job is None or job.state not in (QUEUED, RUNNING):
+                return False
+            job.state = CANCELLED
+            job.finished = time.time()
+            self._release(job)
+            self._changed.notify_all()
+            return True
+
+    @staticmethod
+    def _release(job):
+        """Free the shared board of a job that has ended."""
+        if job.board is not None:
+            # workers still attached keep their mapping until they drop it
+            job.board.unlink()
+            job.board = None
+
+    def _next_job(self):
+        """Get the highest priority job with chunks left to hand out."""
+        while self._queue:
+            priority, job_id = self._queue[0]
+            job = self.jobs[job_id]
+            if (job.state in (QUEUED, RUNNING) and job.next_chunk < job.chunks
+                    and -priority == job.priority):
+                return job
+            # stale entry: finished, cancelled, fully dispatched or re-prioritised
+            heapq.heappop(self._queue)
+        return None
+
+    def _dispatch(self):
+        with self._changed:
+            while not self._closed:
+                job = self._next_job() if self._in_flight < self.processes else None
+                if job is None:
+                    self._changed.wait()
+                    continue
+                if job.state == QUEUED:
+                    job.state = RUNNING
+                    job.started = time.time()
+                chunk = job.next_chunk
+                job.next_chunk += 1
+                self._in_flight += 1
+                games = job.chunk_sizes[chunk]
+                self._pool.apply_async(
+                    _run_chunk,
+                    (job.board.name, job.players, games, job.six, job.max_sixes,
+                     job.seed, chunk),
+                    callback=lambda result, job=job, games=games:
+                        self._chunk_done(job, games, result, None),
+                    error_callback=lambda error, job=job:
+                        self._chunk_done(job, 0, None, error))
+
+    def _chunk_done(self, job, games, result, error):
+        with self._changed:
+            self._in_flight -= 1
+            if job.state == RUNNING:
+                if error is not None:
+                    job.state = FAILED
+                    job.error = repr(error)
+                    job.finished = time.time()
+                    self._release(job)
+                else:
+                    job.add_chunk(result[0], result[1], games)
+                    if job.chunks_done == job.chunks:
+                        job.summarize()
+                        job.state = DONE
+                        job.finished = time.time()
+                        self._release(job)
+            self._changed.notify_all()
+
+    def wait_for_change(self, job, last_seen, timeout=5.0):
+        """
+        Wait until a job makes progress, changes state or timeout passes.
+
+        Parameters:
+        - job (Job): The job to watch.
+        - last_seen (tuple): The marker returned by the previous call, None
+          to return at once.
+        - timeout (float, optional): Seconds before returning anyway.
+
+        Returns:
+        - tuple: (marker, status) with the marker to pass to the next call.
+        """
+        def marker():
+            return job.state, job.chunks_done, job.priority
+
+        with self._changed:
+            if last_seen is not None:
+                self._changed.wait_for(lambda: marker() != last_seen, timeout)
+            return marker(), job.status()
+
+    def close(self):
+        """Stop dispatching and shut the worker pool down."""
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+        self._pool.terminate()
+        self._pool.join()
+        for job in self.jobs.values():
+            self._release(job)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.0"
+
+    def _reply(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _job(self, parts):
+        job = self.server.service.jobs.get(parts[1]) if len(parts) > 1 else None
+        if job is None:
+            self._reply(404, {"error": "no such job"})
+        return job
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self._reply(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            spec = json.loads(self.rfile.read(length))
+            job, deduplicated = self.server.service.submit(spec)
+        except (ValueError, KeyError, TypeError) as error:
+            return self._reply(400, {"error": str(error)})
+        status = job.status()
+        status["deduplicated"] = deduplicated
+        self._reply(200 if deduplicated else 201, status)
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        service = self.server.service
+        if parts == ["jobs"]:
+            return self._reply(200, [job.status() for job in service.jobs.values()])
+        if parts[0] != "jobs" or len(parts) > 3:
+            return self._reply(404, {"error": "not found"})
+        job = self._job(parts)
+        if job is None:
+            return
+        if len(parts) == 2:
+            return self._reply(200, job.status())
+        if parts[2] != "events":
+            return self._reply(404, {"error": "not found"})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        seen = None
+        try:
+            while True:
+                seen, status = service.wait_for_change(job, seen)
+                self.wfile.write(json.dumps(status).encode() + b"\n")
+                self.wfile.flush()
+                if status["state"] not in (QUEUED, RUNNING):
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_DELETE(self):
+        parts = self.path.strip("/").split("/")
+        if parts[0] != "jobs":
+            return self._reply(404, {"error": "not found"})
+        job = self._job(parts)
+        if job is not None:
+            cancelled = self.server.service.cancel(job.id)
+            self._reply(200, dict(job.status(), cancelled=cancelled))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _UnixHTTPServer(ThreadingHTTPServer):
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+    def get_request(self):
+        request, _ = super(_UnixHTTPServer, self).get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address
+        return request, ("local", 0)
+
+
+def serve(address=("127.0.0.1", 8765), processes=None, chunk_games=20000):
+    """
+    Run the job service until interrupted.
+
+    Parameters:
+    - address (tuple or str, optional): (host, port) to listen on, or the
+      path of a Unix socket.
+    - processes (int, optional): Worker processes, one per CPU by default.
+    - chunk_games (int, optional): Games per chunk handed to a worker.
+    """
+    service = JobService(processes, chunk_games)
+    server_class = _UnixHTTPServer if isinstance(address, str) else ThreadingHTTPServer
+    server = server_class(address, _Handler)
+    server.daemon_threads = True
+    server.service = service
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and not sys.argv[1].isdigit():
+        serve(sys.argv[1])
+    else:
+        serve(("127.0.0.1", int(sys.argv[1]) if len(sys.argv) > 1 else 8765))
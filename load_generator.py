@@ -0,0 +1,326 @@
+"""
+Synthetic load generator for a local GameHost.
+
+Simulated clients create games on a game_host.py process and play them to the
+end, always rolling for the seat the host says is next, with a think time
+drawn between rolls. Two modes are supported:
+
+- closed: a fixed number of clients, each starting a new game as soon as its
+  previous one ends, so the offered load adapts to the host's speed.
+- open: new game sessions arrive as a Poisson process at a fixed rate
+  whatever the host's speed, so a slow host builds up a backlog as it would
+  in production.
+
+Every interval the generator prints throughput, p50/p99/p999 request latency
+and the error rate, and it returns the totals for the whole run.
+
+Think times are given as a spec string: "0" (none), "const:0.1",
+"exp:0.1" (exponential with mean 0.1 s), "uniform:0.05,0.2" or
+"lognormal:-2.5,0.5" (mu and sigma of the underlying normal).
+
+Classes:
+- LoadStats: Latencies and errors, per interval and in total.
+
+Functions:
+- think_time: Build a think-time sampler from a spec string.
+- run: Run a load test against a host.
+- main: Run a load test from the command line.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+
+
+def think_time(spec):
+    """
+    Build a think-time sampler.
+
+    Parameters:
+    - spec (str): The distribution, see the module docstring.
+
+    Returns:
+    - callable: Takes a random.Random and returns seconds to wait.
+    """
+    name, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",")] if params else []
+    if name in ("0", "none"):
+        return lambda rng: 0.0
+    if name == "const":
+        return lambda rng: values[0]
+    if name == "exp":
+        return lambda rng: rng.expovariate(1 / values[0])
+    if name == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if name == "lognormal":
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    raise ValueError(f"unknown think-time distribution {spec!r}")
+
+
+def _percentile(ordered, q):
+    if not ordered:
+        return float("nan")
+    return ordered[min(int(math.ceil(q * len(ordered))) - 1, len(ordered) - 1)]
+
+
+class LoadStats:
+    """
+    Request latencies and errors of a load test.
+
+    Attributes:
+    - requests: Requests completed in the whole run.
+    - errors: Failed requests in the whole run.
+    - games: Games played to the end in the whole run.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.games = 0
+        self._all = []
+        self._window = []
+        self._window_errors = 0
+
+    def record(self, latency, ok):
+        """Record one request and its latency in seconds."""
+        self.requests += 1
+        self._all.append(latency)
+        self._window.append(latency)
+        if not ok:
+            self.errors += 1
+            self._window_errors += 1
+
+    def _summary(self, latencies, errors, seconds):
+        ordered = sorted(latencies)
+        return {
+            "requests": len(ordered),
+            "throughput": len(ordered) / seconds if seconds else 0.0,
+            "p50_ms": _percentile(ordered, 0.5) * 1000,
+            "p99_ms": _percentile(ordered, 0.99) * 1000,
+            "p999_ms": _percentile(ordered, 0.999) * 1000,
+            "error_rate": errors / len(ordered) if ordered else 0.0,
+        }
+
+    def take_window(self, seconds):
+        """
+        Summarize and reset the current interval.
+
+        Parameters:
+        - seconds (float): Length of the interval.
+
+        Returns:
+        - dict: requests, throughput, p50_ms, p99_ms, p999_ms and error_rate.
+        """
+        summary = self._summary(self._window, self._window_errors, seconds)
+        self._window = []
+        self._window_errors = 0
+        return summary
+
+    def total(self, seconds):
+        """Summarize the whole run, like take_window, plus the games played."""
+        summary = self._summary(self._all, self.errors, seconds)
+        summary["games"] = self.games
+        return summary
+
+
+class _Client:
+    """One connection to the host with at most one request in flight."""
+
+    def __init__(self, address, stats, timeout):
+        self.address = address
+        self.stats = stats
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def request(self, message):
+        """Send a request and return its reply, or None if it failed."""
+        started = time.perf_counter()
+        try:
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.wait_for(
+                    asyncio.open_connection(*self.address), self.timeout)
+            self.writer.write(json.dumps(message).encode() + b"\n")
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            if not line:
+                raise ConnectionResetError("host closed the connection")
+            reply = json.loads(line)
+        except (OSError, asyncio.TimeoutError, ValueError):
+            self.close()
+            self.stats.record(time.perf_counter() - started, False)
+            return None
+        self.stats.record(time.perf_counter() - started, reply.get("ok", False))
+        return reply if reply.get("ok") else None
+
+    async def play_game(self, players, think, rng):
+        """Create a game and roll for whichever seat is next until it ends."""
+        reply = await self.request({"op": "create", "players": players})
+        if reply is None:
+            return
+        game, seat = reply["game"], reply["turn"]
+        while True:
+            delay = think(rng)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            reply = await self.request({"op": "roll", "game": game, "seat": seat})
+            if reply is None:
+                return
+            if reply["over"]:
+                self.stats.games += 1
+                return
+            seat = reply["turn"]
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def _closed_loop(address, stats, clients, players, think, deadline, seed,
+                       timeout):
+    async def client_loop(index):
+        rng = random.Random(None if seed is None else seed + index)
+        client = _Client(address, stats, timeout)
+        while time.monotonic() < deadline:
+            await client.play_game(players, think, rng)
+        client.close()
+
+    await asyncio.gather(*(client_loop(i) for i in range(clients)))
+
+
+async def _open_loop(address, stats, rate, players, think, deadline, seed,
+                     timeout):
+    rng = random.Random(seed)
+    sessions = set()
+
+    async def session(session_rng):
+        client = _Client(address, stats, timeout)
+        await client.play_game(players, think, session_rng)
+        client.close()
+
+    next_arrival = time.monotonic()
+    while next_arrival < deadline:
+        await asyncio.sleep(max(next_arrival - time.monotonic(), 0))
+        task = asyncio.create_task(session(random.Random(rng.random())))
+        sessions.add(task)
+        task.add_done_callback(sessions.discard)
+        next_arrival += rng.expovariate(rate)
+    if sessions:
+        await asyncio.gather(*sessions)
+
+
+async def _report(stats, interval, out):
+    started = last = time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+        now = time.monotonic()
+        window = stats.take_window(now - last)
+        last = now
+        print(f"{now - started:7.1f}s {window['throughput']:9.0f} req/s"
+              f"  p50 {window['p50_ms']:7.2f} ms  p99 {window['p99_ms']:7.2f} ms"
+              f"  p999 {window['p999_ms']:7.2f} ms"
+              f"  errors {window['error_rate']:6.2%}", file=out, flush=True)
+
+
+def run(host="127.0.0.1", port=7777, mode="closed", clients=100, rate=100.0,
+        players=2, think="0", duration=10.0, interval=1.0, timeout=5.0,
+        seed=None, out=sys.stdout):
+    """
+    Run a load test against a running host.
+
+    Parameters:
+    - host (str, optional): Address of the host.
+    - port (int, optional): Port of the host.
+    - mode (str, optional): "closed" or "open".
+    - clients (int, optional): Concurrent clients in closed mode.
+    - rate (float, optional): New games per second in open mode.
+    - players (int, optional): Players per game.
+    - think (str, optional): Think-time spec between rolls.
+    - duration (float, optional): Seconds to start new games for. Games in
+      progress are played to the end.
+    - interval (float, optional): Seconds between progress lines.
+    - timeout (float, optional): Seconds before a request counts as failed.
+    - seed (int, optional): Seed for think times and arrivals.
+    - out (file, optional): Where progress lines are written, None for none.
+
+    Returns:
+    - dict: Totals of the run, as returned by LoadStats.total.
+    """
+    sampler = think_time(think)
+    stats = LoadStats()
+
+    async def main_task():
+        started = time.monotonic()
+        deadline = started + duration
+        reporter = asyncio.create_task(_report(stats, interval, out)) if out else None
+        if mode == "closed":
+            await _closed_loop((host, port), stats, clients, players, sampler,
+                               deadline, seed, timeout)
+        elif mode == "open":
+            await _open_loop((host, port), stats, rate, players, sampler,
+                             deadline, seed, timeout)
+        else:
+            raise ValueError(f"unknown mode {mode!r}")
+        if reporter is not None:
+            reporter.cancel()
+        return stats.total(time.monotonic() - started)
+
+    return asyncio.run(main_task())
+
+
+def _start_host(port):
+    """Start game_host.py in a child process and wait until it listens."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                      "game_host.py"), "--port", str(port)],
+        stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith("listening on"):
+        process.kill()
+        raise RuntimeError("game host did not start")
+    return process, int(line.rsplit(":", 1)[1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test a local game host.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--spawn-host", action="store_true",
+                        help="start game_host.py on a free port for the test")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=100.0)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--think", default="0")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    process = None
+    port = args.port
+    if args.spawn_host:
+        process, port = _start_host(0)
+    try:
+        total = run(args.host, port, args.mode, args.clients, args.rate,
+                    args.players, args.think, args.duration, args.interval,
+                    args.timeout, args.seed)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    print(f"total: {total['requests']} requests, {total['games']} games,"
+          f" {total['throughput']:.0f} req/s, p50 {total['p50_ms']:.2f} ms,"
+          f" p99 {total['p99_ms']:.2f} ms, p999 {total['p999_ms']:.2f} ms,"
+          f" errors {total['error_rate']:.2%}")
+
+
+if __name__ == "__main__":
+    main()
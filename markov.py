@@ -0,0 +1,252 @@
+"""
+Exact Markov-chain analysis of a single token on a compiled board.
+
+A token's position after each roll only depends on its position before the
+roll, so one game of a single token is an absorbing Markov chain whose
+absorbing state is the last square. Everything here is computed from that
+chain instead of by playing games.
+
+States are indexed by square - 1, so square 1 is state 0 and the last square
+(the absorbing state) is state size - 1.
+
+Functions:
+- roll_matrices: Per-roll transition and landing matrices.
+- expected_landings: Expected landings on every square from every start.
+- expected_visits: Expected number of rolls ending on each square.
+- entity_hit_probabilities: Probability of hitting each entity at least once.
+- finish_time_distribution: Distribution of the number of rolls to finish.
+- turn_matrix: Transition matrix of one whole turn, extra rolls included.
+- turn_finish_distribution: Distribution of the number of turns to finish.
+"""
+
+import numpy as np
+
+
+def roll_matrices(compiled):
+    """
+    Build the one-roll matrices of a compiled board.
+
+    Parameters:
+    - compiled (CompiledBoard): The board to analyse.
+
+    Returns:
+    - tuple: (P, L) where P[s, t] is the probability of moving from state s
+      to state t with one roll and L[s, t] is the probability of landing on
+      state t (before any snake or ladder is followed) with that roll.
+    """
+    size = compiled.size
+    p_roll = 1.0 / compiled.dice_sides
+    P = np.zeros((size, size))
+    L = np.zeros((size, size))
+    for square in range(1, size):
+        s = square - 1
+        for roll in range(1, compiled.dice_sides + 1):
+            landing = square + roll
+            if landing > size:
+                # overshooting the last square, token stays in place
+                P[s, s] += p_roll
+                continue
+            L[s, landing - 1] += p_roll
+            for end_pos, probability in compiled.destinations(landing):
+                P[s, end_pos - 1] += p_roll * probability
+    # last square is absorbing
+    P[size - 1, size - 1] = 1.0
+    return P, L
+
+
+def single_roll_matrix(compiled, roll):
+    """
+    Build the transition matrix of one specific dice result.
+
+    Parameters:
+    - compiled (CompiledBoard): The board to analyse.
+    - roll (int): The dice result.
+
+    Returns:
+    - numpy.ndarray: R[s, t], probability that rolling roll moves state s to
+      state t. The absorbing state has an all-zero row.
+    """
+    size = compiled.size
+    R = np.zeros((size, size))
+    for square in range(1, size):
+        landing = square + roll
+        if landing > size:
+            R[square - 1, square - 1] = 1.0
+            continue
+        for end_pos, probability in compiled.destinations(landing):
+            R[square - 1, end_pos - 1] += probability
+    return R
+
+
+def _transient_solve(compiled, P, rhs):
+    """Solve (I - Q) x = rhs over the transient states of the chain."""
+    n = compiled.size - 1
+    Q = P[:n, :n]
+    return np.linalg.solve(np.eye(n) - Q, rhs[:n])
+
+
+def expected_landings(compiled, P=None, L=None):
+    """
+    Get the expected number of landings on each square from every start state.
+
+    Parameters:
+    - compiled (CompiledBoard): The board to analyse.
+    - P (numpy.ndarray, optional): Precomputed transition matrix.
+    - L (numpy.ndarray, optional): Precomputed landing matrix.
+
+    Returns:
+    - numpy.ndarray: X[s, t], expected landings on state t when starting in
+      state s. The row of the absorbing state is zero.
+    """
+    if P is None or L is None:
+        P, L = roll_matrices(compiled)
+    X = np.zeros_like(L)
+    X[:compiled.size - 1] = _transient_solve(compiled, P, L)
+    return X
+
+
+def expected_visits(compiled, P=None):
+    """
+    Get the expected number of times a token is on each square.
+
+    The starting square counts once, then every roll counts once for the square
+    the token ends on, including rolls that were blocked by the board bound.
+
+    Parameters:
+    - compiled (CompiledBoard): The board to analyse.
+    - P (numpy.ndarray, optional): Precomputed transition matrix.
+
+    Returns:
+    - numpy.ndarray: Expected visits indexed by square (length size + 1).
+    """
+    if P is None:
+        P, _ = roll_matrices(compiled)
+    n = compiled.size - 1
+    start = np.zeros(n)
+    start[compiled.start - 1] = 1.0
+    Q = P[:n, :n]
+    visits = np.zeros(compiled.size + 1)
+    visits[1:compiled.size] = np.linalg.solve((np.eye(n) - Q).T, start)
+    visits[compiled.size] = 1.0
+    return visits
+
+
+def entity_hit_probabilities(compiled, X=None):
+    """
+    Get the probability that a game lands on each entity square at least once.
+
+    Uses E[landings on t] = P(hit t) * (1 + E[landings on t after leaving t]),
+    so one multi-RHS solve covers every entity.
+
+    Parameters:
+    - compiled (CompiledBoard): The board to analyse.
+    - X (numpy.ndarray, optional): Precomputed expected_landings matrix.
+
+    Returns:
+    - dict: Map of entity square to hit probability.
+    """
+    if X is None:
+        X = expected_landings(compiled)
+    s0 = compiled.start - 1
+    probabilities = {}
+    for square in compiled.entity_squares():
+        t = square - 1
+        after = sum(probability * X[end_pos - 1, t]
+                    for end_pos, probability in compiled.destinations(square))
+        probabilities[int(square)] = float(X[s0, t] / (1.0 + after))
+    return probabilities
+
+
+def finish_time_distribution(compiled, max_rolls=None, tol=1e-12, P=None):
+    """
+    Get the distribution of the number of rolls a single token needs to finish.
+
+    Parameters:
+    - compiled (CompiledBoard): The board to analyse.
+    - max_rolls (int, optional): Hard cap on the length of the distribution.
+    - tol (float, optional): Stop once the unfinished mass falls below tol.
+    - P (numpy.ndarray, optional): Precomputed transition matrix.
+
+    Returns:
+    - numpy.ndarray: pmf[t], probability of finishing on exactly roll t.
+    """
+    if P is None:
+        P, _ = roll_matrices(compiled)
+    return absorption_time_distribution(P, compiled.start - 1, max_rolls, tol)
+
+
+def absorption_time_distribution(P, start_state, max_steps=None, tol=1e-12):
+    """
+    Get the absorption time pmf of a chain whose last state is absorbing.
+
+    Parameters:
+    - P (numpy.ndarray): Transition matrix, absorbing state last.
+    - start_state (int): The state the chain starts in.
+    - max_steps (int, optional): Hard cap on the length of the distribution.
+    - tol (float, optional): Stop once the unabsorbed mass falls below tol.
+
+    Returns:
+    - numpy.ndarray: pmf[t], probability of being absorbed on exactly step t.
+    """
+    n = P.shape[0] - 1
+    Q = P[:n, :n]
+    to_end = P[:n, n]
+    dist = np.zeros(n)
+    if start_state == n:
+        return np.array([1.0])
+    dist[start_state] = 1.0
+    pmf = [0.0]
+    while dist.sum() > tol and (max_steps is None or len(pmf) <= max_steps):
+        pmf.append(float(dist @ to_end))
+        dist = dist @ Q
+    return np.array(pmf)
+
+
+def turn_matrix(compiled, P=None, six=6, max_sixes=3):
+    """
+    Build the transition matrix of one whole turn of a single player.
+
+    Follows Game.change_turn: rolling a six gives the player one more roll,
+    but the turn passes after max_sixes consecutive sixes. Every roll is still
+    applied to the token, and a player who finishes stops rolling.
+
+    Parameters:
+    - compiled (CompiledBoard): The board to analyse.
+    - P (numpy.ndarray, optional): Precomputed per-roll transition matrix.
+    - six (int, optional): The dice result that earns an extra roll.
+    - max_sixes (int, optional): Consecutive sixes that end the turn.
+
+    Returns:
+    - numpy.ndarray: T[s, t], probability of a turn starting in state s
+      ending in state t.
+    """
+    if P is None:
+        P, _ = roll_matrices(compiled)
+    if six > compiled.dice_sides:
+        # the dice can not roll a six, every turn is a single roll
+        return P
+    P6 = single_roll_matrix(compiled, six) / compiled.dice_sides
+    Pn = P - P6
+    # Pn ends the turn, P6 continues it; the last allowed six ends it too
+    T = P.copy()
+    for _ in range(max_sixes - 1):
+        T = Pn + P6 @ T
+    return T
+
+
+def turn_finish_distribution(compiled, max_turns=None, tol=1e-12, T=None):
+    """
+    Get the distribution of the number of turns a single player needs to finish.
+
+    Parameters:
+    - compiled (CompiledBoard): The board to analyse.
+    - max_turns (int, optional): Hard cap on the length of the distribution.
+    - tol (float, optional): Stop once the unfinished mass falls below tol.
+    - T (numpy.ndarray, optional): Precomputed turn_matrix.
+
+    Returns:
+    - numpy.ndarray: pmf[t], probability of finishing on exactly turn t.
+    """
+    if T is None:
+        T = turn_matrix(compiled)
+    return absorption_time_distribution(T, compiled.start - 1, max_turns, tol)
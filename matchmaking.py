@@ -0,0 +1,302 @@
+"""
+Matchmaking queue that groups waiting players into game tables.
+
+Waiting players are kept in a RatingIndex (see tournament): rating buckets
+counted by a Fenwick tree, so joining and leaving the queue cost O(log n)
+and the number of players in any rating window is two prefix sums. Matching
+is oldest first: the longest waiting player anchors a table, its rating
+window widens with the time it has waited, and when the window holds enough
+players the table is filled with the players nearest in rating, walking
+outwards bucket by bucket and oldest first within a bucket. Empty buckets
+are skipped with Fenwick searches, so filling a table costs O(table size
+log n) whatever the number of buckets.
+
+match() forms every table it can in one pass and create_games() turns a
+batch of tables into Game instances at once. simulate() drives the queue
+with Poisson arrivals in simulated time and reports time-to-table
+percentiles together with the wall-clock join rate the queue sustained.
+
+Classes:
+- MatchQueue: The waiting players and the matching rules.
+
+Functions:
+- create_games: Initialize a Game for every table of a batch.
+- simulate: Measure time-to-table and throughput under an arrival rate.
+"""
+
+import time
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
+from tournament import RatingIndex
+from updated_Code import Game
+
+
+class MatchQueue:
+    """
+    Players waiting for a table, grouped by rating.
+
+    Attributes:
+    - table_size: Players per table.
+    - base_window: Rating distance accepted as soon as a player joins.
+    - widen_rate: Rating distance added per second of waiting.
+    - max_window: Largest rating distance ever accepted, None for no limit.
+    - scan: Most anchors one match() call tries, None for the whole queue.
+    """
+
+    def __init__(self, table_size, base_window=50.0, widen_rate=100.0,
+                 max_window=None, bucket_width=10.0, min_rating=0.0,
+                 max_rating=4000.0, scan=10000, clock=time.monotonic):
+        """
+        Initialize a MatchQueue object.
+
+        Parameters:
+        - table_size (int): Players per table, the num_players of the games.
+        - base_window (float, optional): Rating distance accepted at once.
+        - widen_rate (float, optional): Rating distance added per second waited.
+        - max_window (float, optional): Cap of the rating distance.
+        - bucket_width (float, optional): Rating range of one bucket.
+        - min_rating (float, optional): Lowest rating with its own bucket.
+        - max_rating (float, optional): Highest rating with its own bucket.
+        - scan (int, optional): Most anchors one match() call tries, which
+          bounds its work; None tries every waiting player once.
+        - clock (callable, optional): Source of the current time in seconds.
+        """
+        self.table_size = table_size
+        self.base_window = base_window
+        self.widen_rate = widen_rate
+        self.max_window = max_window
+        self.scan = scan
+        self.clock = clock
+        self.index = RatingIndex(min_rating, max_rating, bucket_width)
+        self._joined = {}
+        # (join time, player), oldest first except for anchors that failed to
+        # fill a table, which go to the back; entries of players that left or
+        # were matched are skipped when they reach the front
+        self._order = deque()
+
+    def __len__(self):
+        return len(self._joined)
+
+    def __contains__(self, player):
+        return player in self._joined
+
+    def join(self, player, rating, now=None):
+        """
+        Add a player to the queue.
+
+        Parameters:
+        - player (hashable): The player identifier.
+        - rating (float): The player's rating.
+        - now (float, optional): Join time, the clock by default.
+        """
+        if player in self._joined:
+            raise ValueError(f"{player!r} is already waiting")
+        now = self.clock() if now is None else now
+        self.index.add(player, rating)
+        self._joined[player] = now
+        self._order.append((now, player))
+
+    def leave(self, player):
+        """Remove a waiting player from the queue."""
+        del self._joined[player]
+        self.index.remove(player)
+
+    def window(self, waited):
+        """
+        Get the rating distance accepted after waiting.
+
+        Parameters:
+        - waited (float): Seconds waited.
+
+        Returns:
+        - float: The accepted distance from the player's rating.
+        """
+        window = self.base_window + self.widen_rate * waited
+        return window if self.max_window is None else min(window, self.max_window)
+
+    def _next_bucket(self, bucket, last):
+        """First non-empty bucket in bucket..last, or None."""
+        if bucket > last:
+            return None
+        counts = self.index.counts
+        before = counts.prefix(bucket - 1) if bucket > 0 else 0
+        if before == len(self.index):
+            return None
+        found = counts.find(before + 1)
+        return found if found <= last else None
+
+    def _prev_bucket(self, bucket, first):
+        """Last non-empty bucket in first..bucket, or None."""
+        if bucket < first:
+            return None
+        through = self.index.counts.prefix(bucket)
+        if through == 0:
+            return None
+        found = self.index.counts.find(through)
+        return found if found >= first else None
+
+    def _fill(self, anchor, window):
+        """Get a full table around anchor within window, or None."""
+        index = self.index
+        rating = index.ratings[anchor]
+        low = index._bucket(rating - window)
+        high = index._bucket(rating + window)
+        counts = index.counts
+        inside = counts.prefix(high) - (counts.prefix(low - 1) if low > 0 else 0)
+        if inside < self.table_size:
+            return None
+        center = index._bucket(rating)
+        table = [anchor]
+        table.extend(islice((p for p in index.buckets[center] if p != anchor),
+                            self.table_size - 1))
+        below = self._prev_bucket(center - 1, low)
+        above = self._next_bucket(center + 1, high)
+        while len(table) < self.table_size:
+            if above is not None and (below is None or above - center <= center - below):
+                bucket, above = above, self._next_bucket(above + 1, high)
+            else:
+                bucket, below = below, self._prev_bucket(below - 1, low)
+            table.extend(islice(index.buckets[bucket], self.table_size - len(table)))
+        return table
+
+    def match(self, now=None):
+        """
+        Form every table the current queue allows, oldest players first.
+
+        Every waiting player is tried as an anchor at most once per call and
+        at most scan anchors are tried. A player who can not fill a table
+        goes to the back of the order, so players that can never be matched
+        (a max_window with nobody near them) do not hold up the players
+        behind them, and the next call starts with players not tried yet.
+
+        Parameters:
+        - now (float, optional): The current time, the clock by default.
+
+        Returns:
+        - list: Tables, each a list of table_size players; they have left
+          the queue.
+        """
+        now = self.clock() if now is None else now
+        tables = []
+        attempts = len(self._order)
+        if self.scan is not None:
+            attempts = min(attempts, self.scan)
+        for _ in range(attempts):
+            if len(self._joined) < self.table_size:
+                break
+            joined, player = self._order.popleft()
+            if self._joined.get(player) != joined:
+                continue
+            table = self._fill(player, self.window(now - joined))
+            if table is None:
+                self._order.append((joined, player))
+                continue
+            for seated in table:
+                self.leave(seated)
+            tables.append(table)
+        return tables
+
+
+def create_games(tables, board, dice_sides, game_class=Game):
+    """
+    Initialize one game for every table of a batch.
+
+    Parameters:
+    - tables (list): Tables returned by MatchQueue.match.
+    - board (Board): The board every game is played on.
+    - dice_sides (int): The number of sides in the dice.
+    - game_class (type, optional): Game or a subclass such as PersistentGame
+      constructed without arguments.
+
+    Returns:
+    - list: (table, game) pairs; seat i of the game is table[i].
+    """
+    games = []
+    for table in tables:
+        game = game_class()
+        game.initialize_game(board, dice_sides, len(table))
+        games.append((table, game))
+    return games
+
+
+def simulate(rate, duration, table_size=4, tick=0.05, rating_mean=1500.0,
+             rating_sd=300.0, target_p99=None, board=None, dice_sides=6,
+             seed=None, **queue_options):
+    """
+    Drive a MatchQueue with Poisson arrivals in simulated time.
+
+    Arrivals join at their own arrival times; every tick the queue is
+    matched and, with a board, the tables are turned into games. Waits are
+    measured on the simulated clock, throughput on the wall clock.
+
+    Parameters:
+    - rate (float): Arrivals per simulated second.
+    - duration (float): Simulated seconds.
+    - table_size (int, optional): Players per table.
+    - tick (float, optional): Simulated seconds between match() calls.
+    - rating_mean (float, optional): Mean rating of arriving players.
+    - rating_sd (float, optional): Standard deviation of their ratings.
+    - target_p99 (float, optional): Target p99 time-to-table in seconds.
+    - board (Board, optional): Create a Game for every table on this board.
+    - dice_sides (int, optional): Dice sides of the created games.
+    - seed (int, optional): Seed for arrivals and ratings.
+    - queue_options: Keyword arguments passed on to MatchQueue.
+
+    Returns:
+    - dict: joins, tables, waiting, p50/p99/max time-to-table in seconds,
+      mean rating spread of a table, joins_per_second sustained on the wall
+      clock, and target_met when target_p99 is given.
+    """
+    rng = np.random.default_rng(seed)
+    count = rng.poisson(rate * duration)
+    arrivals = np.sort(rng.uniform(0.0, duration, count)).tolist()
+    ratings = rng.normal(rating_mean, rating_sd, count).tolist()
+    queue = MatchQueue(table_size, **queue_options)
+    waits = []
+    spreads = []
+    tables_formed = 0
+    next_arrival = 0
+    started = time.perf_counter()
+    for step in range(1, int(np.ceil(duration / tick)) + 1):
+        now = step * tick
+        while next_arrival < count and arrivals[next_arrival] <= now:
+            queue.join(next_arrival, ratings[next_arrival], arrivals[next_arrival])
+            next_arrival += 1
+        tables = queue.match(now)
+        if board is not None:
+            create_games(tables, board, dice_sides)
+        tables_formed += len(tables)
+        for table in tables:
+            waits.extend(now - arrivals[player] for player in table)
+            seated = [ratings[player] for player in table]
+            spreads.append(max(seated) - min(seated))
+    elapsed = time.perf_counter() - started
+    waits = np.array(waits) if waits else np.zeros(1)
+    report = {
+        "joins": count,
+        "tables": tables_formed,
+        "waiting": len(queue),
+        "p50_wait": float(np.percentile(waits, 50)),
+        "p99_wait": float(np.percentile(waits, 99)),
+        "max_wait": float(waits.max()),
+        "mean_spread": float(np.mean(spreads)) if spreads else 0.0,
+        "joins_per_second": count / elapsed if elapsed else float("inf"),
+    }
+    if target_p99 is not None:
+        report["target_met"] = report["p99_wait"] <= target_p99
+    return report
+
+
+if __name__ == "__main__":
+    from updated_Code import BoardSetup
+
+    for rate in (1000, 20000, 50000):
+        report = simulate(rate, duration=10.0, board=BoardSetup.setup(),
+                          target_p99=1.0, seed=1)
+        print(f"{rate} joins/s: p99 time-to-table {report['p99_wait']:.2f}s,"
+              f" mean spread {report['mean_spread']:.0f},"
+              f" sustained {report['joins_per_second']:.0f} joins/s,"
+              f" target met: {report['target_met']}")
@@ -0,0 +1,320 @@
+"""
+Opt-in memory instrumentation and a memory budget for long simulation runs.
+
+MemoryProfiler samples tracemalloc and attributes every traced allocation to
+a subsystem (board, players, RNG buffers, result aggregation) by the source
+lines of the classes and functions that make it up, taking the innermost
+frame of the allocation that belongs to any subsystem. It reports peak and
+steady-state usage and the growth per million games, which is the number
+that exposes a slow leak. Snapshots only see what is held when a batch
+ends, so the peak is tracemalloc's own high-water mark, reset after every
+sample; it is known for the traced total only, not per subsystem.
+
+MemoryBudget watches the process and, before the process runs out of memory,
+first calls registered flush callbacks (e.g. writing results to disk) and
+then shrinks the batch size used by the caller. run_guarded ties both into a
+batch loop.
+
+Classes:
+- MemoryProfiler: Per-subsystem tracemalloc sampling.
+- MemoryBudget: Flushes and batch-size control under a memory limit.
+
+Functions:
+- run_guarded: Play games in batches under a profiler and a budget.
+"""
+
+import inspect
+import os
+import statistics
+import tracemalloc
+
+import compiled_board
+import finish_order
+import headless
+import markov
+import occupancy
+import replay
+import simulator
+import tournament
+import updated_Code
+
+
+def default_subsystems():
+    """
+    Get the code that makes up each subsystem.
+
+    Returns:
+    - dict: Map of subsystem name to a list of modules, classes or functions.
+    """
+    return {
+        "board": [compiled_board, markov, updated_Code.Board,
+                  updated_Code.MovingEntity, updated_Code.Snake,
+                  updated_Code.Ladder, updated_Code.Wormhole,
+                  updated_Code.ConditionalLadder, updated_Code.ReturnToStart],
+        "players": [updated_Code.GamePlayer, updated_Code.Game,
+                    headless.HeadlessGame, simulator.GameBatch,
+                    simulator.simulate_tokens],
+        "rng": [updated_Code.Dice, headless.HeadlessGame.roll,
+                simulator.roll_dice, simulator._pick_branch],
+        "aggregation": [occupancy, finish_order, replay, tournament,
+                        simulator.TokenRun],
+    }
+
+
+def _source_ranges(objects):
+    """Get (filename, first line, last line) of every module, class or function."""
+    ranges = []
+    for obj in objects:
+        filename = os.path.abspath(inspect.getsourcefile(obj))
+        if inspect.ismodule(obj):
+            ranges.append((filename, 0, float("inf")))
+            continue
+        lines, first = inspect.getsourcelines(obj)
+        ranges.append((filename, first, first + len(lines) - 1))
+    return ranges
+
+
+class MemoryProfiler:
+    """
+    Samples tracemalloc and attributes traced memory to subsystems.
+
+    Attributes:
+    - samples: List of (games played, {subsystem: bytes}) pairs.
+    - peaks: Peak traced bytes between consecutive samples.
+    """
+
+    def __init__(self, subsystems=None, frames=25):
+        """
+        Initialize a MemoryProfiler object.
+
+        Parameters:
+        - subsystems (dict, optional): Map of subsystem name to modules,
+          classes or functions; default_subsystems() by default.
+        - frames (int, optional): Traceback depth stored per allocation.
+        """
+        if subsystems is None:
+            subsystems = default_subsystems()
+        # narrowest ranges first, so a function wins over its module
+        self._ranges = sorted(
+            ((filename, first, last, name)
+             for name, objects in subsystems.items()
+             for filename, first, last in _source_ranges(objects)),
+            key=lambda item: item[2] - item[1])
+        self.names = list(subsystems) + ["other"]
+        self.frames = frames
+        self.samples = []
+        self.peaks = []
+        self._cache = {}
+        self._started = False
+
+    def start(self):
+        """Start tracing allocations, unless something else already traces them."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+        tracemalloc.reset_peak()
+
+    def stop(self):
+        """Stop tracing allocations if start() started it."""
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def _subsystem(self, filename, lineno):
+        key = (filename, lineno)
+        if key not in self._cache:
+            name = None
+            for range_file, first, last, range_name in self._ranges:
+                if range_file == filename and first <= lineno <= last:
+                    name = range_name
+                    break
+            self._cache[key] = name
+        return self._cache[key]
+
+    def sample(self, games_played):
+        """
+        Record the memory currently held by each subsystem, and the peak
+        traced since the previous sample.
+
+        Parameters:
+        - games_played (int): Games played so far, the x axis of the report.
+
+        Returns:
+        - dict: Map of subsystem name to bytes.
+        """
+        usage = dict.fromkeys(self.names, 0)
+        self.peaks.append(tracemalloc.get_traced_memory()[1])
+        snapshot = tracemalloc.take_snapshot()
+        # the snapshot itself is traced, start the next peak after it
+        tracemalloc.reset_peak()
+        for stat in snapshot.statistics("traceback"):
+            name = "other"
+            # tracebacks are stored innermost frame last
+            for frame in reversed(stat.traceback):
+                found = self._subsystem(os.path.abspath(frame.filename), frame.lineno)
+                if found is not None:
+                    name = found
+                    break
+            usage[name] += stat.size
+        self.samples.append((games_played, usage))
+        return usage
+
+    def report(self):
+        """
+        Summarise the samples per subsystem.
+
+        Steady state is the median of the second half of the samples; growth
+        is the least-squares slope of usage against games played.
+
+        Returns:
+        - dict: Map of subsystem name to a dict with max_sampled_bytes,
+          steady_bytes and growth_bytes_per_million_games, and "total" with
+          peak_bytes, the most memory traced at any moment, instead of
+          max_sampled_bytes.
+        """
+        result = {}
+        if not self.samples:
+            return result
+        games = [played for played, _ in self.samples]
+        for name in self.names:
+            values = [usage[name] for _, usage in self.samples]
+            result[name] = dict(max_sampled_bytes=max(values),
+                                **_trend(games, values))
+        totals = [sum(usage.values()) for _, usage in self.samples]
+        result["total"] = dict(peak_bytes=max(self.peaks), **_trend(games, totals))
+        return result
+
+
+def _trend(games, values):
+    """Steady-state usage and growth per million games of a series of samples."""
+    tail = values[len(values) // 2:]
+    return {"steady_bytes": statistics.median(tail),
+            "growth_bytes_per_million_games": _slope(games, values) * 1e6}
+
+
+def _slope(xs, ys):
+    """Least-squares slope of ys against xs, 0 when undefined."""
+    if len(xs) < 2:
+        return 0.0
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    var = sum((x - mean_x) ** 2 for x in xs)
+    if var == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var
+
+
+def current_rss():
+    """
+    Get the resident memory of this process in bytes.
+
+    Falls back to the memory traced by tracemalloc where /proc is missing.
+
+    Returns:
+    - int: Resident set size in bytes.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return tracemalloc.get_traced_memory()[0]
+
+
+class MemoryBudget:
+    """
+    Keeps a run under a memory limit by flushing and shrinking batches.
+
+    Attributes:
+    - limit: The memory limit in bytes.
+    - flushes: Number of times the flush callbacks were run.
+    - shrinks: Number of times the batch size was reduced.
+    """
+
+    def __init__(self, limit, soft_fraction=0.8, min_batch=1, measure=current_rss):
+        """
+        Initialize a MemoryBudget object.
+
+        Parameters:
+        - limit (int): The memory limit in bytes.
+        - soft_fraction (float, optional): Fraction of the limit at which the
+          budget starts flushing and shrinking.
+        - min_batch (int, optional): Smallest batch size it shrinks to.
+        - measure (callable, optional): Returns current usage in bytes.
+        """
+        self.limit = limit
+        self.soft_limit = limit * soft_fraction
+        self.min_batch = min_batch
+        self.measure = measure
+        self.flushes = 0
+        self.shrinks = 0
+        self._callbacks = []
+
+    def on_flush(self, callback):
+        """Register a callable that releases memory, e.g. by writing results out."""
+        self._callbacks.append(callback)
+
+    def adjust(self, batch_size, max_batch=None):
+        """
+        Get the batch size to use next given current memory usage.
+
+        Above the soft limit the flush callbacks run first; if that is not
+        enough the batch size is halved. Well below the soft limit the batch
+        size doubles back up to max_batch.
+
+        Parameters:
+        - batch_size (int): The batch size used so far.
+        - max_batch (int, optional): Largest batch size to grow back to.
+
+        Returns:
+        - int: The batch size to use next.
+
+        Raises:
+        - MemoryError: If usage is over the limit at the smallest batch size.
+        """
+        usage = self.measure()
+        if usage > self.soft_limit and self._callbacks:
+            for callback in self._callbacks:
+                callback()
+            self.flushes += 1
+            usage = self.measure()
+        if usage > self.soft_limit:
+            if batch_size <= self.min_batch and usage > self.limit:
+                raise MemoryError(f"memory usage {usage} over budget {self.limit}")
+            self.shrinks += 1
+            return max(batch_size // 2, self.min_batch)
+        if usage < self.soft_limit / 2 and max_batch is not None:
+            return min(batch_size * 2, max_batch)
+        return batch_size
+
+
+def run_guarded(play_batch, total_games, batch_size, budget=None, profiler=None):
+    """
+    Play total_games in batches, sampling memory and respecting a budget.
+
+    Parameters:
+    - play_batch (callable): Plays the number of games it is given.
+    - total_games (int): The number of games to play.
+    - batch_size (int): The initial and largest batch size.
+    - budget (MemoryBudget, optional): Budget that adjusts the batch size.
+    - profiler (MemoryProfiler, optional): Profiler sampled after each batch.
+
+    Returns:
+    - int: The number of games played.
+    """
+    max_batch = batch_size
+    played = 0
+    if profiler is not None:
+        profiler.start()
+    try:
+        while played < total_games:
+            size = min(batch_size, total_games - played)
+            play_batch(size)
+            played += size
+            if profiler is not None:
+                profiler.sample(played)
+            if budget is not None:
+                batch_size = budget.adjust(batch_size, max_batch)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+    return played
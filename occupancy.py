@@ -0,0 +1,101 @@
+"""
+Per-square occupancy statistics for a board.
+
+Collects the expected visits to every square, the landing distribution and the
+snake-bite / ladder-climb statistics of every entity into plain arrays, either
+solved exactly from the board's Markov chain or accumulated by the vectorized
+simulator. BoardDrawer.draw_heatmap renders any of the arrays on the board.
+
+Classes:
+- OccupancyMap: Per-square arrays for one board.
+"""
+
+import numpy as np
+
+import markov
+from simulator import simulate_tokens
+
+
+class OccupancyMap:
+    """
+    Per-square occupancy statistics of a single token on a board.
+
+    All arrays are indexed by square number and have size + 1 entries.
+
+    Attributes:
+    - compiled: The CompiledBoard the statistics belong to.
+    - visits: Expected number of times the token is on each square.
+    - landings: Expected number of landings on each square per game.
+    - landing_distribution: landings normalised to sum to 1.
+    - entity_hits: Expected hits per game of each entity square.
+    - entity_hit_probability: Probability of hitting each entity square at
+      least once in a game.
+    - method: "exact" or "simulated".
+    """
+
+    def __init__(self, compiled, visits, landings, entity_hit_probability,
+                 method):
+        self.compiled = compiled
+        self.visits = visits
+        self.landings = landings
+        total = landings.sum()
+        self.landing_distribution = landings / total if total else landings
+        self.entity_hits = np.where(compiled.kind != 0, landings, 0.0)
+        self.entity_hit_probability = np.zeros(compiled.size + 1)
+        for square, probability in entity_hit_probability.items():
+            self.entity_hit_probability[square] = probability
+        self.method = method
+
+    @classmethod
+    def exact(cls, compiled):
+        """
+        Solve the statistics from the board's transition structure.
+
+        Parameters:
+        - compiled (CompiledBoard): The board to analyse.
+
+        Returns:
+        - OccupancyMap: Exact statistics.
+        """
+        P, L = markov.roll_matrices(compiled)
+        X = markov.expected_landings(compiled, P, L)
+        landings = np.zeros(compiled.size + 1)
+        landings[1:] = X[compiled.start - 1]
+        visits = markov.expected_visits(compiled, P)
+        hit_probability = markov.entity_hit_probabilities(compiled, X)
+        return cls(compiled, visits, landings, hit_probability, "exact")
+
+    @classmethod
+    def simulated(cls, compiled, n_games=100000, seed=None):
+        """
+        Estimate the statistics with the vectorized simulator.
+
+        Parameters:
+        - compiled (CompiledBoard): The board to play on.
+        - n_games (int, optional): Number of games to simulate.
+        - seed (int, optional): Seed for the simulator.
+
+        Returns:
+        - OccupancyMap: Simulated statistics averaged per game.
+        """
+        run = simulate_tokens(compiled, n_games, seed=seed)
+        hit_probability = {square: count / n_games
+                           for square, count in run.hit_games.items()}
+        return cls(compiled, run.visits / n_games, run.landings / n_games,
+                   hit_probability, "simulated")
+
+    def entity_table(self):
+        """
+        Get the per-entity statistics.
+
+        Returns:
+        - list: (square, end square, kind, expected hits, hit probability)
+          tuples sorted by square.
+        """
+        rows = []
+        for square in self.compiled.entity_squares():
+            rows.append((int(square), int(self.compiled.dest[square]),
+                         int(self.compiled.kind[square]),
+                         float(self.entity_hits[square]),
+                         float(self.entity_hit_probability[square])))
+        return rows
@@ -0,0 +1,462 @@
+"""
+Durable game-event log in SQLite with group commit.
+
+Every roll played by a PersistentGame is written to a SQLite database in WAL
+mode. Rolls are queued to a single writer thread that commits them in
+batches: a batch is closed when it holds max_batch events or max_delay
+seconds after its first event, so one fsync covers every roll that arrived in
+the window, from any number of games. A roll is acknowledged (the game moves
+on) only once its batch is committed, which bounds the latency of a roll by
+max_delay plus one commit. When a batch fails, its statements are retried
+one at a time, so a bad statement only fails itself: the other statements of
+the batch are committed and only a caller waiting on the bad one gets the
+error.
+
+After a restart, unfinished games are found from the log and restored to the
+state after their last committed roll.
+
+Games played with audited dice (see dice_audit) also log their dice
+commitment, the links of their roll hash chain and, once the game is over,
+the revealed server seed. The seed is not stored before it is revealed, so
+these games can not be restored.
+
+Classes:
+- GameEventStore: The database, its writer thread and the query API.
+- PersistentGame: Game that records every roll and its result in a store.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+from updated_Code import Game
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    board_size INTEGER NOT NULL,
+    dice_sides INTEGER NOT NULL,
+    num_players INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS game_players (
+    game_id TEXT NOT NULL,
+    seat INTEGER NOT NULL,
+    player_id TEXT NOT NULL,
+    rank INTEGER,
+    PRIMARY KEY (game_id, seat)
+);
+CREATE INDEX IF NOT EXISTS game_players_by_player ON game_players (player_id);
+CREATE TABLE IF NOT EXISTS turns (
+    game_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    seat INTEGER NOT NULL,
+    roll INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    next_turn INTEGER NOT NULL,
+    consecutive_six INTEGER NOT NULL,
+    PRIMARY KEY (game_id, seq)
+);
+CREATE TABLE IF NOT EXISTS dice_commitments (
+    game_id TEXT PRIMARY KEY,
+    commitment TEXT NOT NULL,
+    client_seed TEXT NOT NULL,
+    chain_batch INTEGER NOT NULL,
+    server_seed TEXT
+);
+CREATE TABLE IF NOT EXISTS dice_chain (
+    game_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (game_id, seq)
+);
+"""
+
+_INSERT_GAME = "INSERT INTO games VALUES (?, ?, ?, ?, ?, NULL)"
+_INSERT_PLAYER = "INSERT INTO game_players VALUES (?, ?, ?, NULL)"
+_INSERT_TURN = "INSERT INTO turns VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+_FINISH_GAME = "UPDATE games SET finished_at = ? WHERE game_id = ?"
+_SET_RANK = "UPDATE game_players SET rank = ? WHERE game_id = ? AND seat = ?"
+_INSERT_COMMITMENT = "INSERT INTO dice_commitments VALUES (?, ?, ?, ?, NULL)"
+_INSERT_LINK = "INSERT INTO dice_chain VALUES (?, ?, ?)"
+_REVEAL_SEED = "UPDATE dice_commitments SET server_seed = ? WHERE game_id = ?"
+
+
+class GameEventStore:
+    """
+    SQLite-backed event log written by one group-committing thread.
+
+    Attributes:
+    - path: The database file.
+    - commits: Number of transactions committed so far.
+    - error: The sqlite3.Error of the last statement that failed, if any;
+      only a caller waiting on that statement has it raised.
+    """
+
+    def __init__(self, path, max_batch=1000, max_delay=0.005):
+        """
+        Open (or create) the database and start the writer thread.
+
+        Parameters:
+        - path (str): The database file.
+        - max_batch (int, optional): Most statements committed together.
+        - max_delay (float, optional): Longest time in seconds a statement
+          waits for its batch to fill.
+        """
+        self.path = path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.commits = 0
+        self.error = None
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.close()
+        self._queue = queue.Queue()
+        self._committed = 0
+        self._submitted = 0
+        # tickets somebody waits on, and the errors of those that failed
+        self._waiting = set()
+        self._errors = {}
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # FULL fsyncs the WAL on every commit, so committed rolls are durable
+        conn.execute("PRAGMA synchronous=FULL")
+        return conn
+
+    def _submit(self, sql, params, wait):
+        with self._lock:
+            self._submitted += 1
+            ticket = self._submitted
+            if wait:
+                self._waiting.add(ticket)
+            self._queue.put((ticket, sql, params))
+            if wait:
+                while self._committed < ticket:
+                    self._done.wait()
+                self._waiting.discard(ticket)
+                error = self._errors.pop(ticket, None)
+                if error is not None:
+                    raise error
+        return ticket
+
+    def _commit(self, conn, batch):
+        """Commit a batch; return the (ticket, error) of failed statements."""
+        try:
+            with conn:
+                for _, sql, params in batch:
+                    conn.execute(sql, params)
+            self.commits += 1
+            return []
+        except sqlite3.Error:
+            if len(batch) == 1:
+                raise
+        # the batch was rolled back: retry one by one to find the bad ones
+        failed = []
+        for item in batch:
+            try:
+                failed.extend(self._commit(conn, [item]))
+            except sqlite3.Error as exc:
+                failed.append((item[0], exc))
+        return failed
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            try:
+                failed = self._commit(conn, batch)
+            except sqlite3.Error as exc:
+                failed = [(batch[0][0], exc)]
+            with self._lock:
+                for ticket, exc in failed:
+                    self.error = exc
+                    if ticket in self._waiting:
+                        self._errors[ticket] = exc
+                self._committed = batch[-1][0]
+                self._done.notify_all()
+        conn.close()
+
+    def start_game(self, player_ids, board_size, dice_sides, wait=False):
+        """
+        Record a new game.
+
+        Parameters:
+        - player_ids (list): Identifier of the player in every seat.
+        - board_size (int): The size of the board.
+        - dice_sides (int): The number of sides in the dice.
+        - wait (bool, optional): Block until the game is committed.
+
+        Returns:
+        - str: The new game id.
+        """
+        game_id = uuid.uuid4().hex
+        self._submit(_INSERT_GAME, (game_id, board_size, dice_sides,
+                                    len(player_ids), time.time()), False)
+        for seat, player_id in enumerate(player_ids):
+            self._submit(_INSERT_PLAYER, (game_id, seat, str(player_id)), False)
+        if wait:
+            self.flush()
+        return game_id
+
+    def record_turn(self, game_id, seq, seat, roll, position, rank, next_turn,
+                    consecutive_six, wait=True):
+        """
+        Record one roll.
+
+        Parameters:
+        - game_id (str): The game the roll belongs to.
+        - seq (int): Number of the roll within the game, starting at 1.
+        - seat (int): The seat that rolled.
+        - roll (int): The dice result.
+        - position (int): The token's position after the roll.
+        - rank (int): The token's rank after the roll, -1 while playing.
+        - next_turn (int): Game.turn after the turn change.
+        - consecutive_six (int): Game.consecutive_six after the turn change.
+        - wait (bool, optional): Block until the roll is committed.
+        """
+        self._submit(_INSERT_TURN, (game_id, seq, seat, roll, position, rank,
+                                    next_turn, consecutive_six), wait)
+
+    def finish_game(self, game_id, ranks, wait=True):
+        """
+        Record the final ranks of a game.
+
+        Parameters:
+        - game_id (str): The finished game.
+        - ranks (list): Rank of every seat.
+        - wait (bool, optional): Block until the result is committed.
+        """
+        for seat, rank in enumerate(ranks):
+            self._submit(_SET_RANK, (rank, game_id, seat), False)
+        self._submit(_FINISH_GAME, (time.time(), game_id), wait)
+
+    def commit_dice(self, game_id, commitment, client_seed, chain_batch, wait=False):
+        """
+        Record the commitment to a game's server seed.
+
+        Parameters:
+        - game_id (str): The game.
+        - commitment (str): Hex hash of the server seed.
+        - client_seed (str): Hex client seed mixed into the rolls.
+        - chain_batch (int): Rolls per link of the game's roll hash chain.
+        - wait (bool, optional): Block until the commitment is committed.
+        """
+        self._submit(_INSERT_COMMITMENT, (game_id, commitment, client_seed,
+                                          chain_batch), wait)
+
+    def record_chain_link(self, game_id, seq, digest, wait=False):
+        """
+        Record one link of a game's roll hash chain.
+
+        Parameters:
+        - game_id (str): The game.
+        - seq (int): The last roll covered by the link.
+        - digest (str): Hex chain head after that roll.
+        - wait (bool, optional): Block until the link is committed.
+        """
+        self._submit(_INSERT_LINK, (game_id, seq, digest), wait)
+
+    def reveal_dice(self, game_id, server_seed, wait=True):
+        """
+        Record the revealed server seed of a finished game.
+
+        Parameters:
+        - game_id (str): The game.
+        - server_seed (str): The hex server seed.
+        - wait (bool, optional): Block until the seed is committed.
+        """
+        self._submit(_REVEAL_SEED, (server_seed, game_id), wait)
+
+    def flush(self):
+        """Block until everything submitted so far is committed."""
+        with self._lock:
+            ticket = self._submitted
+            while self._committed < ticket:
+                self._done.wait()
+
+    def close(self):
+        """Commit everything pending and stop the writer thread."""
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+
+    def _read(self, sql, params=()):
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def games_for_player(self, player_id):
+        """
+        Get the games a player took part in, most recent first.
+
+        Parameters:
+        - player_id: The player identifier.
+
+        Returns:
+        - list: (game_id, seat, rank, started_at, finished_at) tuples; rank
+          and finished_at are None for unfinished games.
+        """
+        return self._read(
+            "SELECT g.game_id, p.seat, p.rank, g.started_at, g.finished_at "
+            "FROM game_players p JOIN games g ON g.game_id = p.game_id "
+            "WHERE p.player_id = ? ORDER BY g.started_at DESC",
+            (str(player_id),))
+
+    def turns(self, game_id):
+        """
+        Get every recorded roll of a game in order.
+
+        Returns:
+        - list: (seq, seat, roll, position, rank, next_turn, consecutive_six)
+          tuples.
+        """
+        return self._read(
+            "SELECT seq, seat, roll, position, rank, next_turn, consecutive_six "
+            "FROM turns WHERE game_id = ? ORDER BY seq", (game_id,))
+
+    def dice_audit(self, game_id):
+        """
+        Get the dice audit records of a game.
+
+        Returns:
+        - tuple: (commitment, client_seed, server_seed, chain_batch, links),
+          server_seed None until revealed and links a list of (seq, digest);
+          None for games not played with audited dice.
+        """
+        rows = self._read(
+            "SELECT commitment, client_seed, server_seed, chain_batch "
+            "FROM dice_commitments WHERE game_id = ?", (game_id,))
+        if not rows:
+            return None
+        links = self._read("SELECT seq, digest FROM dice_chain WHERE game_id = ? "
+                           "ORDER BY seq", (game_id,))
+        return rows[0] + (links,)
+
+    def unfinished_games(self):
+        """
+        Get the games that have no recorded result, e.g. after a crash.
+
+        Returns:
+        - list: Game ids.
+        """
+        return [row[0] for row in self._read(
+            "SELECT game_id FROM games WHERE finished_at IS NULL "
+            "ORDER BY started_at")]
+
+    def restore_game(self, game_id, board):
+        """
+        Rebuild an unfinished game from its log.
+
+        Parameters:
+        - game_id (str): The game to restore.
+        - board (Board): The board the game was played on.
+
+        Returns:
+        - PersistentGame: The game in the state after its last committed roll.
+
+        Raises:
+        - ValueError: The game was played with audited dice, whose server
+          seed died with the process.
+        """
+        if self._read("SELECT 1 FROM dice_commitments WHERE game_id = ?", (game_id,)):
+            raise ValueError(f"game {game_id} has audited dice and can not be resumed")
+        dice_sides, num_players = self._read(
+            "SELECT dice_sides, num_players FROM games WHERE game_id = ?",
+            (game_id,))[0]
+        player_ids = [row[0] for row in self._read(
+            "SELECT player_id FROM game_players WHERE game_id = ? ORDER BY seat",
+            (game_id,))]
+        game = PersistentGame(self, player_ids)
+        game.game_id = game_id
+        Game.initialize_game(game, board, dice_sides, num_players)
+        for seq, seat, _, position, rank, next_turn, consecutive_six in self.turns(game_id):
+            game.players[seat].set_position(position)
+            game.players[seat].set_rank(rank)
+            game.turn = next_turn
+            game.consecutive_six = consecutive_six
+            game.seq = seq
+        game.last_rank = max(p.get_rank() for p in game.players)
+        game.last_rank = max(game.last_rank, 0)
+        return game
+
+
+class PersistentGame(Game):
+    """
+    Game that durably records every roll and its final result.
+
+    Attributes:
+    - store: The GameEventStore written to.
+    - player_ids: Identifier of the player in every seat.
+    - game_id: Id of the game in the store.
+    - seq: Number of rolls recorded so far.
+    """
+
+    def __init__(self, store, player_ids=None):
+        """
+        Initialize a PersistentGame object.
+
+        Parameters:
+        - store (GameEventStore): Where the game is recorded.
+        - player_ids (list, optional): Player identifiers per seat, seat
+          numbers by default.
+        """
+        super(PersistentGame, self).__init__()
+        self.store = store
+        self.player_ids = player_ids
+        self.game_id = None
+        self.seq = 0
+
+    def initialize_game(self, board, dice_sides, players):
+        super(PersistentGame, self).initialize_game(board, dice_sides, players)
+        if self.player_ids is None:
+            self.player_ids = list(range(players))
+        self.game_id = self.store.start_game(self.player_ids, board.get_size(),
+                                             dice_sides)
+
+    def change_turn(self, dice_result):
+        """Change turn, then record the roll and wait until it is durable."""
+        seat = self.turn
+        super(PersistentGame, self).change_turn(dice_result)
+        player = self.players[seat]
+        self.seq += 1
+        self.store.record_turn(self.game_id, self.seq, seat, dice_result,
+                               player.get_pos(), player.get_rank(), self.turn,
+                               self.consecutive_six)
+        if not self.can_play():
+            self.finish()
+
+    def finish(self):
+        """
+        Record the final ranks; called by change_turn when the game ends, so
+        games driven through events() are recorded too.
+        """
+        self.store.finish_game(self.game_id,
+                               [p.get_rank() for p in self.players])
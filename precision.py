@@ -0,0 +1,186 @@
+"""
+Precision-targeted simulation that stops as soon as its estimates are tight.
+
+simulate() plays games on the vectorized GameBatch engine in growing batches
+and keeps running confidence intervals for the mean game length, every
+seat's win rate and any requested percentiles of the game length. It stops
+as soon as every interval is within its target half-width, or when the time
+budget or game cap is reached, and reports how many games it needed.
+
+Game lengths are kept as a histogram of roll counts, so the state of a run
+is a few kilobytes however many games it plays.
+
+Classes:
+- SimulationReport: Estimates, their intervals and how the run ended.
+
+Functions:
+- simulate: Run until the requested precision is reached.
+"""
+
+import time
+from statistics import NormalDist
+
+import numpy as np
+
+from compiled_board import CompiledBoard
+from simulator import GameBatch
+
+
+class SimulationReport:
+    """
+    Result of a precision-targeted simulation.
+
+    Intervals are (low, high) pairs at the requested confidence.
+
+    Attributes:
+    - games: The number of games played.
+    - mean_length: Mean game length in rolls.
+    - mean_length_ci: Interval of the mean game length.
+    - win_rates: Win rate of every seat.
+    - win_rate_ci: Interval of every seat's win rate.
+    - percentiles: Map of percentile to (value, low, high).
+    - stopped_by: "precision", "time_budget" or "max_games".
+    - elapsed: Wall-clock seconds spent.
+    """
+
+    def __init__(self, games, mean_length, mean_length_ci, win_rates,
+                 win_rate_ci, percentiles, stopped_by, elapsed):
+        self.games = games
+        self.mean_length = mean_length
+        self.mean_length_ci = mean_length_ci
+        self.win_rates = win_rates
+        self.win_rate_ci = win_rate_ci
+        self.percentiles = percentiles
+        self.stopped_by = stopped_by
+        self.elapsed = elapsed
+
+
+class _RunningStats:
+    """Length histogram and win counts of all games played so far."""
+
+    def __init__(self, num_players):
+        self.games = 0
+        self.length_counts = np.zeros(0, dtype=np.int64)
+        self.wins = np.zeros(num_players, dtype=np.int64)
+
+    def add(self, batch):
+        """Add the finished games of a GameBatch."""
+        counts = np.bincount(batch.rolls)
+        if len(counts) > len(self.length_counts):
+            counts[:len(self.length_counts)] += self.length_counts
+            self.length_counts = counts
+        else:
+            self.length_counts[:len(counts)] += counts
+        self.wins += (batch.ranks == 1).sum(axis=0)
+        self.games += len(batch.rolls)
+
+    def mean_interval(self, z):
+        lengths = np.arange(len(self.length_counts))
+        mean = (lengths * self.length_counts).sum() / self.games
+        var = (((lengths - mean) ** 2) * self.length_counts).sum() / max(self.games - 1, 1)
+        half = z * np.sqrt(var / self.games)
+        return float(mean), float(half)
+
+    def win_intervals(self, z):
+        rates = self.wins / self.games
+        # Wald interval, with the +1/n term so a zero rate is not certain
+        half = z * np.sqrt(rates * (1 - rates) / self.games) + 1.0 / self.games
+        return rates, half
+
+    def percentile_interval(self, q, z):
+        """Value of percentile q and its distribution-free order-statistic interval."""
+        cumulative = np.cumsum(self.length_counts)
+        n = self.games
+        spread = z * np.sqrt(n * q * (1 - q))
+        ranks = [n * q, max(n * q - spread, 1), min(n * q + spread, n)]
+        value, low, high = (int(np.searchsorted(cumulative, rank)) for rank in ranks)
+        return value, low, high
+
+
+def simulate(board, dice, players, target_ci=None, win_rate_ci=None,
+             percentiles=None, confidence=0.95, time_budget=None,
+             max_games=None, initial_batch=10000, seed=None):
+    """
+    Simulate games until every requested estimate is precise enough.
+
+    Parameters:
+    - board (Board or CompiledBoard): The board to play on.
+    - dice (int or Dice): The dice, or its number of sides; a
+      CompiledBoard must have been compiled for the same dice.
+    - players (int): The number of players per game.
+    - target_ci (float, optional): Target half-width of the mean game
+      length interval, in rolls.
+    - win_rate_ci (float, optional): Target half-width of every seat's win
+      rate interval.
+    - percentiles (dict, optional): Map of percentile (between 0 and 1) to
+      the target half-width of its interval, in rolls.
+    - confidence (float, optional): Confidence level of all intervals.
+    - time_budget (float, optional): Stop after this many seconds.
+    - max_games (int, optional): Stop after this many games.
+    - initial_batch (int, optional): Games in the first batch.
+    - seed (int, optional): Seed for the dice.
+
+    Returns:
+    - SimulationReport: The estimates and how many games they needed.
+    """
+    if max_games is not None and max_games < 1:
+        raise ValueError("max_games must be at least 1")
+    if initial_batch < 1:
+        raise ValueError("initial_batch must be at least 1")
+    sides = getattr(dice, "sides", dice)
+    if not isinstance(board, CompiledBoard):
+        board = CompiledBoard.from_board(board, sides)
+    elif board.dice_sides != sides:
+        raise ValueError(f"board is compiled for {board.dice_sides}-sided dice,"
+                         f" not {sides}")
+    percentiles = percentiles or {}
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    rng = np.random.default_rng(seed)
+    stats = _RunningStats(players)
+    started = time.monotonic()
+    batch_size = initial_batch
+    while True:
+        if max_games is not None:
+            batch_size = min(batch_size, max_games - stats.games)
+        batch = GameBatch(board, batch_size, players)
+        batch.play(rng)
+        stats.add(batch)
+
+        # how far each estimate is from its target, as a ratio of half-widths
+        ratios = []
+        mean, mean_half = stats.mean_interval(z)
+        if target_ci is not None:
+            ratios.append(mean_half / target_ci)
+        rates, rate_half = stats.win_intervals(z)
+        if win_rate_ci is not None:
+            ratios.append(rate_half.max() / win_rate_ci)
+        for q, target in percentiles.items():
+            value, low, high = stats.percentile_interval(q, z)
+            ratios.append(max(value - low, high - value, 1) / target)
+
+        worst = max(ratios, default=0.0)
+        if worst <= 1.0:
+            stopped_by = "precision"
+            break
+        if max_games is not None and stats.games >= max_games:
+            stopped_by = "max_games"
+            break
+        elapsed = time.monotonic() - started
+        if time_budget is not None and elapsed >= time_budget:
+            stopped_by = "time_budget"
+            break
+        # half-widths shrink with sqrt(n), aim just past the games needed
+        needed = int(stats.games * worst ** 2 * 1.1) - stats.games
+        batch_size = int(min(max(needed, initial_batch), 4 * stats.games))
+        if time_budget is not None:
+            # do not start a batch that would overrun the budget
+            per_game = elapsed / stats.games
+            batch_size = max(min(batch_size, int((time_budget - elapsed) / per_game)), 1)
+
+    mean, mean_half = stats.mean_interval(z)
+    rates, rate_half = stats.win_intervals(z)
+    return SimulationReport(
+        stats.games, mean, (mean - mean_half, mean + mean_half),
+        rates, np.stack([rates - rate_half, rates + rate_half], axis=1),
+        {q: stats.percentile_interval(q, z) for q in percentiles},
+        stopped_by, time.monotonic() - started)
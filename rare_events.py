@@ -0,0 +1,448 @@
+"""
+Rare-event estimates of game outcomes by importance sampling and splitting.
+
+Outcomes like "the game lasts more than ten times its mean length" or "a
+player lands on the 98 snake six times" are far too rare to count in plain
+simulation. Both estimators here play the real rules on the vectorized
+GameBatch engine, three-sixes rule and consecutive_six carry-over included,
+and stay unbiased:
+
+- importance_sampling rolls tilted dice that make the event common and
+  weights every game that reaches it by its likelihood ratio, the product of
+  p(d) / q(d) over the rolls played. cross_entropy_tilt finds a good tilt,
+  one per square the roll starts from, with a few small pilot runs. The
+  weights of games that run for thousands of rolls become very uneven, so
+  extreme game lengths are better served by splitting.
+- splitting (fixed-effort multilevel splitting) plays untilted games up to
+  a series of intermediate levels of the event's score, restarts a fixed
+  number of games from the states that reached each level, and multiplies
+  the fractions that get through. It needs no tilt and works for events a
+  state-independent tilt can not reach, such as landings on one square or
+  very long games. Its levels come from a separate pilot run, so the
+  estimate stays unbiased.
+
+An event gives every game a score that only grows, such as rolls played or
+landings on a square, and occurs when the score reaches a target while the
+game is still running.
+
+Classes:
+- GameLength: The game lasts more than a number of rolls.
+- SquareLandings: A player lands on a square at least a number of times.
+- RareEstimate: An estimate, its standard error and its cost.
+
+Functions:
+- tilt: Exponentially tilted dice probabilities.
+- cross_entropy_tilt: Fit dice probabilities that make an event common.
+- importance_sampling: Estimate an event's probability with tilted dice.
+- pilot_levels: Choose splitting levels with a small pilot run.
+- splitting: Estimate an event's probability by multilevel splitting.
+"""
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+from compiled_board import CompiledBoard
+from simulator import GameBatch, roll_dice
+
+
+class GameLength:
+    """
+    The game lasts more than a number of rolls; the score is rolls played.
+
+    Attributes:
+    - target: The number of rolls the game has to outlast.
+    """
+
+    def __init__(self, rolls):
+        self.target = rolls
+
+    def update(self, counts, games, seats, landing, end_pos):
+        """
+        Update the per-seat counts after one GameBatch.step.
+
+        Parameters:
+        - counts (numpy.ndarray): Counts of every game and seat.
+        - games (numpy.ndarray): The games that rolled.
+        - seats, landing, end_pos (numpy.ndarray): As returned by step.
+
+        Returns:
+        - numpy.ndarray: The score of each of those games.
+        """
+        counts[games, 0] += 1
+        return self.score(counts[games])
+
+    def score(self, counts):
+        """Get the score of games from their per-seat counts."""
+        return counts[:, 0]
+
+
+class SquareLandings:
+    """
+    Some player lands on a square at least a number of times; the score is
+    the most landings of any player.
+
+    Attributes:
+    - square: The square, for example a snake head.
+    - target: The number of landings.
+    """
+
+    def __init__(self, square, times):
+        self.square = square
+        self.target = times
+
+    def update(self, counts, games, seats, landing, end_pos):
+        """Update the per-seat counts after one step; see GameLength.update."""
+        hits = landing == self.square
+        counts[games[hits], seats[hits]] += 1
+        return self.score(counts[games])
+
+    def score(self, counts):
+        """Get the score of games from their per-seat counts."""
+        return counts.max(axis=1)
+
+
+class RareEstimate:
+    """
+    Estimated probability of a rare event.
+
+    Attributes:
+    - estimate: The unbiased estimate.
+    - stderr: Its standard error.
+    - method: "importance_sampling" or "splitting".
+    - samples: Games (importance sampling) or replicates (splitting) the
+      standard error is computed from.
+    - rolls: Dice rolls simulated in total, the cost of the estimate.
+    """
+
+    def __init__(self, estimate, stderr, method, samples, rolls):
+        self.estimate = estimate
+        self.stderr = stderr
+        self.method = method
+        self.samples = samples
+        self.rolls = rolls
+
+    def interval(self, confidence=0.95):
+        """
+        Get a normal confidence interval of the estimate.
+
+        Returns:
+        - tuple: (low, high), low clipped at 0.
+        """
+        half = NormalDist().inv_cdf(0.5 + confidence / 2) * self.stderr
+        return max(self.estimate - half, 0.0), self.estimate + half
+
+    def relative_error(self):
+        """Get the standard error relative to the estimate."""
+        return self.stderr / self.estimate if self.estimate > 0 else math.inf
+
+    def __repr__(self):
+        return (f"RareEstimate({self.estimate:.4g} +- {self.stderr:.2g},"
+                f" {self.method}, {self.rolls} rolls)")
+
+
+def _compile(board, dice):
+    if isinstance(board, CompiledBoard):
+        return board
+    return CompiledBoard.from_board(board, getattr(dice, "sides", dice))
+
+
+def tilt(sides, theta):
+    """
+    Get exponentially tilted dice probabilities, q(d) proportional to
+    exp(theta * d).
+
+    Parameters:
+    - sides (int): The number of sides in the dice.
+    - theta (float): Positive favours high rolls, negative low rolls.
+
+    Returns:
+    - numpy.ndarray: Probability of rolling 1..sides.
+    """
+    q = np.exp(theta * np.arange(1, sides + 1))
+    return q / q.sum()
+
+
+def _take(batch, rows):
+    """Copy the given games of a GameBatch into a new one."""
+    clone = GameBatch(batch.compiled, len(rows), batch.num_players,
+                      batch.six, batch.max_sixes)
+    for name in ("positions", "ranks", "turn", "last_rank", "consecutive_six",
+                 "rolls"):
+        setattr(clone, name, getattr(batch, name)[rows])
+    return clone
+
+
+def _advance(batch, counts, event, level, rng, dice_p=None, trace=None,
+             max_steps=10 ** 6):
+    """
+    Play games until each reaches the level while running or is over.
+
+    With dice_p, probabilities of shape (sides,) or per square (size + 1,
+    sides), the dice follow those probabilities and every game carries the
+    log likelihood ratio of its rolls; trace, if a list, receives the
+    (games, squares, dice) arrays of every lockstep roll. Games still running
+    after max_steps lockstep rolls count as not reaching the level.
+
+    Returns:
+    - tuple: (reached, log_weights, scores, rolls played); log_weights is
+      None without dice_p.
+    """
+    n = len(batch.rolls)
+    sides = batch.compiled.dice_sides
+    reached = np.zeros(n, dtype=bool)
+    scores = event.score(counts).copy()
+    log_weights = None
+    if dice_p is not None:
+        table = np.atleast_2d(dice_p)
+        cdf = np.cumsum(table, axis=1)
+        log_ratio = np.log(1.0 / sides) - np.log(table)
+        log_weights = np.zeros(n)
+    games = batch.active_games()
+    games = games[scores[games] < level]
+    rolls = 0
+    while len(games) and max_steps > 0:
+        if dice_p is None:
+            dice = roll_dice(rng, sides, len(games))
+        else:
+            if len(table) == 1:
+                squares = np.zeros(len(games), dtype=np.int64)
+            else:
+                squares = batch.positions[games, batch.current_seats(games)]
+            u = rng.random(len(games))
+            dice = np.minimum((u[:, None] >= cdf[squares]).sum(axis=1), sides - 1) + 1
+            log_weights[games] += log_ratio[squares, dice - 1]
+            if trace is not None:
+                trace.append((games, squares, dice))
+        seats, landing, end_pos = batch.step(games, dice, rng)
+        rolls += len(games)
+        score = event.update(counts, games, seats, landing, end_pos)
+        scores[games] = score
+        running = batch.last_rank[games] != batch.num_players
+        done = running & (score >= level)
+        reached[games[done]] = True
+        games = games[running & ~done]
+        max_steps -= 1
+    return reached, log_weights, scores, rolls
+
+
+def cross_entropy_tilt(board, dice, players, event, per_square=True,
+                       games=10000, rho=0.1, iterations=20, smoothing=0.7,
+                       seed=None):
+    """
+    Fit dice probabilities under which an event is common.
+
+    Each iteration plays games with the current probabilities, takes the
+    rho fraction with the highest scores (or every game reaching the target)
+    and refits the probabilities to the likelihood-weighted dice frequencies
+    of those games, until the target itself is reached often. Per-square
+    probabilities can steer tokens towards squares, which one tilt for the
+    whole board can not.
+
+    Parameters:
+    - board (Board or CompiledBoard): The board to play on.
+    - dice (int or Dice): The dice, or its number of sides.
+    - players (int): The number of players per game.
+    - event (GameLength or SquareLandings): The event.
+    - per_square (bool, optional): Fit the probabilities of every square
+      the roll starts from, instead of one set for the whole board.
+    - games (int, optional): Games per pilot run.
+    - rho (float, optional): Fraction of games refitted to.
+    - iterations (int, optional): Maximum number of pilot runs.
+    - smoothing (float, optional): Weight of the new fit against the old.
+    - seed (int, optional): Seed for the pilot runs.
+
+    Returns:
+    - numpy.ndarray: Probability of rolling 1..sides, shape (sides,) or
+      (size + 1, sides) with per_square.
+    """
+    compiled = _compile(board, dice)
+    rng = np.random.default_rng(seed)
+    sides = compiled.dice_sides
+    rows = compiled.size + 1 if per_square else 1
+    q = np.full((rows, sides), 1.0 / sides)
+    for _ in range(iterations):
+        batch = GameBatch(compiled, games, players)
+        counts = np.zeros((games, players), dtype=np.int64)
+        trace = []
+        reached, log_weights, scores, _ = _advance(
+            batch, counts, event, event.target, rng, q, trace)
+        scores = np.where(reached, event.target, scores)
+        level = min(np.quantile(scores, 1.0 - rho), event.target)
+        elite = scores >= level
+        weights = np.zeros(games)
+        weights[elite] = np.exp(log_weights[elite] - log_weights[elite].max())
+        frequencies = np.zeros((rows, sides))
+        for step_games, squares, step_dice in trace:
+            np.add.at(frequencies, (squares, step_dice - 1), weights[step_games])
+        seen = frequencies.sum(axis=1) > 0
+        fitted = frequencies[seen] / frequencies[seen].sum(axis=1, keepdims=True)
+        # keep every face possible so the likelihood ratio stays bounded
+        fitted = np.maximum(fitted, 0.05 / sides)
+        fitted /= fitted.sum(axis=1, keepdims=True)
+        q[seen] = smoothing * fitted + (1.0 - smoothing) * q[seen]
+        if level >= event.target and reached.mean() >= rho:
+            break
+    return q if per_square else q[0]
+
+
+def importance_sampling(board, dice, players, event, dice_p, games=100000,
+                        batch_size=20000, seed=None):
+    """
+    Estimate the probability of an event with tilted dice.
+
+    Parameters:
+    - board (Board or CompiledBoard): The board to play on.
+    - dice (int or Dice): The dice, or its number of sides.
+    - players (int): The number of players per game.
+    - event (GameLength or SquareLandings): The event.
+    - dice_p (array-like): Probability of rolling 1..sides, shape (sides,)
+      or per square (size + 1, sides); see tilt and cross_entropy_tilt.
+      Every face needs a non-zero probability.
+    - games (int, optional): The number of games.
+    - batch_size (int, optional): Games played at once.
+    - seed (int, optional): Seed for the dice.
+
+    Returns:
+    - RareEstimate: The estimate.
+    """
+    compiled = _compile(board, dice)
+    dice_p = np.asarray(dice_p, dtype=float)
+    if (dice_p.shape not in ((compiled.dice_sides,),
+                             (compiled.size + 1, compiled.dice_sides))
+            or (dice_p <= 0).any()):
+        raise ValueError("dice_p needs a positive probability for every face")
+    dice_p = dice_p / dice_p.sum(axis=-1, keepdims=True)
+    rng = np.random.default_rng(seed)
+    total = total_sq = 0.0
+    rolls = 0
+    played = 0
+    while played < games:
+        size = min(batch_size, games - played)
+        batch = GameBatch(compiled, size, players)
+        counts = np.zeros((size, players), dtype=np.int64)
+        reached, log_weights, _, batch_rolls = _advance(
+            batch, counts, event, event.target, rng, dice_p)
+        values = np.where(reached, np.exp(log_weights), 0.0)
+        total += values.sum()
+        total_sq += (values ** 2).sum()
+        rolls += batch_rolls
+        played += size
+    mean = total / games
+    variance = max(total_sq / games - mean ** 2, 0.0) * games / max(games - 1, 1)
+    return RareEstimate(mean, math.sqrt(variance / games), "importance_sampling",
+                        games, rolls)
+
+
+def pilot_levels(compiled, players, event, effort=2000, rho=0.2, rng=None):
+    """
+    Choose splitting levels that a rho fraction of games gets through.
+
+    Every stage plays copies of the current games towards the target, takes
+    the 1 - rho quantile of the scores they reach as the next level and
+    moves the games on to it.
+
+    Parameters:
+    - compiled (CompiledBoard): The board to play on.
+    - players (int): The number of players per game.
+    - event (GameLength or SquareLandings): The event.
+    - effort (int, optional): Games per stage.
+    - rho (float, optional): Target fraction of games reaching each level.
+    - rng (numpy.random.Generator, optional): Source of the dice.
+
+    Returns:
+    - list: Increasing levels ending at the event's target.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    batch = GameBatch(compiled, effort, players)
+    counts = np.zeros((effort, players), dtype=np.int64)
+    levels = []
+    while True:
+        probe, probe_counts = _take(batch, np.arange(effort)), counts.copy()
+        reached, _, scores, _ = _advance(probe, probe_counts, event,
+                                            event.target, rng)
+        scores = np.where(reached, event.target, scores)
+        floor = levels[-1] + 1 if levels else 1
+        level = int(max(np.quantile(scores, 1.0 - rho), floor))
+        if level >= event.target:
+            return levels + [event.target]
+        levels.append(level)
+        reached, _, _, _ = _advance(batch, counts, event, level, rng)
+        entries = np.flatnonzero(reached)
+        if not len(entries):
+            return levels + [event.target]
+        rows = entries[rng.integers(len(entries), size=effort)]
+        batch, counts = _take(batch, rows), counts[rows]
+
+
+def splitting(board, dice, players, event, effort=10000, replicates=10,
+              levels=None, seed=None):
+    """
+    Estimate the probability of an event by fixed-effort multilevel splitting.
+
+    Every replicate starts effort games, keeps the states of those reaching
+    the first level while still running, restarts effort games drawn from
+    those states towards the next level, and so on; its estimate is the
+    product of the fractions reaching each level. Replicates are independent,
+    so their spread gives the standard error.
+
+    Parameters:
+    - board (Board or CompiledBoard): The board to play on.
+    - dice (int or Dice): The dice, or its number of sides.
+    - players (int): The number of players per game.
+    - event (GameLength or SquareLandings): The event.
+    - effort (int, optional): Games per level.
+    - replicates (int, optional): Independent repetitions, at least 2.
+    - levels (list, optional): Increasing scores ending at the target,
+      chosen by pilot_levels by default. Each should be reached by a good
+      fraction of the games that reached the previous one.
+    - seed (int, optional): Seed for the dice.
+
+    Returns:
+    - RareEstimate: The estimate.
+    """
+    compiled = _compile(board, dice)
+    pilot_rng, rng = (np.random.default_rng(s)
+                      for s in np.random.SeedSequence(seed).spawn(2))
+    if levels is None:
+        levels = pilot_levels(compiled, players, event, rng=pilot_rng)
+    levels = list(levels)
+    if levels[-1] != event.target:
+        raise ValueError("the last level must be the event's target")
+    estimates = []
+    rolls = 0
+    for _ in range(replicates):
+        batch = GameBatch(compiled, effort, players)
+        counts = np.zeros((effort, players), dtype=np.int64)
+        estimate = 1.0
+        for level in levels:
+            reached, _, _, level_rolls = _advance(batch, counts, event, level, rng)
+            rolls += level_rolls
+            entries = np.flatnonzero(reached)
+            estimate *= len(entries) / effort
+            if not len(entries) or level == levels[-1]:
+                break
+            rows = entries[rng.integers(len(entries), size=effort)]
+            batch = _take(batch, rows)
+            counts = counts[rows]
+        estimates.append(estimate)
+    estimates = np.array(estimates)
+    stderr = estimates.std(ddof=1) / math.sqrt(replicates) if replicates > 1 else math.inf
+    return RareEstimate(float(estimates.mean()), float(stderr), "splitting",
+                        replicates, rolls)
+
+
+if __name__ == "__main__":
+    from updated_Code import BoardSetup, Dice
+
+    board, dice = BoardSetup.setup(), Dice(6)
+    compiled = _compile(board, dice)
+    print("P(4-player game > 1600 rolls, ten times the mean):",
+          splitting(compiled, dice, 4, GameLength(1600), effort=5000, seed=1))
+    bitten = SquareLandings(98, 6)
+    print("P(a player is bitten by the 98 snake 6 times, 2 players):")
+    print("  splitting:", splitting(compiled, dice, 2, bitten, effort=5000, seed=1))
+    q = cross_entropy_tilt(compiled, dice, 2, bitten, seed=1)
+    print("  importance sampling:",
+          importance_sampling(compiled, dice, 2, bitten, q, games=50000, seed=2))
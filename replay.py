@@ -0,0 +1,193 @@
+"""
+Counterfactual replay of recorded dice streams against other boards or rules.
+
+Recorded games are stored as one flat uint8 array of dice results plus an
+offsets array marking where each game's stream starts, and the number of
+players of each game. The arrays are .npy files, so they are memory-mapped
+instead of loaded. Replaying feeds every stream through GameBatch.step,
+which follows Game.change_turn, so the same rolls are handed to the same
+seats in the same order as the live game would have done on the other board.
+
+Classes:
+- DiceStreams: Compact on-disk store of recorded dice streams.
+- ReplayResult: How every recorded game ends under one configuration.
+
+Functions:
+- replay: Re-run every stream against a compiled board.
+- compare: Replay on two boards and summarise the differences.
+"""
+
+import os
+
+import numpy as np
+
+from simulator import GameBatch
+
+
+class DiceStreams:
+    """
+    Recorded dice streams of many games.
+
+    Attributes:
+    - rolls: All dice results, game after game (uint8).
+    - offsets: Start of every game's stream in rolls, plus the final end.
+    - num_players: The number of players of every game.
+    """
+
+    def __init__(self, rolls, offsets, num_players):
+        self.rolls = rolls
+        self.offsets = offsets
+        self.num_players = num_players
+
+    def __len__(self):
+        return len(self.num_players)
+
+    @classmethod
+    def from_lists(cls, streams, num_players):
+        """
+        Build the store from in-memory dice sequences.
+
+        Parameters:
+        - streams (list): One list of dice results per game.
+        - num_players (list): The number of players of every game.
+
+        Returns:
+        - DiceStreams: The packed streams.
+        """
+        lengths = np.fromiter((len(s) for s in streams), dtype=np.int64,
+                              count=len(streams))
+        offsets = np.zeros(len(streams) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        rolls = np.fromiter((r for s in streams for r in s), dtype=np.uint8,
+                            count=int(offsets[-1]))
+        return cls(rolls, offsets, np.asarray(num_players, dtype=np.uint8))
+
+    def save(self, path):
+        """
+        Write the streams to a directory of .npy files.
+
+        Parameters:
+        - path (str): The directory to write to, created if missing.
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "rolls.npy"), self.rolls)
+        np.save(os.path.join(path, "offsets.npy"), self.offsets)
+        np.save(os.path.join(path, "num_players.npy"), self.num_players)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Memory-map streams written by save.
+
+        Parameters:
+        - path (str): The directory written by save.
+
+        Returns:
+        - DiceStreams: Streams backed by the files on disk.
+        """
+        return cls(np.load(os.path.join(path, "rolls.npy"), mmap_mode="r"),
+                   np.load(os.path.join(path, "offsets.npy"), mmap_mode="r"),
+                   np.load(os.path.join(path, "num_players.npy"), mmap_mode="r"))
+
+
+class ReplayResult:
+    """
+    How every recorded game ends under one board and rule set.
+
+    Attributes:
+    - ranks: Rank of every seat, shape (games, max players), -1 for empty
+      seats and players who had not finished when the stream ran out.
+    - rolls: Number of recorded rolls the game used.
+    - complete: False for games whose stream ran out before the game ended.
+    """
+
+    def __init__(self, n_games, max_players):
+        self.ranks = np.full((n_games, max_players), -1, dtype=np.int16)
+        self.rolls = np.zeros(n_games, dtype=np.int64)
+        self.complete = np.zeros(n_games, dtype=bool)
+
+    def winners(self):
+        """
+        Get the seat that finished first in every game.
+
+        Returns:
+        - numpy.ndarray: Winning seat per game, -1 if nobody finished.
+        """
+        won = self.ranks == 1
+        return np.where(won.any(axis=1), won.argmax(axis=1), -1)
+
+
+def replay(streams, compiled, six=6, max_sixes=3, chunk_games=500000, seed=None):
+    """
+    Re-run every recorded stream against a compiled board.
+
+    Parameters:
+    - streams (DiceStreams): The recorded dice streams.
+    - compiled (CompiledBoard): The board to replay on.
+    - six (int, optional): Dice result that earns another roll, None for none.
+    - max_sixes (int, optional): Consecutive sixes that pass the turn.
+    - chunk_games (int, optional): Games replayed together in one batch.
+    - seed (int, optional): Seed for multi-destination squares, which need
+      randomness the recording does not contain.
+
+    Returns:
+    - ReplayResult: Outcome of every game.
+    """
+    rng = np.random.default_rng(seed)
+    num_players = np.asarray(streams.num_players)
+    offsets = np.asarray(streams.offsets)
+    result = ReplayResult(len(streams), int(num_players.max(initial=0)))
+    for players in np.unique(num_players):
+        group = np.flatnonzero(num_players == players)
+        for start in range(0, len(group), chunk_games):
+            ids = group[start:start + chunk_games]
+            _replay_chunk(streams.rolls, offsets, ids, int(players), compiled,
+                          six, max_sixes, rng, result)
+    return result
+
+
+def _replay_chunk(rolls, offsets, ids, players, compiled, six, max_sixes, rng,
+                  result):
+    """Replay the games ids, which all have the same number of players."""
+    batch = GameBatch(compiled, len(ids), players, six, max_sixes)
+    cursor = offsets[ids].copy()
+    end = offsets[ids + 1]
+    games = np.flatnonzero(cursor < end)
+    while len(games):
+        dice = rolls[cursor[games]].astype(np.int64)
+        batch.step(games, dice, rng)
+        cursor[games] += 1
+        games = games[(batch.last_rank[games] != players) &
+                      (cursor[games] < end[games])]
+    result.ranks[ids, :players] = batch.ranks
+    result.rolls[ids] = batch.rolls
+    result.complete[ids] = batch.last_rank == players
+
+
+def compare(streams, baseline, alternative, **kwargs):
+    """
+    Replay the streams on two boards and summarise what the change did.
+
+    Parameters:
+    - streams (DiceStreams): The recorded dice streams.
+    - baseline (CompiledBoard): The board the games were played on.
+    - alternative (CompiledBoard): The board to evaluate.
+    - kwargs: Passed on to replay for both boards.
+
+    Returns:
+    - dict: Both ReplayResults and summary statistics over the games that
+      are complete under both boards.
+    """
+    before = replay(streams, baseline, **kwargs)
+    after = replay(streams, alternative, **kwargs)
+    both = before.complete & after.complete
+    return {
+        "baseline": before,
+        "alternative": after,
+        "compared_games": int(both.sum()),
+        "incomplete_games": int((~after.complete).sum()),
+        "winner_changed": float((before.winners() != after.winners())[both].mean())
+        if both.any() else 0.0,
+        "mean_rolls_baseline": float(before.rolls[both].mean()) if both.any() else 0.0,
+        "mean_rolls_alternative": float(after.rolls[both].mean()) if both.any() else 0.0,
+    }
@@ -0,0 +1,243 @@
+"""
+Animated GIF and WebP replays of recorded games.
+
+The static board (squares, numbers, snake and ladder arrows) is rasterised
+once with Pillow and cached per layout, in a fixed palette image. Every frame
+is a copy of that layer with only the move trails and token sprites drawn on
+top, and because the frame is already a palette image GIF frames need no
+colour quantization. Squares are numbered like BoardDrawer.draw_arrow:
+square 1 in the bottom-left corner, left to right along every row, rows
+going up.
+
+render_many renders many replays in a process pool; each worker rasterises a
+board layer only the first time it sees that layout.
+
+Functions:
+- board_layer: The cached static board layer of a layout.
+- timeline_moves: The moves of a recorded GameTimeline.
+- render_replay: Render one replay to a GIF or WebP file.
+- render_many: Render replays in parallel.
+"""
+
+import functools
+import math
+from multiprocessing import Pool
+
+from PIL import Image, ImageDraw, ImageFont
+
+from compiled_board import LADDER, SNAKE
+
+COLUMNS = 10
+SQUARE_PX = 50
+# palette indices of the colours used on the board and by the tokens
+_COLORS = [
+    ("white", (255, 255, 255)),
+    ("black", (0, 0, 0)),
+    ("lightblue", (173, 216, 230)),
+    ("lightgreen", (144, 238, 144)),
+    ("red", (220, 20, 20)),
+    ("green", (0, 140, 0)),
+    ("trail", (90, 90, 90)),
+]
+TOKEN_COLORS = [(230, 30, 30), (30, 60, 230), (240, 200, 0), (150, 40, 190),
+                (255, 140, 0), (0, 190, 200), (255, 105, 180), (110, 70, 20)]
+_INDEX = {name: ix for ix, (name, _) in enumerate(_COLORS)}
+_TOKEN_BASE = len(_COLORS)
+_PALETTE = ([c for _, rgb in _COLORS for c in rgb]
+            + [c for rgb in TOKEN_COLORS for c in rgb])
+
+
+def _square_center(square, rows, square_px):
+    col = (square - 1) % COLUMNS
+    row = (square - 1) // COLUMNS
+    return ((col + 0.5) * square_px, (rows - 1 - row + 0.5) * square_px)
+
+
+@functools.lru_cache(maxsize=16)
+def board_layer(size, snakes, ladders, square_px=SQUARE_PX):
+    """
+    Rasterise the static board once per layout.
+
+    Parameters:
+    - size (int): The size of the board.
+    - snakes (tuple): Sorted (head, tail) pairs.
+    - ladders (tuple): Sorted (foot, top) pairs.
+    - square_px (int, optional): Width of a square in pixels.
+
+    Returns:
+    - PIL.Image.Image: Palette image of the board; copy it before drawing.
+    """
+    rows = -(-size // COLUMNS)
+    image = Image.new("P", (COLUMNS * square_px, rows * square_px), _INDEX["white"])
+    image.putpalette(_PALETTE)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+    for square in range(1, size + 1):
+        x, y = _square_center(square, rows, square_px)
+        col, row = (square - 1) % COLUMNS, (square - 1) // COLUMNS
+        fill = "lightblue" if (col + row) % 2 == 0 else "lightgreen"
+        half = square_px / 2
+        draw.rectangle([x - half, y - half, x + half - 1, y + half - 1],
+                       fill=_INDEX[fill])
+        draw.text((x - half + 3, y - half + 2), str(square), fill=_INDEX["black"],
+                  font=font)
+    for entities, color in ((snakes, "red"), (ladders, "green")):
+        for start, end in entities:
+            _draw_arrow(draw, _square_center(start, rows, square_px),
+                        _square_center(end, rows, square_px), _INDEX[color],
+                        square_px)
+    return image
+
+
+def _draw_arrow(draw, start, end, fill, square_px):
+    (x0, y0), (x1, y1) = start, end
+    draw.line([x0, y0, x1, y1], fill=fill, width=max(square_px // 15, 1))
+    angle = math.atan2(y1 - y0, x1 - x0)
+    head = square_px / 4
+    draw.polygon([(x1, y1),
+                  (x1 - head * math.cos(angle - 0.4), y1 - head * math.sin(angle - 0.4)),
+                  (x1 - head * math.cos(angle + 0.4), y1 - head * math.sin(angle + 0.4))],
+                 fill=fill)
+
+
+@functools.lru_cache(maxsize=64)
+def _token_sprite(seat, radius):
+    """Palette image and mask of a token, drawn once per seat and size."""
+    size = 2 * radius + 1
+    sprite = Image.new("P", (size, size), _TOKEN_BASE + seat % len(TOKEN_COLORS))
+    sprite.putpalette(_PALETTE)
+    mask = Image.new("1", (size, size), 0)
+    ImageDraw.Draw(mask).ellipse([0, 0, size - 1, size - 1], fill=1)
+    outline = ImageDraw.Draw(sprite)
+    outline.ellipse([0, 0, size - 1, size - 1], outline=_INDEX["black"])
+    return sprite, mask
+
+
+def _layout(compiled):
+    """Get the (size, snakes, ladders) key of a compiled board's layer."""
+    squares = compiled.entity_squares()
+    snakes = tuple((int(s), int(compiled.dest[s])) for s in squares
+                   if compiled.kind[s] == SNAKE)
+    ladders = tuple((int(s), int(compiled.dest[s])) for s in squares
+                    if compiled.kind[s] == LADDER)
+    return compiled.size, snakes, ladders
+
+
+def timeline_moves(timeline):
+    """
+    Get the moves of a recorded game.
+
+    Parameters:
+    - timeline (GameTimeline): The recorded game.
+
+    Returns:
+    - list: (seat, start, landing, end_pos) of every roll.
+    """
+    game = timeline.seek(0)
+    moves = []
+    for ix in range(len(timeline)):
+        seat = game.current_seat()
+        start = game.positions[seat]
+        u = None if timeline.draws is None else timeline.draws[ix]
+        _, landing, end_pos = game.apply_roll(timeline.dice[ix], u)
+        moves.append((seat, start, landing, end_pos))
+    return moves
+
+
+def render_replay(timeline, filename, frame_ms=120, trail=3, square_px=SQUARE_PX):
+    """
+    Render a recorded game to an animated GIF or WebP, chosen by extension.
+
+    Every roll is one frame showing all tokens and the trails of the last
+    few moves.
+
+    Parameters:
+    - timeline (GameTimeline): The recorded game.
+    - filename (str): The file to write, ending in .gif or .webp.
+    - frame_ms (int, optional): Duration of every frame in milliseconds.
+    - trail (int, optional): The number of recent moves drawn as trails.
+    - square_px (int, optional): Width of a square in pixels.
+
+    Returns:
+    - int: The number of frames written.
+    """
+    size, snakes, ladders = _layout(timeline.compiled)
+    layer = board_layer(size, snakes, ladders, square_px)
+    rows = -(-size // COLUMNS)
+    radius = max(square_px // 6, 2)
+    sprites = [_token_sprite(seat, radius) for seat in range(timeline.num_players)]
+    positions = [timeline.compiled.start] * timeline.num_players
+    recent = []
+    frames = []
+    moves = timeline_moves(timeline)
+    # frame 0 shows the start of the game, frame n the board after roll n
+    for step in range(len(moves) + 1):
+        if step:
+            seat, start, landing, end_pos = moves[step - 1]
+            positions[seat] = end_pos
+            recent = (recent + [(start, landing, end_pos)])[-trail:]
+        frame = layer.copy()
+        draw = ImageDraw.Draw(frame)
+        for move_start, move_landing, move_end in recent:
+            points = [_square_center(move_start, rows, square_px),
+                      _square_center(move_landing, rows, square_px)]
+            if move_end != move_landing:
+                points.append(_square_center(move_end, rows, square_px))
+            draw.line(points, fill=_INDEX["trail"], width=2)
+        for token_seat, square in enumerate(positions):
+            x, y = _square_center(square, rows, square_px)
+            # spread tokens sharing a square
+            x += (token_seat - (len(positions) - 1) / 2) * radius
+            sprite, mask = sprites[token_seat]
+            frame.paste(sprite, (int(x) - radius, int(y) - radius), mask)
+        frames.append(frame)
+    if filename.lower().endswith(".webp"):
+        frames = [frame.convert("RGB") for frame in frames]
+        # fastest lossless settings; frames only differ around the tokens,
+        # so one keyframe is enough and the rest are small sub-frames
+        frames[0].save(filename, save_all=True, append_images=frames[1:],
+                       duration=frame_ms, loop=0, lossless=True, method=0,
+                       quality=0, kmin=len(frames), kmax=len(frames) + 1,
+                       allow_mixed=False)
+    else:
+        # disposal 1 keeps the previous frame, so only changed areas are encoded
+        frames[0].save(filename, save_all=True, append_images=frames[1:],
+                       duration=frame_ms, loop=0, optimize=False, disposal=1)
+    return len(frames)
+
+
+def _render_job(job):
+    timeline, filename, options = job
+    return filename, render_replay(timeline, filename, **options)
+
+
+def render_many(jobs, processes=None, **options):
+    """
+    Render many replays in a process pool.
+
+    Parameters:
+    - jobs (iterable): (timeline, filename) pairs.
+    - processes (int, optional): Worker processes, one per CPU by default.
+    - options: Keyword arguments passed on to render_replay.
+
+    Returns:
+    - dict: Map of filename to the number of frames written.
+    """
+    work = ((timeline, filename, options) for timeline, filename in jobs)
+    with Pool(processes) as pool:
+        return dict(pool.imap_unordered(_render_job, work))
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from board import LADDERS, SNAKES
+    from compiled_board import CompiledBoard
+    from timeline import GameTimeline
+
+    compiled = CompiledBoard.from_layout(100, SNAKES, LADDERS)
+    timeline = GameTimeline.record(compiled, 4, rng=random.Random(1))
+    started = time.perf_counter()
+    frames = render_replay(timeline, "replay.gif")
+    print(f"{frames} frames in {time.perf_counter() - started:.2f}s -> replay.gif")
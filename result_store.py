@@ -0,0 +1,278 @@
+"""
+Columnar, memory-mapped store for per-game simulation results.
+
+A store is a directory with one raw little-endian file per column and a
+small manifest.json describing the columns and how many rows are committed.
+Rows are appended in chunks: the column files are extended and synced first
+and the manifest row count is replaced atomically afterwards, so a crash
+mid-append leaves a torn tail that readers ignore.
+
+Columns are opened as numpy.memmap views, so reading is zero-copy and
+filtering or aggregating a very large result set streams through it chunk by
+chunk at disk speed without creating Python objects per game.
+
+Columns:
+- rolls: Number of dice rolls the game took (uint32).
+- ranks: Rank of every seat, 0 for empty seats (uint8, max_players wide).
+- seat_order: Player id sitting in every seat (uint32, max_players wide).
+- num_players: The number of players (uint8).
+- seed: Seed of the batch the game was played in (uint64).
+- board: CompiledBoard.fingerprint of the board (uint64).
+
+Classes:
+- ResultStore: Append and query a result directory.
+"""
+
+import json
+import os
+
+import numpy as np
+
+_MANIFEST = "manifest.json"
+
+
+def _columns(max_players):
+    return {
+        "rolls": ("<u4", 1),
+        "ranks": ("u1", max_players),
+        "seat_order": ("<u4", max_players),
+        "num_players": ("u1", 1),
+        "seed": ("<u8", 1),
+        "board": ("<u8", 1),
+    }
+
+
+class ResultStore:
+    """
+    Append-only columnar store of game results.
+
+    Attributes:
+    - path: The store directory.
+    - rows: Number of committed rows.
+    - max_players: Width of the per-seat columns.
+    """
+
+    def __init__(self, path, max_players=None):
+        """
+        Open a store, creating it if max_players is given and it does not exist.
+
+        Parameters:
+        - path (str): The store directory.
+        - max_players (int, optional): Width of the per-seat columns of a
+          new store.
+        """
+        self.path = path
+        manifest_path = os.path.join(path, _MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as manifest:
+                data = json.load(manifest)
+            self.max_players = data["max_players"]
+            self.rows = data["rows"]
+            self.columns = {name: (dtype, width)
+                            for name, (dtype, width) in data["columns"].items()}
+        else:
+            if max_players is None:
+                raise ValueError(f"no result store at {path}")
+            os.makedirs(path, exist_ok=True)
+            self.max_players = max_players
+            self.rows = 0
+            self.columns = _columns(max_players)
+            self._write_manifest()
+        self._truncate_torn_tail()
+
+    def _file(self, name):
+        return os.path.join(self.path, name + ".bin")
+
+    def _write_manifest(self):
+        data = {"version": 1, "rows": self.rows, "max_players": self.max_players,
+                "columns": self.columns}
+        tmp = os.path.join(self.path, _MANIFEST + ".tmp")
+        with open(tmp, "w") as manifest:
+            json.dump(data, manifest)
+            manifest.flush()
+            os.fsync(manifest.fileno())
+        os.replace(tmp, os.path.join(self.path, _MANIFEST))
+
+    def _truncate_torn_tail(self):
+        """Drop bytes past the committed rows left behind by a failed append."""
+        for name, (dtype, width) in self.columns.items():
+            committed = self.rows * width * np.dtype(dtype).itemsize
+            filename = self._file(name)
+            if os.path.exists(filename) and os.path.getsize(filename) > committed:
+                os.truncate(filename, committed)
+
+    def append(self, rolls, ranks, seed, board, seat_order=None):
+        """
+        Append a chunk of games and commit it.
+
+        Parameters:
+        - rolls (array-like): Rolls per game.
+        - ranks (array-like): Ranks, shape (games, players); -1 is stored as 0.
+        - seed (int or array-like): Seed of the games.
+        - board (int or array-like): Board fingerprint of the games.
+        - seat_order (array-like, optional): Player id per seat, seat
+          numbers by default.
+
+        Raises:
+        - ValueError: The columns do not have one entry per game; nothing
+          is written.
+        """
+        ranks = np.asarray(ranks)
+        if ranks.ndim != 2:
+            raise ValueError("ranks must have shape (games, players)")
+        games, players = ranks.shape
+        if players > self.max_players:
+            raise ValueError(f"store holds at most {self.max_players} players")
+        rolls = np.asarray(rolls)
+        if rolls.shape != (games,):
+            raise ValueError(f"rolls has shape {rolls.shape}, ranks has {games} games")
+        for name, value in (("seed", seed), ("board", board)):
+            shape = np.shape(value)
+            if shape not in ((), (games,)):
+                raise ValueError(f"{name} must be one value or one per game,"
+                                 f" not shape {shape}")
+        if seat_order is not None and np.shape(seat_order) not in ((players,),
+                                                                   (games, players)):
+            raise ValueError("seat_order must have one id per seat, or per game and seat")
+        padded = np.zeros((games, self.max_players), dtype=np.uint8)
+        padded[:, :players] = np.maximum(ranks, 0)
+        order = np.zeros((games, self.max_players), dtype=np.uint32)
+        order[:, :players] = (np.arange(players) if seat_order is None
+                              else np.asarray(seat_order))
+        values = {
+            "rolls": rolls,
+            "ranks": padded,
+            "seat_order": order,
+            "num_players": np.full(games, players),
+            "seed": np.broadcast_to(np.asarray(seed, dtype=np.uint64), (games,)),
+            "board": np.broadcast_to(np.asarray(board, dtype=np.uint64), (games,)),
+        }
+        for name, (dtype, _) in self.columns.items():
+            with open(self._file(name), "ab") as column:
+                column.write(np.ascontiguousarray(values[name], dtype=dtype).tobytes())
+                column.flush()
+                os.fsync(column.fileno())
+        self.rows += games
+        self._write_manifest()
+
+    def append_batch(self, batch, seed, board_fingerprint):
+        """
+        Append every game of a finished GameBatch.
+
+        Parameters:
+        - batch (GameBatch): The played games.
+        - seed (int): Seed the batch was played with.
+        - board_fingerprint (int): CompiledBoard.fingerprint of its board.
+        """
+        self.append(batch.rolls, batch.ranks, seed, board_fingerprint)
+
+    def column(self, name):
+        """
+        Memory-map a column.
+
+        Parameters:
+        - name (str): The column name.
+
+        Returns:
+        - numpy.memmap: Read-only view of the committed rows.
+        """
+        dtype, width = self.columns[name]
+        shape = (self.rows,) if width == 1 else (self.rows, width)
+        if self.rows == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self._file(name), dtype=dtype, mode="r", shape=shape)
+
+    def scan(self, columns, chunk_rows=1 << 22):
+        """
+        Iterate over the store in chunks.
+
+        Parameters:
+        - columns (list): Names of the columns to read.
+        - chunk_rows (int, optional): Rows per chunk.
+
+        Yields:
+        - dict: Map of column name to the chunk's slice of that column.
+        """
+        maps = {name: self.column(name) for name in columns}
+        for start in range(0, self.rows, chunk_rows):
+            yield {name: values[start:start + chunk_rows]
+                   for name, values in maps.items()}
+
+    def aggregate(self, column, where=None, columns=(), histogram=False,
+                  chunk_rows=1 << 22):
+        """
+        Count, sum and histogram a single-width column, optionally filtered.
+
+        Parameters:
+        - column (str): The column to aggregate.
+        - where (callable, optional): Takes a chunk dict and returns a boolean
+          mask of the rows to keep.
+        - columns (list, optional): Extra columns the filter needs.
+        - histogram (bool, optional): Also count every value, for columns of
+          small integers such as rolls.
+        - chunk_rows (int, optional): Rows per chunk.
+
+        Returns:
+        - dict: count, sum, mean, min and max of the selected rows, plus
+          histogram (counts per value) if requested.
+        """
+        count, total = 0, 0
+        low, high = None, None
+        counts_per_value = np.zeros(0, dtype=np.int64)
+        for chunk in self.scan({column, *columns}, chunk_rows):
+            values = np.asarray(chunk[column])
+            if where is not None:
+                values = values[where(chunk)]
+            if not len(values):
+                continue
+            count += len(values)
+            total += int(values.sum(dtype=np.int64))
+            low = int(values.min()) if low is None else min(low, int(values.min()))
+            high = int(values.max()) if high is None else max(high, int(values.max()))
+            if histogram:
+                counts = np.bincount(values)
+                if len(counts) > len(counts_per_value):
+                    counts[:len(counts_per_value)] += counts_per_value
+                    counts_per_value = counts
+                else:
+                    counts_per_value[:len(counts)] += counts
+        result = {"count": count, "sum": total,
+                  "mean": total / count if count else float("nan"),
+                  "min": low, "max": high}
+        if histogram:
+            result["histogram"] = counts_per_value
+        return result
+
+    def to_parquet(self, filename, chunk_rows=1 << 22):
+        """
+        Export the store to a Parquet file, one row group per chunk; needs pyarrow.
+
+        Per-seat columns become one Parquet column per seat, e.g. ranks_0.
+
+        Parameters:
+        - filename (str): The Parquet file to write.
+        - chunk_rows (int, optional): Rows per row group.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("to_parquet needs pyarrow installed")
+        writer = None
+        for chunk in self.scan(list(self.columns), chunk_rows):
+            arrays, names = [], []
+            for name, (_, width) in self.columns.items():
+                values = np.asarray(chunk[name])
+                if width == 1:
+                    arrays.append(pa.array(values))
+                    names.append(name)
+                    continue
+                for seat in range(width):
+                    arrays.append(pa.array(values[:, seat]))
+                    names.append(f"{name}_{seat}")
+            table = pa.Table.from_arrays(arrays, names=names)
+            if writer is None:
+                writer = pq.ParquetWriter(filename, table.schema)
+            writer.write_table(table)
+        if writer is not None:
+            writer.close()
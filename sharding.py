@@ -0,0 +1,373 @@
+"""
+Multi-node simulation sharding over plain TCP.
+
+A simulation job (board, players, number of games, master seed) is split into
+shards of a fixed number of games. Shard i always plays its games with the
+random stream SeedSequence([master_seed, i]) and its results are integer
+counts, so merging shards is integer addition: the merged result is
+bit-identical to a single-node run of the same job whatever the number of
+workers, the order results arrive in or how many shards had to be retried.
+
+The coordinator listens on a TCP port; workers connect to it, from this
+machine or others, and are handed one shard at a time. A shard whose worker
+disconnects or does not answer within the timeout goes back in the queue for
+another worker. Messages are JSON objects, each preceded by its length as a
+4-byte big-endian integer.
+
+Classes:
+- ShardStats: Mergeable counts of a set of games.
+- Coordinator: Hands out shards and merges their results.
+
+Functions:
+- run_shard: Play one shard of a job.
+- run_local: Play a whole job in this process, the single-node reference.
+- worker: Connect to a coordinator and play shards until it is done.
+- spawn_local_workers: Start workers in local processes.
+"""
+
+import json
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
+from multiprocessing import Process
+
+import numpy as np
+
+from compiled_board import CompiledBoard
+from simulator import GameBatch
+
+_LENGTH = struct.Struct(">I")
+
+
+def _send(sock, message):
+    data = json.dumps(message).encode()
+    sock.sendall(_LENGTH.pack(len(data)) + data)
+
+
+def _recv_exact(sock, count):
+    data = bytearray()
+    while len(data) < count:
+        chunk = sock.recv(count - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        data += chunk
+    return bytes(data)
+
+
+def _recv(sock):
+    (length,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    return json.loads(_recv_exact(sock, length))
+
+
+def board_to_wire(compiled):
+    """
+    Encode a compiled board as JSON-compatible data.
+
+    Returns:
+    - dict: The board's arrays as lists, floats kept exact.
+    """
+    return {"size": compiled.size, "dice_sides": compiled.dice_sides,
+            "start": compiled.start, "dest": compiled.dest.tolist(),
+            "kind": compiled.kind.tolist(),
+            "branch_dest": compiled.branch_dest.tolist(),
+            "branch_cdf": compiled.branch_cdf.tolist(),
+            "fingerprint": compiled.fingerprint()}
+
+
+def board_from_wire(data):
+    """
+    Decode a board encoded by board_to_wire and check its fingerprint.
+
+    Returns:
+    - CompiledBoard: The board.
+    """
+    compiled = CompiledBoard(data["size"], data["dice_sides"], data["dest"],
+                             data["kind"], data["start"], data["branch_dest"],
+                             data["branch_cdf"])
+    if compiled.fingerprint() != data["fingerprint"]:
+        raise ValueError("board changed in transit")
+    return compiled
+
+
+class ShardStats:
+    """
+    Integer counts of a set of games, merged by addition.
+
+    Attributes:
+    - games: The number of games.
+    - rank_counts: Games by seat and rank, shape (players, players + 1);
+      column 0 counts games the seat did not finish.
+    - length_counts: Games by number of rolls.
+    """
+
+    def __init__(self, players):
+        self.games = 0
+        self.rank_counts = np.zeros((players, players + 1), dtype=np.int64)
+        self.length_counts = np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_batch(cls, batch):
+        """Count the games of a finished GameBatch."""
+        stats = cls(batch.num_players)
+        stats.games = len(batch.rolls)
+        for seat in range(batch.num_players):
+            stats.rank_counts[seat] = np.bincount(np.maximum(batch.ranks[:, seat], 0),
+                                                  minlength=batch.num_players + 1)
+        stats.length_counts = np.bincount(batch.rolls).astype(np.int64)
+        return stats
+
+    def merge(self, other):
+        """Add another set of counts to this one."""
+        self.games += other.games
+        self.rank_counts += other.rank_counts
+        ours, theirs = self.length_counts, other.length_counts
+        if len(theirs) > len(ours):
+            ours, theirs = theirs.copy(), ours
+        ours[:len(theirs)] += theirs
+        self.length_counts = ours
+
+    def to_wire(self):
+        return {"games": self.games, "rank_counts": self.rank_counts.tolist(),
+                "length_counts": self.length_counts.tolist()}
+
+    @classmethod
+    def from_wire(cls, data):
+        rank_counts = np.array(data["rank_counts"], dtype=np.int64)
+        stats = cls(len(rank_counts))
+        stats.games = data["games"]
+        stats.rank_counts = rank_counts
+        stats.length_counts = np.array(data["length_counts"], dtype=np.int64)
+        return stats
+
+    def __eq__(self, other):
+        return (self.games == other.games
+                and np.array_equal(self.rank_counts, other.rank_counts)
+                and np.array_equal(self.length_counts, other.length_counts))
+
+    def summary(self):
+        """
+        Derive the usual statistics from the counts.
+
+        Returns:
+        - dict: games, mean_length, win_rates and expected_ranks.
+        """
+        lengths = np.arange(len(self.length_counts))
+        ranks = np.arange(self.rank_counts.shape[1])
+        return {"games": self.games,
+                "mean_length": float((lengths * self.length_counts).sum() / self.games),
+                "win_rates": (self.rank_counts[:, 1] / self.games).tolist(),
+                "expected_ranks": ((self.rank_counts * ranks).sum(axis=1)
+                                   / self.games).tolist()}
+
+
+def _shard_count(job):
+    return -(-job["games"] // job["shard_games"])
+
+
+def run_shard(compiled, job, index):
+    """
+    Play one shard of a job.
+
+    Parameters:
+    - compiled (CompiledBoard): The board of the job.
+    - job (dict): players, games, shard_games and seed.
+    - index (int): The shard number.
+
+    Returns:
+    - ShardStats: Counts of the shard's games.
+    """
+    games = min(job["shard_games"], job["games"] - index * job["shard_games"])
+    rng = np.random.default_rng(np.random.SeedSequence([job["seed"], index]))
+    batch = GameBatch(compiled, games, job["players"])
+    batch.play(rng)
+    return ShardStats.from_batch(batch)
+
+
+def make_job(players, games, seed, shard_games=50000):
+    """Build the job description shared by the coordinator and run_local."""
+    return {"players": players, "games": games, "seed": seed,
+            "shard_games": shard_games}
+
+
+def run_local(compiled, job):
+    """
+    Play every shard of a job in this process.
+
+    Returns:
+    - ShardStats: The merged counts, identical to a sharded run.
+    """
+    total = ShardStats(job["players"])
+    for index in range(_shard_count(job)):
+        total.merge(run_shard(compiled, job, index))
+    return total
+
+
+class Coordinator:
+    """
+    Hands shards of one job to connected workers and merges their results.
+
+    Attributes:
+    - stats: Merged counts of the shards finished so far.
+    - retries: The number of shards handed out again after a failure.
+    """
+
+    def __init__(self, compiled, job, host="127.0.0.1", port=0, timeout=60.0):
+        """
+        Start listening for workers.
+
+        Parameters:
+        - compiled (CompiledBoard): The board of the job.
+        - job (dict): The job, see make_job.
+        - host (str, optional): Address to listen on.
+        - port (int, optional): Port to listen on, 0 picks a free one.
+        - timeout (float, optional): Seconds a worker may take for a shard
+          before the shard is handed to another worker.
+        """
+        self.job = job
+        self.timeout = timeout
+        self.stats = ShardStats(job["players"])
+        self.retries = 0
+        self._board = board_to_wire(compiled)
+        self._pending = queue.Queue()
+        for index in range(_shard_count(job)):
+            self._pending.put(index)
+        self._done = set()
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._server = socket.create_server((host, port))
+        self.address = self._server.getsockname()
+
+    def _serve_worker(self, sock):
+        index = None
+        try:
+            sock.settimeout(self.timeout)
+            _send(sock, {"type": "job", "job": self.job, "board": self._board})
+            while not self._finished.is_set():
+                try:
+                    index = self._pending.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                with self._lock:
+                    if index in self._done:
+                        index = None
+                        continue
+                _send(sock, {"type": "shard", "index": index})
+                reply = _recv(sock)
+                with self._lock:
+                    # a retried shard can finish twice, count it once
+                    if reply["index"] not in self._done:
+                        self._done.add(reply["index"])
+                        self.stats.merge(ShardStats.from_wire(reply["stats"]))
+                        if len(self._done) == _shard_count(self.job):
+                            self._finished.set()
+                index = None
+            _send(sock, {"type": "done"})
+        except (OSError, ValueError, KeyError):
+            if index is not None:
+                with self._lock:
+                    self.retries += 1
+                self._pending.put(index)
+        finally:
+            sock.close()
+
+    def _accept(self):
+        self._server.settimeout(0.1)
+        while not self._finished.is_set():
+            try:
+                sock, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            threading.Thread(target=self._serve_worker, args=(sock,),
+                             daemon=True).start()
+
+    def run(self, deadline=None):
+        """
+        Serve workers until every shard is merged.
+
+        Parameters:
+        - deadline (float, optional): Give up after this many seconds.
+
+        Returns:
+        - ShardStats: The merged counts.
+        """
+        acceptor = threading.Thread(target=self._accept, daemon=True)
+        acceptor.start()
+        try:
+            if not self._finished.wait(deadline):
+                raise TimeoutError(f"{len(self._done)} of {_shard_count(self.job)}"
+                                   " shards finished before the deadline")
+        finally:
+            # stops the acceptor, and workers waiting for a shard get "done"
+            self._finished.set()
+            acceptor.join()
+            self._server.close()
+        return self.stats
+
+
+def worker(host, port, fail_after=None, retry_for=10.0):
+    """
+    Connect to a coordinator and play shards until it is done.
+
+    Parameters:
+    - host (str): Coordinator address.
+    - port (int): Coordinator port.
+    - fail_after (int, optional): Drop the connection on receiving this
+      many-th shard, to test retries.
+    - retry_for (float, optional): Seconds to keep trying to connect.
+    """
+    started = time.monotonic()
+    while True:
+        try:
+            sock = socket.create_connection((host, port))
+            break
+        except ConnectionRefusedError:
+            if time.monotonic() - started > retry_for:
+                raise
+            time.sleep(0.1)
+    with sock:
+        message = _recv(sock)
+        job, compiled = message["job"], board_from_wire(message["board"])
+        shards = 0
+        while True:
+            message = _recv(sock)
+            if message["type"] == "done":
+                return
+            shards += 1
+            if fail_after is not None and shards >= fail_after:
+                return
+            stats = run_shard(compiled, job, message["index"])
+            _send(sock, {"type": "result", "index": message["index"],
+                         "stats": stats.to_wire()})
+
+
+def spawn_local_workers(count, host, port, fail_after=None):
+    """
+    Start workers in local processes, as a stand-in for other machines.
+
+    Parameters:
+    - count (int): The number of workers.
+    - host (str): Coordinator address.
+    - port (int): Coordinator port.
+    - fail_after (list, optional): fail_after of every worker, see worker.
+
+    Returns:
+    - list: The started multiprocessing.Process objects.
+    """
+    processes = []
+    for ix in range(count):
+        failure = fail_after[ix] if fail_after else None
+        process = Process(target=worker, args=(host, port, failure), daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
+
+
+if __name__ == "__main__":
+    # python sharding.py worker HOST PORT
+    if len(sys.argv) == 4 and sys.argv[1] == "worker":
+        worker(sys.argv[2], int(sys.argv[3]))
+    else:
+        print("usage: python sharding.py worker HOST PORT")
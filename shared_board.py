@@ -0,0 +1,204 @@
+"""
+Compiled boards shared read-only between processes.
+
+A CompiledBoard is laid out once in a single flat buffer: a small header
+followed by its arrays, each aligned to 64 bytes. The buffer is placed in
+multiprocessing.shared_memory (or a file that is memory-mapped) and every
+worker builds its CompiledBoard as NumPy views straight onto that buffer, so
+attaching costs the same for a 100 square board as for a board of millions
+of squares and the board exists in memory once however many workers use it.
+
+Classes:
+- SharedBoard: Owner of a compiled board published to shared memory.
+
+Functions:
+- attach: Zero-copy CompiledBoard backed by a published board.
+- save_mmap: Write a compiled board to a file in the shared layout.
+- load_mmap: Zero-copy CompiledBoard backed by a memory-mapped file.
+- init_worker: Pool initializer that attaches a shared board once.
+- worker_board: The board attached by init_worker.
+"""
+
+import mmap
+import os
+import struct
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from compiled_board import CompiledBoard
+
+_MAGIC = b"SNLBOARD"
+# magic, size, dice sides, start square, branch width
+_HEADER = struct.Struct("<8sqqqq")
+_ALIGN = 64
+
+
+def _layout(size, width):
+    """Get the (name, dtype, shape, offset) of every array and the total length."""
+    # the branch table is stored even for width 1, so that attaching never
+    # allocates CompiledBoard's default table in every process
+    arrays = [("dest", np.int64, (size + 1,)), ("kind", np.int8, (size + 1,)),
+              ("branch_dest", np.int64, (size + 1, width)),
+              ("branch_cdf", np.float64, (size + 1, width))]
+    offset = _HEADER.size
+    layout = []
+    for name, dtype, shape in arrays:
+        offset = -(-offset // _ALIGN) * _ALIGN
+        layout.append((name, dtype, shape, offset))
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return layout, offset
+
+
+def _write(compiled, buf):
+    """Write a compiled board into a buffer laid out by _layout."""
+    width = compiled.branch_dest.shape[1]
+    _HEADER.pack_into(buf, 0, _MAGIC, compiled.size, compiled.dice_sides,
+                      compiled.start, width)
+    layout, _ = _layout(compiled.size, width)
+    for name, dtype, shape, offset in layout:
+        view = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+        view[...] = getattr(compiled, name)
+
+
+def _read(buf):
+    """Build a CompiledBoard whose arrays are read-only views of buf."""
+    magic, size, dice_sides, start, width = _HEADER.unpack_from(buf, 0)
+    if magic != _MAGIC:
+        raise ValueError("buffer does not hold a compiled board")
+    layout, nbytes = _layout(size, width)
+    if len(buf) < nbytes:
+        raise ValueError("buffer is too short for its board")
+    arrays = {}
+    for name, dtype, shape, offset in layout:
+        view = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+        view.flags.writeable = False
+        arrays[name] = view
+    return CompiledBoard(size, dice_sides, arrays["dest"], arrays["kind"], start,
+                         arrays["branch_dest"], arrays["branch_cdf"])
+
+
+class SharedBoard:
+    """
+    A compiled board published to a shared memory block.
+
+    The process that publishes the board owns the block and must unlink it
+    once no worker needs it any more.
+
+    Attributes:
+    - name: Name of the shared memory block, passed to attach.
+    - nbytes: Size of the block in bytes.
+    """
+
+    def __init__(self, compiled, name=None):
+        """
+        Copy a compiled board into a new shared memory block.
+
+        Parameters:
+        - compiled (CompiledBoard): The board to publish.
+        - name (str, optional): Name for the block, generated by default.
+        """
+        _, nbytes = _layout(compiled.size, compiled.branch_dest.shape[1])
+        self._shm = shared_memory.SharedMemory(name=name, create=True, size=nbytes)
+        _write(compiled, self._shm.buf)
+        self.name = self._shm.name
+        self.nbytes = nbytes
+
+    def close(self):
+        """Detach this process from the block."""
+        self._shm.close()
+
+    def unlink(self):
+        """Free the block once every process has detached."""
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.unlink()
+
+
+def attach(name):
+    """
+    Attach to a published board without copying it.
+
+    Parameters:
+    - name (str): SharedBoard.name of the published board.
+
+    Returns:
+    - CompiledBoard: Read-only board backed by the shared block. It keeps the
+      block mapped for as long as it is alive.
+    """
+    try:
+        # the publisher owns the block, it must not be unlinked on our exit
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # before Python 3.13 attaching registers the block with the resource
+        # tracker, which pool workers share with the publisher, so the
+        # registration is harmless for them
+        shm = shared_memory.SharedMemory(name=name)
+    compiled = _read(shm.buf)
+    compiled._buffer = shm
+    return compiled
+
+
+def save_mmap(compiled, path):
+    """
+    Write a compiled board to a file in the shared layout.
+
+    Parameters:
+    - compiled (CompiledBoard): The board to write.
+    - path (str): The file to write.
+    """
+    _, nbytes = _layout(compiled.size, compiled.branch_dest.shape[1])
+    buf = bytearray(nbytes)
+    _write(compiled, buf)
+    with open(path, "wb") as board_file:
+        board_file.write(buf)
+
+
+def load_mmap(path):
+    """
+    Memory-map a board written by save_mmap without copying it.
+
+    Parameters:
+    - path (str): The board file.
+
+    Returns:
+    - CompiledBoard: Read-only board backed by the page cache.
+    """
+    with open(path, "rb") as board_file:
+        mapped = mmap.mmap(board_file.fileno(), 0, access=mmap.ACCESS_READ)
+    compiled = _read(mapped)
+    compiled._buffer = mapped
+    return compiled
+
+
+# board attached by init_worker in a pool worker
+_worker_board = None
+
+
+def init_worker(name):
+    """
+    Pool initializer: attach the shared board once per worker process.
+
+    Parameters:
+    - name (str): SharedBoard.name, or a path written by save_mmap.
+    """
+    global _worker_board
+    if os.path.isfile(name):
+        _worker_board = load_mmap(name)
+    else:
+        _worker_board = attach(name)
+
+
+def worker_board():
+    """
+    Get the board attached by init_worker in this process.
+
+    Returns:
+    - CompiledBoard: The shared board.
+    """
+    return _worker_board
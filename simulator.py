@@ -0,0 +1,270 @@
+"""
+Vectorized Monte Carlo simulation on a compiled board.
+
+Instead of playing one Game at a time through GamePlayer and MovingEntity
+objects, every simulated token is a slot in a NumPy array and one loop
+iteration rolls the dice for all unfinished tokens at once.
+
+Classes:
+- TokenRun: Aggregated results of a batch of single-token games.
+- GameBatch: Many multiplayer games stepped one roll at a time in lockstep.
+
+Functions:
+- simulate_tokens: Play many single-token games on a compiled board.
+- roll_dice: Roll a whole array of dice.
+"""
+
+import numpy as np
+
+
+class TokenRun:
+    """
+    Aggregated results of a batch of single-token games.
+
+    Attributes:
+    - rolls: Number of rolls each game needed (0 if it hit max_rolls).
+    - visits: Total times a token was on each square, indexed by square.
+    - landings: Total landings on each square before entities are followed.
+    - hit_games: Number of games that hit each entity square at least once,
+      None when visits were not tracked.
+    - n_games: Number of games played.
+    """
+
+    def __init__(self, rolls, visits, landings, hit_games):
+        self.rolls = rolls
+        self.visits = visits
+        self.landings = landings
+        self.hit_games = hit_games
+        self.n_games = len(rolls)
+
+
+def simulate_tokens(compiled, n_games, seed=None, max_rolls=100000,
+                    track_visits=True):
+    """
+    Play n_games independent single-token games on a compiled board.
+
+    Parameters:
+    - compiled (CompiledBoard): The board to play on.
+    - n_games (int): Number of games to play.
+    - seed (int, optional): Seed for numpy's random Generator.
+    - max_rolls (int, optional): Stop unfinished games after this many rolls.
+    - track_visits (bool, optional): Accumulate visit, landing and hit counts.
+
+    Returns:
+    - TokenRun: The aggregated results.
+    """
+    rng = np.random.default_rng(seed)
+    size = compiled.size
+    dest = compiled.dest
+    entity_squares = compiled.entity_squares()
+    # map each square to a column of the per-game hit matrix, -1 if none
+    entity_index = np.full(size + 1, -1, dtype=np.int64)
+    entity_index[entity_squares] = np.arange(len(entity_squares))
+
+    pos = np.full(n_games, compiled.start, dtype=np.int64)
+    rolls = np.zeros(n_games, dtype=np.int64)
+    # indices of games still being played
+    active = np.arange(n_games)
+    visits = np.zeros(size + 1, dtype=np.int64)
+    landings = np.zeros(size + 1, dtype=np.int64)
+    hits = None
+    if track_visits:
+        visits[compiled.start] += n_games
+        # one bool per game and entity, so only allocated when tracking
+        hits = np.zeros((n_games, len(entity_squares)), dtype=bool)
+
+    step = 0
+    while len(active) and step < max_rolls:
+        step += 1
+        current = pos[active]
+        landing = current + roll_dice(rng, compiled.dice_sides, len(active))
+        in_bounds = landing <= size
+        landing = np.where(in_bounds, landing, current)
+        if compiled.deterministic:
+            end_pos = dest[landing]
+        else:
+            end_pos = _pick_branch(compiled, landing, rng)
+        new_pos = np.where(in_bounds, end_pos, current)
+        pos[active] = new_pos
+        if track_visits:
+            visits += np.bincount(new_pos, minlength=size + 1)
+            landed = landing[in_bounds]
+            landings += np.bincount(landed, minlength=size + 1)
+            column = entity_index[landing]
+            hit = in_bounds & (column >= 0)
+            hits[active[hit], column[hit]] = True
+        finished = new_pos == size
+        rolls[active[finished]] = step
+        active = active[~finished]
+
+    hit_games = None
+    if track_visits:
+        hit_games = dict(zip(entity_squares.tolist(), hits.sum(axis=0).tolist()))
+    return TokenRun(rolls, visits, landings, hit_games)
+
+
+def roll_dice(rng, sides, count):
+    """
+    Roll count dice at once.
+
+    Parameters:
+    - rng (numpy.random.Generator): Source of the dice results.
+    - sides (int): The number of sides in the dice.
+    - count (int): The number of dice to roll.
+
+    Returns:
+    - numpy.ndarray: Dice results between 1 and sides.
+    """
+    return rng.integers(1, sides + 1, size=count)
+
+
+def _pick_branch(compiled, landing, rng):
+    """
+    Resolve multi-destination squares for a whole array of landings.
+
+    Parameters:
+    - compiled (CompiledBoard): The board being played.
+    - landing (numpy.ndarray): Landing squares, all within the board.
+    - rng (numpy.random.Generator): Source of the uniform draws.
+
+    Returns:
+    - numpy.ndarray: The square each token ends on.
+    """
+    u = rng.random(len(landing))
+    branch = (u[:, None] >= compiled.branch_cdf[landing]).sum(axis=1)
+    return compiled.branch_dest[landing, branch]
+
+
+class GameBatch:
+    """
+    Many multiplayer games stepped one roll at a time in lockstep.
+
+    Every array has one row per game. step() applies one dice result to any
+    subset of the games with the rules of Game: the current player is the
+    next unfinished seat (Game.get_next_player), rolls that overshoot the last
+    square are blocked (Game.can_move) and the turn passes as in
+    Game.change_turn, including its consecutive_six counter.
+
+    Attributes:
+    - compiled: The CompiledBoard being played.
+    - num_players: The number of players in every game.
+    - positions: Position of every player, shape (games, players).
+    - ranks: Rank of every player, -1 while still playing.
+    - turn: Seat whose turn it is in every game.
+    - last_rank: The rank achieved by the last player to finish.
+    - consecutive_six: The number of consecutive sixes rolled in one turn.
+    - rolls: Number of dice rolls played in every game.
+    """
+
+    def __init__(self, compiled, n_games, num_players, six=6, max_sixes=3):
+        """
+        Initialize a GameBatch object.
+
+        Parameters:
+        - compiled (CompiledBoard): The board to play on.
+        - n_games (int): The number of games.
+        - num_players (int): The number of players in every game.
+        - six (int, optional): Dice result that earns another roll, None to
+          pass the turn after every roll.
+        - max_sixes (int, optional): Consecutive sixes that pass the turn.
+        """
+        self.compiled = compiled
+        self.num_players = num_players
+        self.six = six
+        self.max_sixes = max_sixes
+        self.positions = np.full((n_games, num_players), compiled.start,
+                                 dtype=np.int64)
+        self.ranks = np.full((n_games, num_players), -1, dtype=np.int16)
+        self.turn = np.zeros(n_games, dtype=np.int64)
+        self.last_rank = np.zeros(n_games, dtype=np.int16)
+        self.consecutive_six = np.zeros(n_games, dtype=np.int64)
+        self.rolls = np.zeros(n_games, dtype=np.int64)
+
+    def active_games(self):
+        """
+        Get the games that still have an unfinished player.
+
+        Returns:
+        - numpy.ndarray: Indices of the active games.
+        """
+        return np.flatnonzero(self.last_rank != self.num_players)
+
+    def current_seats(self, games):
+        """
+        Advance the turn of the given active games past finished players.
+
+        Parameters:
+        - games (numpy.ndarray): Indices of active games.
+
+        Returns:
+        - numpy.ndarray: The seat to roll next in each game.
+        """
+        turn = self.turn[games]
+        for _ in range(self.num_players):
+            done = self.ranks[games, turn] != -1
+            if not done.any():
+                break
+            turn = np.where(done, (turn + 1) % self.num_players, turn)
+        self.turn[games] = turn
+        return turn
+
+    def step(self, games, dice, rng=None):
+        """
+        Apply one dice result to each of the given active games.
+
+        Parameters:
+        - games (numpy.ndarray): Indices of active games.
+        - dice (numpy.ndarray): The dice result for each of those games.
+        - rng (numpy.random.Generator, optional): Source of the draws for
+          multi-destination squares; required unless the board is
+          deterministic.
+
+        Returns:
+        - tuple: (seats, landing, end_pos) arrays: the seat that moved, the
+          square the roll pointed at and where the token now stands.
+        """
+        compiled = self.compiled
+        seats = self.current_seats(games)
+        current = self.positions[games, seats]
+        landing = current + dice
+        in_bounds = landing <= compiled.size
+        target = np.where(in_bounds, landing, current)
+        if compiled.deterministic:
+            end_pos = compiled.dest[target]
+        else:
+            end_pos = _pick_branch(compiled, target, rng)
+        end_pos = np.where(in_bounds, end_pos, current)
+        self.positions[games, seats] = end_pos
+
+        finished = end_pos == compiled.size
+        if finished.any():
+            done_games = games[finished]
+            self.last_rank[done_games] += 1
+            self.ranks[done_games, seats[finished]] = self.last_rank[done_games]
+        self.rolls[games] += 1
+
+        if self.six is None:
+            self.turn[games] = (seats + 1) % self.num_players
+        else:
+            is_six = dice == self.six
+            streak = np.where(is_six, self.consecutive_six[games] + 1, 0)
+            self.consecutive_six[games] = streak
+            advance = ~is_six | (streak == self.max_sixes)
+            self.turn[games] = np.where(advance, (seats + 1) % self.num_players,
+                                        seats)
+        return seats, landing, end_pos
+
+    def play(self, rng, max_rolls=100000):
+        """
+        Roll random dice until every game is over.
+
+        Parameters:
+        - rng (numpy.random.Generator): Source of dice results.
+        - max_rolls (int, optional): Stop unfinished games after this many rolls.
+        """
+        games = self.active_games()
+        while len(games) and max_rolls > 0:
+            dice = roll_dice(rng, self.compiled.dice_sides, len(games))
+            self.step(games, dice, rng)
+            max_rolls -= 1
+            games = games[self.last_rank[games] != self.num_players]
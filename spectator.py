@@ -0,0 +1,204 @@
+"""
+Spectator fan-out of game state with delta frames and update coalescing.
+
+Instead of broadcasting print_game_state for every roll, a SpectatedGame
+publishes one small binary delta per roll (the seat that rolled, the dice
+result, the token's new position, the entity it hit and its rank) to a
+SpectatorChannel. Each delta is encoded once and the same bytes object is
+handed to every subscriber, so publishing costs the same for one spectator
+or a hundred thousand.
+
+Subscribers pull at their own pace. A subscriber that has fallen more than
+coalesce_after frames behind, or further back than the channel's history,
+gets a single snapshot frame with the current position and rank of every
+token instead of the backlog. The snapshot is encoded once per channel
+sequence number and shared by every slow subscriber.
+
+Classes:
+- SpectatorChannel: Ring buffer of encoded frames for one game.
+- Subscriber: One spectator's read cursor into a channel.
+- SpectatedGame: Game that publishes a delta frame for every roll.
+
+Functions:
+- decode_frame: Turn a frame back into a dict.
+"""
+
+import struct
+
+from compiled_board import PLAIN, CompiledBoard
+from updated_Code import Game
+
+DELTA = b"D"
+SNAPSHOT = b"S"
+
+# type, seq, seat, roll, entity kind, rank (0 while playing), position
+_DELTA_FORMAT = struct.Struct("<cIBBBBI")
+# type, seq, number of players, then position and rank per player
+_SNAPSHOT_HEADER = struct.Struct("<cIH")
+_SNAPSHOT_PLAYER = struct.Struct("<IB")
+
+
+class SpectatorChannel:
+    """
+    Encoded frames of one game shared by all of its spectators.
+
+    Attributes:
+    - seq: Sequence number of the latest published delta.
+    - positions: Latest position of every token.
+    - ranks: Latest rank of every token, 0 while still playing.
+    """
+
+    def __init__(self, num_players, start_pos=1, history=256, coalesce_after=32):
+        """
+        Initialize a SpectatorChannel object.
+
+        Parameters:
+        - num_players (int): The number of players in the game.
+        - start_pos (int, optional): The starting position of every token.
+        - history (int, optional): Number of delta frames kept for subscribers.
+        - coalesce_after (int, optional): Lag after which a subscriber gets a
+          snapshot instead of the individual deltas.
+        """
+        self.seq = 0
+        self.positions = [start_pos] * num_players
+        self.ranks = [0] * num_players
+        self.history = history
+        self.coalesce_after = min(coalesce_after, history)
+        self._frames = [None] * history
+        self._snapshot = (-1, b"")
+
+    def publish(self, seat, roll, position, kind=PLAIN, rank=0):
+        """
+        Encode and store the delta of one roll.
+
+        Parameters:
+        - seat (int): The seat that rolled.
+        - roll (int): The dice result.
+        - position (int): The token's position after the roll.
+        - kind (int, optional): Kind of the entity the token hit.
+        - rank (int, optional): The token's rank, 0 while still playing.
+        """
+        self.seq += 1
+        self.positions[seat] = position
+        self.ranks[seat] = rank
+        self._frames[self.seq % self.history] = _DELTA_FORMAT.pack(
+            DELTA, self.seq, seat, roll, kind, rank, position)
+
+    def snapshot(self):
+        """
+        Get the snapshot frame of the current state, encoding it at most once.
+
+        Returns:
+        - bytes: The encoded snapshot.
+        """
+        seq, frame = self._snapshot
+        if seq != self.seq:
+            parts = [_SNAPSHOT_HEADER.pack(SNAPSHOT, self.seq, len(self.positions))]
+            parts.extend(_SNAPSHOT_PLAYER.pack(pos, rank)
+                         for pos, rank in zip(self.positions, self.ranks))
+            frame = b"".join(parts)
+            self._snapshot = (self.seq, frame)
+        return frame
+
+    def subscribe(self):
+        """
+        Add a spectator; its first poll returns a snapshot.
+
+        Returns:
+        - Subscriber: The new subscriber.
+        """
+        return Subscriber(self)
+
+
+class Subscriber:
+    """One spectator's read position in a SpectatorChannel."""
+
+    def __init__(self, channel):
+        self.channel = channel
+        # seq of the last frame this subscriber has seen, -1 for none yet
+        self.cursor = -1
+
+    def poll(self):
+        """
+        Get every frame published since the last poll.
+
+        Returns:
+        - list: Encoded frames, shared with other subscribers. A lagging
+          subscriber gets a single snapshot frame.
+        """
+        channel = self.channel
+        lag = channel.seq - self.cursor
+        if lag == 0:
+            return []
+        if self.cursor < 0 or lag > channel.coalesce_after:
+            self.cursor = channel.seq
+            return [channel.snapshot()]
+        frames = [channel._frames[seq % channel.history]
+                  for seq in range(self.cursor + 1, channel.seq + 1)]
+        self.cursor = channel.seq
+        return frames
+
+
+def decode_frame(frame):
+    """
+    Decode a delta or snapshot frame.
+
+    Parameters:
+    - frame (bytes): A frame returned by Subscriber.poll.
+
+    Returns:
+    - dict: The decoded fields. Snapshots hold positions and ranks lists.
+    """
+    if frame[:1] == DELTA:
+        _, seq, seat, roll, kind, rank, position = _DELTA_FORMAT.unpack(frame)
+        return {"type": "delta", "seq": seq, "seat": seat, "roll": roll,
+                "kind": kind, "rank": rank, "position": position}
+    _, seq, count = _SNAPSHOT_HEADER.unpack_from(frame)
+    positions, ranks = [], []
+    for ix in range(count):
+        pos, rank = _SNAPSHOT_PLAYER.unpack_from(
+            frame, _SNAPSHOT_HEADER.size + ix * _SNAPSHOT_PLAYER.size)
+        positions.append(pos)
+        ranks.append(rank)
+    return {"type": "snapshot", "seq": seq, "positions": positions,
+            "ranks": ranks}
+
+
+class SpectatedGame(Game):
+    """
+    Game that publishes a delta frame to a SpectatorChannel after every roll.
+
+    Attributes:
+    - channel: The SpectatorChannel of this game.
+    """
+
+    def __init__(self, history=256, coalesce_after=32):
+        """
+        Initialize a SpectatedGame object.
+
+        Parameters:
+        - history (int, optional): Delta frames kept for subscribers.
+        - coalesce_after (int, optional): Lag that triggers a snapshot.
+        """
+        super(SpectatedGame, self).__init__()
+        self.channel = None
+        self._history = history
+        self._coalesce_after = coalesce_after
+
+    def initialize_game(self, board, dice_sides, players):
+        super(SpectatedGame, self).initialize_game(board, dice_sides, players)
+        self.channel = SpectatorChannel(len(self.players),
+                                        self.players[0].get_pos(),
+                                        self._history, self._coalesce_after)
+
+    def change_turn(self, dice_result):
+        """Publish the roll of the current player, then change turn."""
+        seat = self.turn
+        player = self.players[seat]
+        landing = self.channel.positions[seat] + dice_result
+        kind = PLAIN
+        if landing <= self.board.get_size() and landing in self.board.board:
+            kind = CompiledBoard.entity_kind(landing, self.board.board[landing])
+        self.channel.publish(seat, dice_result, player.get_pos(), kind,
+                             max(player.get_rank(), 0))
+        super(SpectatedGame, self).change_turn(dice_result)
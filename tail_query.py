@@ -0,0 +1,296 @@
+"""
+Long-horizon tail and percentile queries from a spectral decomposition.
+
+The number of turns a player needs is the absorption time of the turn chain
+of markov.turn_matrix. Its survival function is S(t) = e_start Q^t 1, where Q
+is the transient part of the turn matrix. Stepping the chain answers "how
+likely is a game longer than t turns" in O(t) matrix-vector products; here Q
+is diagonalised once, Q V = V diag(w), so that
+
+    S(t) = sum_k a_k w_k^(t - 2h),    a_k = (e_start Q^h V)_k b_k
+
+where V b = Q^h 1, and every query costs one pass over the eigenvalues
+whatever t is. The largest eigenvalue w_1 is real and positive (Q is
+non-negative), so S(t) decays like a_1 w_1^t and -log w_1 is the asymptotic
+decay rate per turn. Everything is evaluated relative to w_1^t in log space,
+so tails far below the smallest float still come out as log probabilities.
+
+Turn matrices are not diagonalisable in general: the squares just before
+the last one give eigenvalue 0 in Jordan blocks. Q^h removes those blocks
+for h past their size, which is why the expansion is taken between Q^h on
+both sides and only over the non-zero eigenvalues. The first horizon lengths
+are computed exactly by stepping the chain and the spectral formula is
+checked against them; if it disagrees (repeated non-zero eigenvalues, badly
+conditioned eigenvectors), queries beyond the horizon fall back to binary
+powering of Q, O(n^2 log t) per query with the squared powers cached.
+
+Players move independently and every active player gets one turn per round
+(see finish_order), so an N-player game lasts more than t rounds exactly when
+some player needs more than t turns: P = 1 - (1 - S(t))^N. Like FinishOrder,
+the consecutive_six carry-over between players is not modelled.
+
+Classes:
+- TailQuery: Tail probabilities, percentiles and decay rates of game length.
+"""
+
+import math
+
+import numpy as np
+
+import markov
+from compiled_board import CompiledBoard
+
+
+class TailQuery:
+    """
+    Tail and percentile queries of game length on one board.
+
+    Attributes:
+    - compiled: The CompiledBoard analysed.
+    - num_players: The number of players in the game.
+    - rolls: True when lengths count rolls of a single token, not rounds.
+    - horizon: Lengths up to which the survival function is stored exactly.
+    - method: "spectral", or "powering" when the decomposition was rejected.
+    - decay: Dominant eigenvalue w_1 of the transient chain.
+    """
+
+    def __init__(self, board, num_players=1, dice_sides=6, rolls=False,
+                 horizon=256, rtol=1e-9):
+        """
+        Decompose the board's transient transition matrix.
+
+        Parameters:
+        - board (Board or CompiledBoard): The board to analyse.
+        - num_players (int, optional): The number of players in the game.
+        - dice_sides (int, optional): Dice sides, when board is a Board.
+        - rolls (bool, optional): Count rolls of a single token instead of
+          rounds of turns.
+        - horizon (int, optional): Lengths computed exactly by stepping.
+        - rtol (float, optional): Largest relative disagreement accepted
+          between the spectral formula and stepping.
+        """
+        if not isinstance(board, CompiledBoard):
+            board = CompiledBoard.from_board(board, dice_sides)
+        if rolls and num_players != 1:
+            raise ValueError("roll counts are only defined for a single player")
+        self.compiled = board
+        self.num_players = num_players
+        self.rolls = rolls
+        self.horizon = horizon
+        P, _ = markov.roll_matrices(board)
+        T = P if rolls else markov.turn_matrix(board, P)
+        n = board.size - 1
+        if board.start - 1 == n:
+            raise ValueError("the game is over before it starts")
+        Q = T[:n, :n]
+        # drop states a token can never reach, such as snake heads; they only
+        # add zero eigenvalues, which are the defective ones
+        reachable = self._reachable(Q, board.start - 1)
+        self._Q = Q[np.ix_(reachable, reachable)]
+        start = int(np.searchsorted(np.flatnonzero(reachable), board.start - 1))
+        self._start = np.zeros(len(self._Q))
+        self._start[start] = 1.0
+
+        # exact survival for the first horizon lengths
+        survival = np.empty(horizon + 1)
+        self._shift = horizon // 4
+        dist = self._start.copy()
+        for t in range(horizon + 1):
+            if t == self._shift:
+                left = dist
+            survival[t] = dist.sum()
+            dist = dist @ self._Q
+        self._survival = survival
+        right = np.ones(len(self._Q))
+        for _ in range(self._shift):
+            right = self._Q @ right
+
+        w, V = np.linalg.eig(self._Q)
+        keep = np.abs(w) > 1e-9
+        w, V = w[keep], V[:, keep]
+        order = np.argsort(-np.abs(w))
+        w, V = w[order], V[:, order]
+        self.decay = float(w[0].real)
+        self._powers = None
+        b = np.linalg.lstsq(V, right, rcond=None)[0]
+        # relative to the dominant term: ratios never overflow
+        self._weights = (left @ V) * b
+        self._ratios = w / w[0]
+        self.method = "spectral"
+        check = np.arange(horizon // 2, horizon + 1)
+        exact = np.log(survival[check])
+        with np.errstate(all="ignore"):
+            approx = np.array([self._log_survival_spectral(t) for t in check])
+        if not np.all(np.abs(approx - exact) <= rtol):
+            self.method = "powering"
+
+    @staticmethod
+    def _reachable(Q, start):
+        reachable = np.zeros(len(Q), dtype=bool)
+        reachable[start] = True
+        frontier = reachable.copy()
+        while frontier.any():
+            frontier = (Q[frontier] > 0).any(axis=0) & ~reachable
+            reachable |= frontier
+        return reachable
+
+    def _log_survival_spectral(self, t):
+        steps = t - 2 * self._shift
+        total = (self._weights * self._ratios ** steps).sum().real
+        if not total > 0.0:
+            return -math.inf
+        return steps * math.log(self.decay) + math.log(total)
+
+    def _log_survival_powering(self, t):
+        # Q^(2^k) = exp(log_scale) * matrix, rescaled so long powers do not
+        # underflow
+        if self._powers is None:
+            self._powers = [(self._Q, 0.0)]
+        vector = self._start
+        log_total = 0.0
+        bit = 0
+        while t:
+            if bit == len(self._powers):
+                matrix, log_scale = self._powers[-1]
+                square = matrix @ matrix
+                peak = square.max()
+                if peak <= 0.0:
+                    return -math.inf
+                self._powers.append((square / peak, 2 * log_scale + math.log(peak)))
+            if t & 1:
+                matrix, log_scale = self._powers[bit]
+                vector = vector @ matrix
+                mass = vector.sum()
+                if mass <= 0.0:
+                    return -math.inf
+                log_total += log_scale + math.log(mass)
+                vector = vector / mass
+            t >>= 1
+            bit += 1
+        return log_total
+
+    def log_survival(self, t):
+        """
+        Get the log probability that one player needs more than t turns.
+
+        Parameters:
+        - t (int): The number of turns (rolls when rolls is set).
+
+        Returns:
+        - float: log P(length > t), -inf when it is zero.
+        """
+        if t < 0:
+            return 0.0
+        if t <= self.horizon:
+            value = self._survival[t]
+            return math.log(value) if value > 0.0 else -math.inf
+        if self.method == "spectral":
+            return self._log_survival_spectral(t)
+        return self._log_survival_powering(t)
+
+    def log_tail(self, t):
+        """
+        Get the log probability that the game lasts more than t rounds.
+
+        Parameters:
+        - t (int): The number of rounds (rolls when rolls is set).
+
+        Returns:
+        - float: log P(game length > t).
+        """
+        log_s = self.log_survival(t)
+        if self.num_players == 1 or log_s == -math.inf:
+            return log_s
+        if log_s < -30.0:
+            # 1 - (1 - S)^N = N S to well within float precision
+            return math.log(self.num_players) + log_s
+        return math.log(-math.expm1(self.num_players * math.log1p(-math.exp(log_s))))
+
+    def tail(self, t):
+        """
+        Get the probability that the game lasts more than t rounds.
+
+        Parameters:
+        - t (int): The number of rounds (rolls when rolls is set).
+
+        Returns:
+        - float: P(game length > t); underflows to 0 far out, see log_tail.
+        """
+        return math.exp(self.log_tail(t))
+
+    def length_for_tail(self, p):
+        """
+        Get the shortest length the game exceeds with probability at most p.
+
+        Parameters:
+        - p (float): The tail probability, for example 1e-4.
+
+        Returns:
+        - int: The smallest t with P(game length > t) <= p.
+        """
+        if not 0.0 < p < 1.0:
+            raise ValueError("p must be between 0 and 1")
+        target = math.log(p)
+        if self.log_tail(self.horizon) <= target:
+            low, high = -1, self.horizon
+        else:
+            # the tail is a_1 w_1^t far out: start from that guess and widen
+            guess = self.horizon + (target - self.log_tail(self.horizon)) / math.log(self.decay)
+            low = high = max(int(guess), self.horizon + 1)
+            step = 1
+            while self.log_tail(high) > target:
+                low, high = high, high + step
+                step *= 2
+            step = 1
+            while low > self.horizon and self.log_tail(low) <= target:
+                high, low = low, max(low - step, self.horizon)
+                step *= 2
+        # log_tail(low) > target >= log_tail(high)
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.log_tail(middle) <= target:
+                high = middle
+            else:
+                low = middle
+        return high
+
+    def percentile(self, q):
+        """
+        Get a percentile of the game length.
+
+        Parameters:
+        - q (float): The percentile as a fraction, for example 0.9999.
+
+        Returns:
+        - int: The smallest t with P(game length <= t) >= q.
+        """
+        return self.length_for_tail(1.0 - q)
+
+    def decay_rate(self):
+        """
+        Get the asymptotic decay rate of the game length tail.
+
+        Returns:
+        - float: -log w_1, the tail shrinks by a factor e every 1 / rate
+          rounds (rolls when rolls is set).
+        """
+        return -math.log(self.decay)
+
+    def half_life(self):
+        """
+        Get how many more rounds halve the tail probability far out.
+
+        Returns:
+        - float: log 2 / decay_rate.
+        """
+        return math.log(2.0) / self.decay_rate()
+
+
+if __name__ == "__main__":
+    from updated_Code import BoardSetup
+
+    query = TailQuery(BoardSetup.setup(), num_players=2)
+    print(f"method {query.method}, tail halves every {query.half_life():.2f} rounds")
+    for rounds in (100, 1000, 100000):
+        print(f"P(2-player game > {rounds} rounds) = exp({query.log_tail(rounds):.2f})")
+    print(f"99.99th percentile: {query.percentile(0.9999)} rounds")
@@ -0,0 +1,68 @@
+import gc
+import weakref
+
+import numpy as np
+import pytest
+
+from board_registry import BoardRegistry
+from compiled_board import CompiledBoard
+from game_host import GameHost
+from updated_Code import BoardSetup
+
+
+@pytest.fixture
+def compiled():
+    return CompiledBoard.from_board(BoardSetup.setup(), 6)
+
+
+def test_published_board_is_a_frozen_copy(compiled):
+    registry = BoardRegistry(compiled)
+    current = registry.current()
+    assert current is not compiled and current.version == 1
+    assert np.array_equal(current.dest, compiled.dest)
+    with pytest.raises(ValueError):
+        current.dest[1] = 2
+    compiled.dest[1] = 2
+    assert current.dest[1] != 2
+
+
+def test_publish_swaps_the_current_version(compiled):
+    registry = BoardRegistry()
+    assert registry.current() is None
+    first = registry.publish(compiled)
+    second = registry.publish(BoardSetup.setup(), 6)
+    assert (first.version, second.version) == (1, 2)
+    assert registry.current() is second
+    assert registry.get(1) is first and registry.live_versions() == [1, 2]
+
+
+def test_old_version_lives_while_a_game_holds_it(compiled):
+    registry = BoardRegistry(compiled)
+    reclaimed = []
+    registry.on_reclaim = reclaimed.append
+    held = registry.current()
+    registry.publish(compiled)
+    gc.collect()
+    assert registry.live_versions() == [1, 2] and reclaimed == []
+    del held
+    gc.collect()
+    assert registry.live_versions() == [2] and reclaimed == [1]
+    assert registry.get(1) is None
+
+
+def test_host_swap_keeps_running_games_on_their_version(compiled):
+    host = GameHost(compiled, seed=3)
+    running = host.handle({"op": "create", "players": 2})
+    assert host.swap_board(BoardSetup.setup(), 6) == 2
+    assert host.handle({"op": "create", "players": 2})["version"] == 2
+    assert host.games[running["game"]].compiled.version == running["version"] == 1
+    assert host.handle({"op": "stats"})["versions"] == [1, 2]
+
+
+def test_discarded_registry_is_collected(compiled):
+    registry = BoardRegistry(compiled)
+    registry_ref = weakref.ref(registry)
+    board_ref = weakref.ref(registry.current())
+    del registry
+    gc.collect()
+    assert registry_ref() is None and board_ref() is None
@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+import pytest
+
+from choose_die import MAX_SIXES, ChooseDieGame, ChooseDiePolicy, greedy
+from compiled_board import CompiledBoard
+from updated_Code import BoardSetup
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    return CompiledBoard.from_board(BoardSetup.setup(), 6)
+
+
+@pytest.fixture(scope="module")
+def policy(compiled):
+    return ChooseDiePolicy.solve(compiled)
+
+
+def test_policy_beats_greedy(compiled, policy):
+    rng = random.Random(2)
+    wins = 0
+    for game_ix in range(2000):
+        strategies = [policy.strategy, greedy] if game_ix % 2 == 0 else [greedy, policy.strategy]
+        ranks = ChooseDieGame(compiled, strategies, rng).play()
+        wins += ranks.index(1) == game_ix % 2
+    assert wins > 1000
+
+
+def test_expected_turns_and_table_shape(compiled, policy):
+    assert policy.expected_turns() > 1.0
+    assert policy.expected_turns(compiled.size) == 0.0
+    assert policy.table.shape[0] == MAX_SIXES
+
+
+def test_save_and_load(compiled, policy, tmp_path):
+    path = str(tmp_path / "policy.npz")
+    policy.save(path)
+    loaded = ChooseDiePolicy.load(path, compiled)
+    assert np.array_equal(loaded.table, policy.table)
+    with pytest.raises(ValueError):
+        ChooseDiePolicy.load(path, CompiledBoard.from_layout(50, {}, {}))
+
+
+def test_six_streak_is_not_inherited_after_finishing_on_a_six(compiled):
+    seen = []
+
+    def always_six(game, pos, small, large):
+        return 6
+
+    def record(game, pos, small, large):
+        seen.append(game.consecutive_six)
+        return small
+
+    game = ChooseDieGame(compiled, [always_six, record], random.Random(0))
+    game.positions[0] = compiled.size - 12
+    game.play_roll()
+    assert game.consecutive_six == 1
+    game.play_roll()
+    assert game.ranks[0] == 1
+    game.play_roll()
+    assert seen == [0]
+
+
+def test_streak_stays_in_range_for_one_player(compiled, policy):
+    game = ChooseDieGame(compiled, [policy.strategy], random.Random(5))
+    for _ in range(300):
+        if not game.can_play():
+            break
+        game.play_roll()
+        assert 0 <= game.consecutive_six < MAX_SIXES
@@ -0,0 +1,61 @@
+import random
+
+import numpy as np
+import pytest
+
+import markov
+from compiled_board import OTHER, CompiledBoard
+from simulator import simulate_tokens
+from updated_Code import Board, ConditionalLadder, Ladder, Snake, Wormhole
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    board = Board(30)
+    board.set_moving_entity(5, Wormhole([2, 20, 25], [1, 2, 1]))
+    board.set_moving_entity(10, ConditionalLadder(28, probability=0.25))
+    board.set_moving_entity(27, Snake(3))
+    board.set_moving_entity(12, Ladder(18))
+    return CompiledBoard.from_board(board, 6)
+
+
+def test_branch_tables(compiled):
+    assert not compiled.deterministic
+    assert compiled.branch_dest.shape == compiled.branch_cdf.shape == (31, 3)
+    assert compiled.kind[5] == OTHER
+    assert compiled.destinations(5) == [(2, 0.25), (20, 0.5), (25, 0.25)]
+    assert compiled.destinations(10) == [(28, 0.25), (10, 0.75)]
+    assert compiled.destinations(12) == [(18, 1.0)]
+    assert compiled.destinations(7) == [(7, 1.0)]
+    assert [compiled.next_pos(3, 2, u) for u in (0.1, 0.5, 0.9)] == [2, 20, 25]
+    assert [compiled.next_pos(8, 2, u) for u in (0.1, 0.9)] == [28, 10]
+
+
+def test_transition_rows_sum_to_one(compiled):
+    P, _ = markov.roll_matrices(compiled)
+    np.testing.assert_allclose(P.sum(axis=1), 1.0)
+    assert P[3, 19] == pytest.approx(0.5 / 6)
+
+
+def test_simulated_branches_match_the_chain(compiled):
+    pmf = markov.finish_time_distribution(compiled)
+    exact_mean = (np.arange(len(pmf)) * pmf).sum()
+    run = simulate_tokens(compiled, 40000, seed=5)
+    assert run.rolls.mean() == pytest.approx(exact_mean, rel=0.03)
+    landed = run.hit_games[5] / 40000
+    assert landed == pytest.approx(markov.entity_hit_probabilities(compiled)[5], abs=0.02)
+
+
+def test_object_board_follows_the_same_odds():
+    random.seed(6)
+    board = Board(30)
+    board.set_moving_entity(10, ConditionalLadder(28, probability=0.25))
+    climbs = sum(board.resolve(10)[0] == 28 for _ in range(4000))
+    assert climbs / 4000 == pytest.approx(0.25, abs=0.03)
+
+
+def test_wormhole_needs_a_weight_per_destination():
+    with pytest.raises(Exception):
+        Wormhole([2, 3], [1])
+    with pytest.raises(Exception):
+        Wormhole([])
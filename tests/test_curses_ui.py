@@ -0,0 +1,68 @@
+import curses
+
+import pytest
+
+from curses_ui import CursesView, cell_size
+from updated_Code import BoardSetup, Game
+
+
+class FakeScreen:
+    """Stands in for a curses window, failing like curses off the screen."""
+
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.cells = {}
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def addstr(self, y, x, text, attr=0):
+        if y >= self.height or x + len(text) > self.width:
+            raise curses.error("addwstr() returned ERR")
+        for dx, char in enumerate(text):
+            self.cells[y, x + dx] = char
+
+    def line(self, y):
+        return "".join(self.cells.get((y, x), " ") for x in range(self.width))
+
+
+def make_game(players=2):
+    game = Game()
+    game.initialize_game(BoardSetup.setup(), 6, players)
+    return game
+
+
+def test_cell_size_shrinks_to_the_terminal():
+    assert cell_size(40, 80, 10) == (6, 2)
+    assert cell_size(24, 80, 10) == (6, 1)
+    assert cell_size(24, 45, 10) == (3, 1)
+    assert cell_size(21, 80, 10) is None
+    assert cell_size(24, 40, 10) is None
+
+
+def test_board_fits_80x24():
+    screen = FakeScreen(24, 80)
+    view = CursesView(screen, make_game())
+    view.draw_board()
+    view.set_status("ready")
+    assert (view.cell_w, view.cell_h) == (6, 1)
+    assert screen.line(view.status_y).startswith("ready")
+    # both tokens start on square 1, drawn over the end of its label
+    assert screen.line(view.status_y - 2)[1:7] == "1>3812"
+    for _ in range(20):
+        view.play_roll()
+
+
+def test_too_small_terminal_is_rejected():
+    with pytest.raises(ValueError):
+        CursesView(FakeScreen(20, 80), make_game())
+
+
+def test_shrinking_mid_game_does_not_raise():
+    screen = FakeScreen(40, 80)
+    view = CursesView(screen, make_game())
+    screen.height, screen.width = 5, 20
+    view.draw_board()
+    view.set_status("still playing")
+    view.play_roll()
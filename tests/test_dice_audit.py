@@ -0,0 +1,90 @@
+import sqlite3
+from collections import Counter
+
+import pytest
+
+from dice_audit import (AuditedDice, AuditedGame, RollChain, commitment, new_seed,
+                        roll_stream, verify_game, verify_games)
+from persistence import GameEventStore
+from updated_Code import BoardSetup
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "games.db")
+
+
+def play(store, batch, client_seed=None):
+    game = AuditedGame(store, client_seed or new_seed(), batch=batch)
+    game.initialize_game(BoardSetup.setup(), 6, 2)
+    for _ in game.events():
+        pass
+    return game
+
+
+def test_dice_match_the_stream():
+    server, client = new_seed(), new_seed()
+    dice = AuditedDice(6, server, "g", client)
+    rolls = [dice.roll() for _ in range(500)]
+    assert rolls == roll_stream(server, "g", client, 6, 500)
+    assert set(Counter(rolls)) == set(range(1, 7))
+
+
+def test_chain_links_every_batch():
+    chain = RollChain(commitment(new_seed()), "g", batch=3)
+    links = [chain.add(roll) for roll in (1, 2, 3, 4)]
+    assert links[:2] == [None, None] and links[2][0] == 3 and links[3] is None
+    assert chain.link()[0] == 4 and chain.link() is None
+
+
+@pytest.mark.parametrize("batch", [1, 5, 64])
+def test_games_verify_with_their_own_batch(path, batch):
+    store = GameEventStore(path)
+    games = [play(store, batch) for _ in range(3)]
+    store.close()
+    for game in games:
+        assert verify_game(path, game.game_id) is None
+        assert store.dice_audit(game.game_id)[3] == batch
+    assert verify_games(path, processes=1) == {}
+
+
+def test_game_played_through_events_is_revealed(path):
+    store = GameEventStore(path)
+    game = play(store, 8)
+    store.flush()
+    assert store.dice_audit(game.game_id)[2] is not None
+    assert store.unfinished_games() == []
+    store.close()
+    assert verify_game(path, game.game_id) is None
+
+
+def test_tampered_roll_is_found(path):
+    store = GameEventStore(path)
+    game = play(store, 8)
+    store.close()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("UPDATE turns SET roll = roll % 6 + 1 WHERE game_id = ? AND seq = 2",
+                     (game.game_id,))
+    conn.close()
+    assert verify_game(path, game.game_id).startswith("roll 2 is")
+
+
+def test_client_seed_is_required(path):
+    store = GameEventStore(path)
+    with pytest.raises(TypeError):
+        AuditedGame(store)
+    with pytest.raises(ValueError):
+        AuditedGame(store, "")
+    store.close()
+
+
+def test_audited_game_is_not_restored(path):
+    store = GameEventStore(path)
+    game = AuditedGame(store, new_seed())
+    game.initialize_game(BoardSetup.setup(), 6, 2)
+    store.flush()
+    assert store.unfinished_games() == [game.game_id]
+    with pytest.raises(ValueError):
+        store.restore_game(game.game_id, BoardSetup.setup())
+    store.close()
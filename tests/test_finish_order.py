@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from compiled_board import CompiledBoard
+from finish_order import FinishOrder
+from simulator import GameBatch
+from updated_Code import BoardSetup
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    return CompiledBoard.from_board(BoardSetup.setup(), 6)
+
+
+@pytest.mark.parametrize("players", [1, 2, 4])
+def test_rank_probabilities_are_a_doubly_stochastic_matrix(compiled, players):
+    order = FinishOrder(compiled, players)
+    np.testing.assert_allclose(order.rank_probabilities.sum(axis=0), 1.0, atol=1e-9)
+    np.testing.assert_allclose(order.rank_probabilities.sum(axis=1), 1.0, atol=1e-9)
+    assert order.rounds_pmf.sum() == pytest.approx(1.0)
+    assert order.expected_ranks().sum() == pytest.approx(players * (players + 1) / 2)
+
+
+def test_first_mover_wins_more_often(compiled):
+    order = FinishOrder(compiled, 3)
+    wins = order.win_probabilities()
+    assert order.first_mover_advantage() > 0
+    assert list(wins) == sorted(wins, reverse=True)
+
+
+@pytest.mark.parametrize("players", [2, 3])
+def test_matches_simulated_games(compiled, players):
+    games = 100000
+    order = FinishOrder(compiled, players)
+    batch = GameBatch(compiled, games, players)
+    batch.play(np.random.default_rng(4))
+    simulated = np.array([[(batch.ranks[:, seat] == rank).mean()
+                           for rank in range(1, players + 1)]
+                          for seat in range(players)])
+    # four standard errors at worst, well below the 2-player first-mover
+    # edge of about 0.021; the six count carried over between players is not
+    # modelled, but its effect is smaller still
+    atol = 4 * np.sqrt(0.25 / games)
+    np.testing.assert_allclose(simulated, order.rank_probabilities, atol=atol)
+    np.testing.assert_allclose(simulated[:, 0], order.win_probabilities(), atol=atol)
+    assert batch.rolls.mean() == pytest.approx(order.expected_rolls, rel=0.03)
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from compiled_board import CompiledBoard
+from game_host import GameHost
+from updated_Code import BoardSetup
+
+
+@pytest.fixture
+def host():
+    return GameHost(CompiledBoard.from_board(BoardSetup.setup(), 6), seed=1)
+
+
+def play_to_end(host, players):
+    reply = host.handle({"op": "create", "players": players})
+    game, turn = reply["game"], reply["turn"]
+    for _ in range(100000):
+        reply = host.handle({"op": "roll", "game": game, "seat": turn})
+        assert reply["ok"]
+        if reply["over"]:
+            return reply
+        turn = reply["turn"]
+    raise AssertionError("game did not end")
+
+
+def test_game_is_played_and_dropped(host):
+    play_to_end(host, 3)
+    assert host.games == {}
+    assert host.handle({"op": "stats"})["games"] == 0
+
+
+def test_rolling_out_of_turn_is_refused(host):
+    reply = host.handle({"op": "create", "players": 2})
+    wrong = 1 - reply["turn"]
+    refused = host.handle({"op": "roll", "game": reply["game"], "seat": wrong})
+    assert not refused["ok"] and refused["turn"] == reply["turn"]
+
+
+@pytest.mark.parametrize("request_", [
+    {"op": "roll", "game": ["x"], "seat": 0},
+    {"op": "roll", "game": {"a": 1}, "seat": 0},
+    {"op": "roll", "game": 1, "seat": [0]},
+    {"op": "create", "players": True},
+    {"op": "create", "players": 2.5},
+    ["op", "stats"],
+    {"op": "fly"},
+])
+def test_malformed_requests_get_error_replies(host, request_):
+    reply = host.handle(request_)
+    assert reply["ok"] is False and reply["error"]
+
+
+def test_connection_survives_a_bad_request(host):
+    async def exchange():
+        server = await host.serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        replies = []
+        for line in (b'{"op": "roll", "game": ["x"]}\n', b"not json\n",
+                     b'{"op": "stats"}\n'):
+            writer.write(line)
+            replies.append(json.loads(await reader.readline()))
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return replies
+
+    bad, garbled, stats = asyncio.run(exchange())
+    assert not bad["ok"] and not garbled["ok"]
+    # the garbled line never reaches handle
+    assert stats["ok"] and stats["requests"] == 2
+
+
+def test_swapped_board_is_used_for_new_games(host):
+    first = host.handle({"op": "create"})
+    version = host.swap_board(CompiledBoard.from_layout(50, {40: 3}, {5: 30}))
+    second = host.handle({"op": "create"})
+    assert second["version"] == version != first["version"]
+
+
+def test_dropped_client_games_are_removed(host):
+    async def abandon():
+        server = await host.serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for _ in range(3):
+            writer.write(b'{"op": "create", "players": 2}\n')
+            await reader.readline()
+        open_games = len(host.games)
+        # hang up mid-game
+        writer.close()
+        await writer.wait_closed()
+        for _ in range(100):
+            if not host.games:
+                break
+            await asyncio.sleep(0.01)
+        server.close()
+        await server.wait_closed()
+        return open_games
+
+    assert asyncio.run(abandon()) == 3
+    assert host.games == {} and host._last_used == {}
+
+
+def test_idle_games_expire():
+    host = GameHost(CompiledBoard.from_board(BoardSetup.setup(), 6), max_games=2,
+                    idle_timeout=0.05)
+    first = host.handle({"op": "create"})
+    host.handle({"op": "create"})
+    assert host.handle({"op": "create"})["error"] == "host is full"
+    time.sleep(0.1)
+    assert host.handle({"op": "create"})["ok"]
+    assert first["game"] not in host.games and len(host.games) == 1
+    # a roll keeps a game alive
+    game = max(host.games)
+    host.handle({"op": "roll", "game": game, "seat": host.games[game].current_seat()})
+    assert game in host.games
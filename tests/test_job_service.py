@@ -0,0 +1,77 @@
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from job_service import DONE, JobService, _Handler
+
+
+@pytest.fixture(scope="module")
+def service():
+    service = JobService(processes=1, chunk_games=500)
+    yield service
+    service.close()
+
+
+@pytest.fixture(scope="module")
+def server(service):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+
+def request(address, method, path, body=None):
+    conn = http.client.HTTPConnection(*address, timeout=30)
+    conn.request(method, path, body=None if body is None else json.dumps(body))
+    response = conn.getresponse()
+    data = response.read()
+    conn.close()
+    return response.status, data
+
+
+def wait_done(service, job):
+    seen = None
+    while True:
+        seen, status = service.wait_for_change(job, seen, timeout=30)
+        if status["state"] not in ("queued", "running"):
+            return status
+
+
+def test_job_runs_and_frees_its_board(service):
+    job, deduplicated = service.submit({"games": 1200, "seed": 3})
+    assert not deduplicated and job.chunks == 3
+    status = wait_done(service, job)
+    assert status["state"] == DONE
+    assert status["result"]["games"] == 1200
+    assert sum(status["result"]["win_rates"]) == pytest.approx(1.0)
+    assert job.board is None
+
+
+def test_rules_are_cast_before_deduplication(service):
+    first, _ = service.submit({"games": 10, "rules": {"six": 6}, "seed": 9})
+    second, deduplicated = service.submit({"games": 10, "rules": {"six": "6"}, "seed": 9})
+    assert deduplicated and second is first
+    assert first.six == 6
+
+
+@pytest.mark.parametrize("spec", [{"games": 0}, {"games": -5}, {"players": 0}])
+def test_empty_jobs_are_rejected(service, server, spec):
+    with pytest.raises(ValueError):
+        service.submit(spec)
+    code, body = request(server, "POST", "/jobs", spec)
+    assert code == 400 and "error" in json.loads(body)
+
+
+def test_events_end_when_the_job_is_done(server):
+    code, body = request(server, "POST", "/jobs", {"games": 700, "seed": 5})
+    assert code == 201
+    job_id = json.loads(body)["id"]
+    code, body = request(server, "GET", f"/jobs/{job_id}/events")
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert code == 200 and lines[-1]["state"] == DONE
@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+from load_generator import LoadStats, _start_host, run, think_time
+
+
+def test_think_time_specs():
+    rng = random.Random(1)
+    assert think_time("0")(rng) == 0
+    assert think_time("const:0.1")(rng) == 0.1
+    sample = think_time("uniform:0.05,0.2")
+    assert all(0.05 <= sample(rng) <= 0.2 for _ in range(100))
+    with pytest.raises(ValueError):
+        think_time("gamma:1")
+
+
+def test_stats_windows_and_totals():
+    stats = LoadStats()
+    for ms in range(1, 101):
+        stats.record(ms / 1000, ok=ms != 50)
+    window = stats.take_window(2.0)
+    assert window["requests"] == 100 and window["throughput"] == 50.0
+    assert window["p50_ms"] == pytest.approx(50) and window["error_rate"] == 0.01
+    assert stats.take_window(1.0)["requests"] == 0
+    assert stats.total(2.0)["requests"] == 100
+
+
+def test_spawned_host_from_another_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    process, port = _start_host(0)
+    try:
+        totals = run(port=port, clients=4, duration=0.5, seed=1, out=None)
+    finally:
+        process.kill()
+        process.wait()
+        process.stdout.close()
+    assert totals["games"] > 0 and totals["error_rate"] == 0.0
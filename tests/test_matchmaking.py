@@ -0,0 +1,75 @@
+import pytest
+
+from matchmaking import MatchQueue, create_games, simulate
+from updated_Code import BoardSetup
+
+
+def test_join_twice_is_rejected():
+    queue = MatchQueue(2)
+    queue.join("a", 1500, now=0)
+    with pytest.raises(ValueError):
+        queue.join("a", 1500, now=0)
+
+
+def test_tables_group_nearest_ratings():
+    queue = MatchQueue(3, base_window=10, widen_rate=0)
+    for player, rating in enumerate([1000, 1005, 1500, 1003, 2000, 1510, 1495]):
+        queue.join(player, rating, now=0)
+    assert queue.match(0) == [[0, 1, 3], [2, 5, 6]]
+    assert len(queue) == 1 and 4 in queue
+
+
+def test_leave_removes_player():
+    queue = MatchQueue(2, base_window=1000)
+    queue.join("a", 1500, now=0)
+    queue.join("b", 1500, now=0)
+    queue.leave("a")
+    assert "a" not in queue
+    assert queue.match(0) == []
+    queue.join("c", 1500, now=0)
+    assert queue.match(0) == [["b", "c"]]
+
+
+def test_window_widens_with_wait():
+    queue = MatchQueue(4, base_window=0, widen_rate=100)
+    for player, rating in enumerate([1000, 1200, 1400, 1600]):
+        queue.join(player, rating, now=0)
+    assert queue.match(1) == []
+    assert queue.match(3) == []
+    assert queue.match(7) == [[0, 1, 2, 3]]
+
+
+def test_max_window_caps_widening():
+    queue = MatchQueue(2, base_window=0, widen_rate=100, max_window=50)
+    queue.join("a", 1000, now=0)
+    queue.join("b", 1200, now=0)
+    assert queue.match(1000) == []
+
+
+@pytest.mark.parametrize("scan", [None, 10000, 64])
+def test_unmatchable_players_do_not_block_the_queue(scan):
+    queue = MatchQueue(4, max_window=100, max_rating=30000, scan=scan)
+    # 93 players too far from anyone to ever be matched
+    for player in range(93):
+        queue.join(("isolated", player), 2000 + 250 * player, now=0)
+    for player in range(2000):
+        queue.join(player, 1500, now=1)
+    tables = []
+    for tick in range(50):
+        tables += queue.match(2 + tick)
+    assert len(tables) == 500
+    assert all(isinstance(p, int) for table in tables for p in table)
+    assert len(queue) == 93
+
+
+def test_create_games_initializes_a_game_per_table():
+    games = create_games([[1, 2], [3, 4]], BoardSetup.setup(), 6)
+    assert [table for table, _ in games] == [[1, 2], [3, 4]]
+    assert all(len(game.players) == 2 for _, game in games)
+
+
+def test_simulate_reports_waits():
+    report = simulate(2000, duration=1.0, table_size=4, target_p99=5.0, seed=1)
+    assert report["tables"] * 4 + report["waiting"] == report["joins"]
+    assert report["p99_wait"] >= report["p50_wait"] >= 0
+    assert report["target_met"]
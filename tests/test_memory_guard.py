@@ -0,0 +1,76 @@
+import tracemalloc
+
+import pytest
+
+from compiled_board import CompiledBoard
+from memory_guard import MemoryBudget, MemoryProfiler, run_guarded
+from simulator import simulate_tokens
+from updated_Code import BoardSetup
+
+
+@pytest.fixture(autouse=True)
+def no_tracing():
+    assert not tracemalloc.is_tracing()
+    yield
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+        pytest.fail("tracemalloc left running")
+
+
+def test_simulate_tokens_counts_as_players():
+    compiled = CompiledBoard.from_board(BoardSetup.setup(), 6)
+    kept = []
+
+    def play_batch(size):
+        kept.append(simulate_tokens(compiled, size, seed=len(kept)))
+
+    profiler = MemoryProfiler()
+    assert run_guarded(play_batch, 20000, 5000, profiler=profiler) == 20000
+    report = profiler.report()
+    # every kept run holds at least its int64 rolls array
+    assert report["players"]["max_sampled_bytes"] >= 20000 * 8
+
+
+def test_peak_includes_memory_freed_within_a_batch():
+    def play_batch(size):
+        scratch = bytearray(size * 1000)
+        del scratch
+
+    profiler = MemoryProfiler()
+    run_guarded(play_batch, 30000, 10000, profiler=profiler)
+    report = profiler.report()
+    assert len(profiler.peaks) == 3
+    assert report["total"]["peak_bytes"] >= 10000 * 1000
+    assert report["total"]["steady_bytes"] < 10000 * 1000
+
+
+def test_tracing_stops_when_a_batch_fails():
+    def play_batch(size):
+        raise RuntimeError("batch failed")
+
+    with pytest.raises(RuntimeError):
+        run_guarded(play_batch, 10, 5, profiler=MemoryProfiler())
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracing_started_by_the_caller_is_left_running():
+    tracemalloc.start()
+    try:
+        run_guarded(lambda size: None, 10, 5, profiler=MemoryProfiler())
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_budget_flushes_before_shrinking():
+    usage = [900]
+    budget = MemoryBudget(1000, measure=lambda: usage[0])
+    budget.on_flush(lambda: usage.__setitem__(0, 500))
+    assert budget.adjust(64, 64) == 64 and budget.flushes == 1
+    usage[0] = 1200
+    budget = MemoryBudget(1000, measure=lambda: usage[0])
+    assert budget.adjust(64, 64) == 32 and budget.shrinks == 1
+    with pytest.raises(MemoryError):
+        budget.adjust(1, 64)
+    usage[0] = 100
+    assert budget.adjust(16, 64) == 32
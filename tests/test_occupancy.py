@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import markov
+from compiled_board import LADDER, PLAIN, SNAKE, CompiledBoard
+from occupancy import OccupancyMap
+from simulator import GameBatch, simulate_tokens
+from updated_Code import BoardSetup
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    return CompiledBoard.from_board(BoardSetup.setup(), 6)
+
+
+def test_compiled_board_tables():
+    compiled = CompiledBoard.from_layout(20, {15: 3}, {4: 12}, dice_sides=4)
+    assert compiled.deterministic
+    assert compiled.dest[15] == 3 and compiled.kind[15] == SNAKE
+    assert compiled.dest[4] == 12 and compiled.kind[4] == LADDER
+    assert compiled.dest[5] == 5 and compiled.kind[5] == PLAIN
+    assert compiled.entity_squares().tolist() == [4, 15]
+    assert compiled.next_pos(2, 2) == 12
+    assert compiled.next_pos(18, 4) == 18
+
+
+def test_straight_board_is_exact():
+    # a one-sided die walks a plain board one square per roll
+    compiled = CompiledBoard.from_layout(5, {}, {}, dice_sides=1)
+    assert markov.finish_time_distribution(compiled).tolist() == [0, 0, 0, 0, 1]
+    assert markov.expected_visits(compiled)[1:].tolist() == [1, 1, 1, 1, 1]
+
+
+def test_finish_distribution_matches_simulation(compiled):
+    pmf = markov.finish_time_distribution(compiled)
+    assert pmf.sum() == pytest.approx(1.0)
+    exact_mean = (np.arange(len(pmf)) * pmf).sum()
+    run = simulate_tokens(compiled, 40000, seed=1)
+    assert run.n_games == 40000 and (run.rolls > 0).all()
+    assert run.rolls.mean() == pytest.approx(exact_mean, rel=0.03)
+
+
+def test_exact_and_simulated_occupancy_agree(compiled):
+    exact = OccupancyMap.exact(compiled)
+    simulated = OccupancyMap.simulated(compiled, 40000, seed=2)
+    assert exact.landing_distribution.sum() == pytest.approx(1.0)
+    np.testing.assert_allclose(simulated.visits, exact.visits, atol=0.05)
+    for (square, end, kind, hits, probability), row in zip(
+            exact.entity_table(), simulated.entity_table()):
+        assert row[:3] == (square, end, kind)
+        assert row[4] == pytest.approx(probability, abs=0.02)
+
+
+def test_game_batch_ranks_every_seat(compiled):
+    batch = GameBatch(compiled, 2000, 3)
+    batch.play(np.random.default_rng(3))
+    assert len(batch.active_games()) == 0
+    assert (np.sort(batch.ranks, axis=1) == [1, 2, 3]).all()
+    # every seat rolls at least once before it finishes
+    assert batch.rolls.min() >= 3
+
+
+def test_game_batch_turn_rules(compiled):
+    batch = GameBatch(compiled, 1, 2)
+    games = np.array([0])
+    seats = [int(batch.step(games, np.array([roll]))[0][0]) for roll in (6, 6, 6, 2, 3)]
+    assert seats == [0, 0, 0, 1, 0]
+
+
+def test_untracked_run_has_no_hit_counts(compiled):
+    tracked = simulate_tokens(compiled, 2000, seed=4)
+    untracked = simulate_tokens(compiled, 2000, seed=4, track_visits=False)
+    assert untracked.hit_games is None and sum(tracked.hit_games.values()) > 0
+    assert not untracked.visits.any() and not untracked.landings.any()
+    assert np.array_equal(untracked.rolls, tracked.rolls)
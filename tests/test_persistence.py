@@ -0,0 +1,59 @@
+import sqlite3
+
+import pytest
+
+from persistence import GameEventStore, PersistentGame
+from updated_Code import BoardSetup, ExtraTurn, TurnPassed
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = GameEventStore(str(tmp_path / "games.db"), max_delay=0.2)
+    yield store
+    store.close()
+
+
+def turn(store, game_id, seq, wait):
+    store.record_turn(game_id, seq, 0, 3, 4, -1, 1, 0, wait=wait)
+
+
+def test_bad_statement_fails_only_its_waiter(store):
+    game_a = store.start_game(["a"], 100, 6)
+    game_b = store.start_game(["b"], 100, 6)
+    # one batch: a good turn of each game around a duplicate turn of game a
+    turn(store, game_a, 1, False)
+    turn(store, game_b, 1, False)
+    with pytest.raises(sqlite3.IntegrityError):
+        turn(store, game_a, 1, True)
+    assert len(store.turns(game_a)) == 1
+    assert len(store.turns(game_b)) == 1
+    assert isinstance(store.error, sqlite3.IntegrityError)
+
+
+def test_error_is_not_raised_again(store):
+    game_id = store.start_game(["a"], 100, 6)
+    turn(store, game_id, 1, True)
+    with pytest.raises(sqlite3.IntegrityError):
+        turn(store, game_id, 1, True)
+    turn(store, game_id, 2, True)
+    store.finish_game(game_id, [1])
+    assert [row[0] for row in store.turns(game_id)] == [1, 2]
+
+
+def test_unfinished_game_is_restored(tmp_path):
+    store = GameEventStore(str(tmp_path / "games.db"))
+    game = PersistentGame(store, ["ann", "bob"])
+    board = BoardSetup.setup()
+    game.initialize_game(board, 6, 2)
+    events = game.events()
+    rolls = 0
+    while rolls < 10:
+        rolls += isinstance(next(events), (ExtraTurn, TurnPassed))
+    store.flush()
+    assert store.unfinished_games() == [game.game_id]
+    restored = store.restore_game(game.game_id, board)
+    assert restored.seq == game.seq
+    assert restored.turn == game.turn
+    assert ([p.get_pos() for p in restored.players]
+            == [p.get_pos() for p in game.players])
+    store.close()
@@ -0,0 +1,44 @@
+import pytest
+
+from compiled_board import CompiledBoard
+from precision import simulate
+from updated_Code import BoardSetup, Dice
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    return CompiledBoard.from_board(BoardSetup.setup(), 6)
+
+
+def test_stops_at_target_precision(compiled):
+    report = simulate(compiled, 6, 2, target_ci=0.5, win_rate_ci=0.02,
+                      percentiles={0.9: 3}, seed=1)
+    assert report.stopped_by == "precision"
+    low, high = report.mean_length_ci
+    assert high - low <= 1.0 and low < report.mean_length < high
+    assert (report.win_rate_ci[:, 1] - report.win_rate_ci[:, 0]).max() <= 0.04
+    value, low, high = report.percentiles[0.9]
+    assert low <= value <= high
+
+
+def test_stops_at_max_games(compiled):
+    report = simulate(compiled, 6, 2, target_ci=1e-6, max_games=25000,
+                      initial_batch=10000, seed=1)
+    assert report.stopped_by == "max_games" and report.games == 25000
+
+
+def test_board_is_compiled_for_the_dice():
+    report = simulate(BoardSetup.setup(), Dice(6), 2, max_games=1000, seed=1)
+    assert report.games == 1000
+
+
+@pytest.mark.parametrize("max_games", [0, -1])
+def test_max_games_must_be_positive(compiled, max_games):
+    with pytest.raises(ValueError):
+        simulate(compiled, 6, 2, target_ci=1, max_games=max_games)
+
+
+@pytest.mark.parametrize("dice", [4, Dice(8)])
+def test_dice_must_match_a_compiled_board(compiled, dice):
+    with pytest.raises(ValueError):
+        simulate(compiled, dice, 2, max_games=10)
@@ -0,0 +1,75 @@
+import math
+
+import numpy as np
+import pytest
+
+from compiled_board import CompiledBoard
+from rare_events import (GameLength, RareEstimate, SquareLandings, cross_entropy_tilt,
+                         importance_sampling, pilot_levels, splitting, tilt)
+from tail_query import TailQuery
+from updated_Code import BoardSetup
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    return CompiledBoard.from_board(BoardSetup.setup(), 6)
+
+
+@pytest.fixture(scope="module")
+def tails(compiled):
+    # a lone token: the game lasts more than t rolls exactly when it does
+    return TailQuery(compiled, rolls=True)
+
+
+def assert_close(estimate, exact, sigmas=4.0):
+    assert abs(estimate.estimate - exact) <= sigmas * estimate.stderr
+
+
+def test_untilted_importance_sampling_counts_games(compiled, tails):
+    target = tails.length_for_tail(0.05)
+    estimate = importance_sampling(compiled, 6, 1, GameLength(target), [1] * 6,
+                                   games=20000, batch_size=7000, seed=1)
+    assert estimate.samples == 20000 and estimate.rolls > 20000
+    assert_close(estimate, tails.tail(target))
+
+
+def test_splitting_reaches_a_rare_length(compiled, tails):
+    target = tails.length_for_tail(1e-4)
+    event = GameLength(target)
+    estimate = splitting(compiled, 6, 1, event, effort=2000, replicates=8, seed=1)
+    assert estimate.relative_error() < 0.2
+    assert_close(estimate, tails.tail(target))
+    levels = pilot_levels(compiled, 1, event, effort=500, rng=np.random.default_rng(3))
+    assert levels == sorted(set(levels)) and levels[-1] == target
+
+
+def test_fitted_tilt_agrees_with_splitting(compiled):
+    event = SquareLandings(98, 3)
+    dice_p = cross_entropy_tilt(compiled, 6, 1, event, games=2000, seed=1)
+    assert dice_p.shape == (101, 6)
+    np.testing.assert_allclose(dice_p.sum(axis=1), 1.0)
+    tilted = importance_sampling(compiled, 6, 1, event, dice_p, games=20000, seed=2)
+    plain = importance_sampling(compiled, 6, 1, event, [1] * 6, games=20000, seed=2)
+    split = splitting(compiled, 6, 1, event, effort=2000, replicates=8, seed=1)
+    assert tilted.stderr < plain.stderr
+    spread = math.hypot(tilted.stderr, split.stderr)
+    assert abs(tilted.estimate - split.estimate) <= 4 * spread
+
+
+def test_tilt_and_estimate_helpers():
+    q = tilt(6, 0.5)
+    assert q.sum() == pytest.approx(1.0) and (np.diff(q) > 0).all()
+    estimate = RareEstimate(1e-6, 1e-6, "splitting", 10, 100)
+    assert estimate.interval() == (0.0, pytest.approx(1e-6 + 1.959964 * 1e-6))
+    assert estimate.relative_error() == 1.0
+    assert RareEstimate(0.0, 0.0, "splitting", 10, 100).relative_error() == math.inf
+
+
+def test_bad_arguments_are_rejected(compiled):
+    event = GameLength(50)
+    with pytest.raises(ValueError):
+        importance_sampling(compiled, 6, 1, event, [0, 1, 1, 1, 1, 1], games=10)
+    with pytest.raises(ValueError):
+        importance_sampling(compiled, 6, 1, event, [1] * 5, games=10)
+    with pytest.raises(ValueError):
+        splitting(compiled, 6, 1, event, effort=10, levels=[10, 20])
@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+import pytest
+
+from compiled_board import CompiledBoard
+from replay import DiceStreams, compare, replay
+from updated_Code import BoardSetup, Dice, Game
+
+
+class RecordingDice(Dice):
+    def __init__(self, sides):
+        super(RecordingDice, self).__init__(sides)
+        self.rolls = []
+
+    def roll(self):
+        result = super(RecordingDice, self).roll()
+        self.rolls.append(result)
+        return result
+
+
+@pytest.fixture(scope="module")
+def recorded():
+    random.seed(8)
+    streams, players, ranks = [], [], []
+    for game_ix in range(60):
+        game = Game()
+        game.initialize_game(BoardSetup.setup(), 6, 2 + game_ix % 3)
+        game.dice = RecordingDice(6)
+        for _ in game.events():
+            pass
+        streams.append(game.dice.rolls)
+        players.append(len(game.players))
+        ranks.append([p.get_rank() for p in game.players])
+    return DiceStreams.from_lists(streams, players), ranks
+
+
+def test_replay_on_the_same_board_reproduces_the_games(recorded):
+    streams, ranks = recorded
+    result = replay(streams, CompiledBoard.from_board(BoardSetup.setup(), 6),
+                    chunk_games=7)
+    assert result.complete.all()
+    for game_ix, game_ranks in enumerate(ranks):
+        assert result.ranks[game_ix, :len(game_ranks)].tolist() == game_ranks
+    assert result.rolls.tolist() == np.diff(streams.offsets).tolist()
+
+
+def test_save_and_load_round_trip(recorded, tmp_path):
+    streams, _ = recorded
+    streams.save(str(tmp_path))
+    loaded = DiceStreams.load(str(tmp_path))
+    assert len(loaded) == len(streams)
+    assert np.array_equal(loaded.rolls, streams.rolls)
+    assert isinstance(loaded.rolls, np.memmap)
+
+
+def test_compare_against_another_board(recorded):
+    streams, _ = recorded
+    baseline = CompiledBoard.from_board(BoardSetup.setup(), 6)
+    summary = compare(streams, baseline, baseline)
+    assert summary["compared_games"] == len(streams)
+    assert summary["winner_changed"] == 0.0
+    plain = CompiledBoard.from_layout(100, {}, {})
+    summary = compare(streams, baseline, plain)
+    assert summary["compared_games"] + summary["incomplete_games"] == len(streams)
+
+
+def test_streams_that_run_out_are_incomplete():
+    streams = DiceStreams.from_lists([[3, 3], [6, 1, 2]], [2, 2])
+    result = replay(streams, CompiledBoard.from_board(BoardSetup.setup(), 6))
+    assert not result.complete.any()
+    assert result.winners().tolist() == [-1, -1]
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+from PIL import Image, features
+
+from compiled_board import CompiledBoard
+from replay_render import (COLUMNS, SQUARE_PX, TOKEN_COLORS, _layout, board_layer,
+                           render_many, render_replay, timeline_moves)
+from timeline import GameTimeline
+from updated_Code import BoardSetup
+
+
+@pytest.fixture(scope="module")
+def timeline():
+    compiled = CompiledBoard.from_board(BoardSetup.setup(), 6)
+    return GameTimeline.record(compiled, 2, 8, rng=random.Random(5), max_rolls=12)
+
+
+def test_moves_follow_the_timeline(timeline):
+    moves = timeline_moves(timeline)
+    assert len(moves) == 12
+    for roll, (seat, start, landing, end_pos) in enumerate(moves):
+        assert landing == start + timeline.dice[roll]
+        assert timeline.seek(roll + 1).positions[seat] == end_pos
+
+
+def test_board_layer_is_cached(timeline):
+    layout = _layout(timeline.compiled)
+    assert board_layer(*layout) is board_layer(*layout)
+    assert board_layer(*layout).size == (COLUMNS * SQUARE_PX, 10 * SQUARE_PX)
+
+
+def test_gif_has_a_frame_per_roll(timeline, tmp_path):
+    path = str(tmp_path / "replay.gif")
+    assert render_replay(timeline, path, square_px=20) == 13
+    with Image.open(path) as image:
+        assert image.n_frames == 13
+        image.seek(12)
+        last = image.convert("RGB")
+    # the first token is drawn left of the centre of its square
+    seat_0 = timeline.seek(12).positions[0]
+    col, row = (seat_0 - 1) % COLUMNS, (seat_0 - 1) // COLUMNS
+    x = int((col + 0.5) * 20 - 20 // 6 / 2)
+    y = int((9 - row + 0.5) * 20)
+    assert last.getpixel((x, y)) == TOKEN_COLORS[0]
+
+
+@pytest.mark.skipif(not features.check("webp"), reason="Pillow without WebP")
+def test_webp_replay(timeline, tmp_path):
+    path = str(tmp_path / "replay.webp")
+    assert render_replay(timeline, path, square_px=20) == 13
+    with Image.open(path) as image:
+        assert image.n_frames == 13
+
+
+def test_render_many(timeline, tmp_path):
+    jobs = [(timeline, str(tmp_path / f"{ix}.gif")) for ix in range(2)]
+    assert render_many(jobs, processes=1, square_px=10) == {
+        filename: 13 for _, filename in jobs}
@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pytest
+
+from compiled_board import CompiledBoard
+from result_store import ResultStore
+from simulator import GameBatch
+from updated_Code import BoardSetup
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(str(tmp_path / "results"), max_players=4)
+
+
+def test_append_and_aggregate(store):
+    store.append([10, 20, 30], [[1, 2], [2, 1], [1, -1]], seed=7, board=99)
+    store.append([40], [[1, 2, 3]], seed=[8], board=99, seat_order=[5, 6, 7])
+    assert store.rows == 4
+    assert store.column("rolls").tolist() == [10, 20, 30, 40]
+    assert store.column("ranks")[2].tolist() == [1, 0, 0, 0]
+    assert store.column("seat_order")[3, :3].tolist() == [5, 6, 7]
+    summary = store.aggregate("rolls", where=lambda c: c["num_players"] == 2,
+                              columns=["num_players"], histogram=True, chunk_rows=2)
+    assert (summary["count"], summary["sum"], summary["min"], summary["max"]) == (3, 60, 10, 30)
+    assert summary["histogram"][20] == 1
+
+
+def test_reopen_drops_a_torn_tail(store):
+    store.append([10, 20], [[1, 2], [2, 1]], seed=1, board=2)
+    with open(store._file("rolls"), "ab") as column:
+        column.write(b"\xff" * 4)
+    reopened = ResultStore(store.path)
+    assert reopened.rows == 2
+    assert os.path.getsize(reopened._file("rolls")) == 8
+
+
+@pytest.mark.parametrize("rolls, seed, board, seat_order", [
+    ([10, 20], 1, 2, None),
+    ([10, 20, 30, 40], 1, 2, None),
+    ([10, 20, 30], [1, 2], 2, None),
+    ([10, 20, 30], 1, [2, 3, 4, 5], None),
+    ([10, 20, 30], 1, 2, [0, 1, 2]),
+])
+def test_mismatched_columns_write_nothing(store, rolls, seed, board, seat_order):
+    with pytest.raises(ValueError):
+        store.append(rolls, [[1, 2]] * 3, seed, board, seat_order)
+    assert store.rows == 0
+    assert not os.path.exists(store._file("rolls"))
+
+
+def test_append_batch_records_the_fingerprint(store):
+    compiled = CompiledBoard.from_board(BoardSetup.setup(), 6)
+    batch = GameBatch(compiled, 500, 3)
+    batch.play(np.random.default_rng(1))
+    store.append_batch(batch, 1, compiled.fingerprint())
+    assert store.rows == 500
+    assert set(store.column("board").tolist()) == {compiled.fingerprint()}
+    assert np.array_equal(store.column("rolls"), batch.rolls)
@@ -0,0 +1,88 @@
+import json
+import socket
+import threading
+
+import numpy as np
+import pytest
+
+from compiled_board import CompiledBoard
+from sharding import (Coordinator, ShardStats, board_from_wire, board_to_wire, make_job,
+                      run_local, run_shard, spawn_local_workers, worker)
+from updated_Code import Board, BoardSetup, Wormhole
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    return CompiledBoard.from_board(BoardSetup.setup(), 6)
+
+
+@pytest.fixture(scope="module")
+def job():
+    return make_job(3, 2500, seed=11, shard_games=400)
+
+
+@pytest.fixture(scope="module")
+def reference(compiled, job):
+    return run_local(compiled, job)
+
+
+def test_merge_is_addition(compiled, job, reference):
+    assert reference.games == 2500
+    assert (reference.rank_counts.sum(axis=1) == 2500).all()
+    assert reference.length_counts.sum() == 2500
+    # shards merge to the same counts in any order
+    shards = [run_shard(compiled, job, index) for index in range(7)]
+    assert shards[-1].games == 100
+    merged = ShardStats(3)
+    for shard in reversed(shards):
+        merged.merge(ShardStats.from_wire(json.loads(json.dumps(shard.to_wire()))))
+    assert merged == reference
+    summary = merged.summary()
+    assert sum(summary["win_rates"]) == pytest.approx(1.0)
+
+
+def test_board_round_trip():
+    board = Board(30)
+    board.set_moving_entity(4, Wormhole([2, 17, 25], [1, 1, 3]))
+    compiled = CompiledBoard.from_board(board, 6)
+    data = json.loads(json.dumps(board_to_wire(compiled)))
+    decoded = board_from_wire(data)
+    assert decoded.fingerprint() == compiled.fingerprint()
+    assert np.array_equal(decoded.branch_cdf, compiled.branch_cdf)
+    data["branch_dest"][3][0] = 9
+    with pytest.raises(ValueError):
+        board_from_wire(data)
+
+
+def test_workers_match_a_local_run(compiled, job, reference):
+    coordinator = Coordinator(compiled, job, timeout=30)
+    processes = spawn_local_workers(2, *coordinator.address)
+    assert coordinator.run(deadline=120) == reference
+    for process in processes:
+        process.join(30)
+    assert coordinator.retries == 0
+
+
+def test_dropped_shards_are_retried(compiled, job, reference):
+    coordinator = Coordinator(compiled, job, timeout=30)
+    result = []
+    running = threading.Thread(target=lambda: result.append(coordinator.run(deadline=120)))
+    running.start()
+    # drops its connection on its first shard, before any other worker joins
+    worker(*coordinator.address, fail_after=1)
+    worker(*coordinator.address)
+    running.join()
+    assert result == [reference] and coordinator.retries == 1
+
+
+def test_deadline_closes_the_coordinator(compiled):
+    coordinator = Coordinator(compiled, make_job(2, 10 ** 7, seed=1), timeout=30)
+    waiting = threading.Thread(target=worker, args=coordinator.address, daemon=True)
+    waiting.start()
+    with pytest.raises(TimeoutError):
+        coordinator.run(deadline=0.5)
+    # the worker is told the job is over once its shard is done
+    waiting.join(60)
+    assert not waiting.is_alive()
+    with pytest.raises(ConnectionRefusedError):
+        socket.create_connection(coordinator.address, timeout=5)
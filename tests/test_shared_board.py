@@ -0,0 +1,58 @@
+from multiprocessing import Pool
+
+import numpy as np
+import pytest
+
+from compiled_board import CompiledBoard
+from shared_board import SharedBoard, attach, init_worker, load_mmap, save_mmap, worker_board
+from updated_Code import BoardSetup
+
+ARRAYS = ("dest", "kind", "branch_dest", "branch_cdf")
+
+
+@pytest.fixture
+def compiled():
+    return CompiledBoard.from_board(BoardSetup.setup(), 6)
+
+
+def assert_same_board(shared, compiled):
+    assert (shared.size, shared.dice_sides, shared.start) == (
+        compiled.size, compiled.dice_sides, compiled.start)
+    for name in ARRAYS:
+        array = getattr(shared, name)
+        assert np.array_equal(array, getattr(compiled, name))
+        # views onto the shared buffer, nothing allocated per process
+        assert not array.flags.writeable and not array.flags.owndata
+    assert shared.fingerprint() == compiled.fingerprint()
+
+
+def test_width_one_board_is_fully_shared(compiled):
+    assert compiled.deterministic
+    with SharedBoard(compiled) as published:
+        shared = attach(published.name)
+        assert_same_board(shared, compiled)
+        del shared
+
+
+def test_mmap_round_trip(compiled, tmp_path):
+    path = str(tmp_path / "board.bin")
+    save_mmap(compiled, path)
+    assert_same_board(load_mmap(path), compiled)
+
+
+def test_truncated_file_is_rejected(compiled, tmp_path):
+    path = tmp_path / "board.bin"
+    save_mmap(compiled, str(path))
+    path.write_bytes(path.read_bytes()[:200])
+    with pytest.raises(ValueError):
+        load_mmap(str(path))
+
+
+def _worker_fingerprint(_):
+    return worker_board().fingerprint()
+
+
+def test_pool_workers_attach_once(compiled):
+    with SharedBoard(compiled) as published:
+        with Pool(2, initializer=init_worker, initargs=(published.name,)) as pool:
+            assert set(pool.map(_worker_fingerprint, range(4))) == {compiled.fingerprint()}
@@ -0,0 +1,65 @@
+from spectator import SpectatedGame, SpectatorChannel, decode_frame
+from updated_Code import BoardSetup, ExtraTurn, TurnPassed
+
+
+def test_first_poll_is_a_snapshot():
+    channel = SpectatorChannel(2)
+    subscriber = channel.subscribe()
+    frames = subscriber.poll()
+    assert [decode_frame(frame) for frame in frames] == [
+        {"type": "snapshot", "seq": 0, "positions": [1, 1], "ranks": [0, 0]}]
+    assert subscriber.poll() == []
+
+
+def test_deltas_are_shared_between_subscribers():
+    channel = SpectatorChannel(2)
+    first, second = channel.subscribe(), channel.subscribe()
+    first.poll()
+    second.poll()
+    channel.publish(0, 4, 5)
+    channel.publish(1, 6, 44, kind=1)
+    frames = first.poll()
+    assert [decode_frame(frame) for frame in frames] == [
+        {"type": "delta", "seq": 1, "seat": 0, "roll": 4, "kind": 0, "rank": 0,
+         "position": 5},
+        {"type": "delta", "seq": 2, "seat": 1, "roll": 6, "kind": 1, "rank": 0,
+         "position": 44}]
+    assert all(a is b for a, b in zip(frames, second.poll()))
+
+
+def test_lagging_subscribers_share_one_snapshot():
+    channel = SpectatorChannel(2, history=8, coalesce_after=4)
+    slow, slower = channel.subscribe(), channel.subscribe()
+    slow.poll()
+    slower.poll()
+    for seq in range(5):
+        channel.publish(seq % 2, 1, seq + 2)
+    channel.publish(0, 3, 100, rank=1)
+    frames = slow.poll()
+    assert len(frames) == 1 and frames[0] is slower.poll()[0]
+    assert decode_frame(frames[0]) == {
+        "type": "snapshot", "seq": 6, "positions": [100, 5], "ranks": [1, 0]}
+
+
+def test_coalesce_after_is_capped_by_history():
+    channel = SpectatorChannel(1, history=4, coalesce_after=32)
+    subscriber = channel.subscribe()
+    subscriber.poll()
+    for position in range(2, 8):
+        channel.publish(0, 1, position)
+    assert decode_frame(subscriber.poll()[0])["type"] == "snapshot"
+
+
+def test_spectated_game_tracks_positions():
+    game = SpectatedGame()
+    game.initialize_game(BoardSetup.setup(), 6, 3)
+    subscriber = game.channel.subscribe()
+    subscriber.poll()
+    deltas, rolls = [], 0
+    for event in game.events():
+        deltas.extend(decode_frame(frame) for frame in subscriber.poll())
+        rolls += isinstance(event, (ExtraTurn, TurnPassed))
+        if rolls == 20:
+            break
+    assert [d["seq"] for d in deltas] == list(range(1, 21))
+    assert game.channel.positions == [p.get_pos() for p in game.players]
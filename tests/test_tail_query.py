@@ -0,0 +1,80 @@
+import math
+
+import numpy as np
+import pytest
+
+import markov
+from compiled_board import CompiledBoard
+from tail_query import TailQuery
+from updated_Code import BoardSetup
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    return CompiledBoard.from_board(BoardSetup.setup(), 6)
+
+
+def stepped_survival(T, start, steps):
+    """P(length > t) for t in 0..steps by stepping the chain."""
+    n = T.shape[0] - 1
+    dist = np.zeros(n)
+    dist[start - 1] = 1.0
+    survival = []
+    for _ in range(steps + 1):
+        survival.append(dist.sum())
+        dist = dist @ T[:n, :n]
+    return np.array(survival)
+
+
+@pytest.mark.parametrize("rolls", [False, True])
+def test_survival_past_the_horizon_matches_stepping(compiled, rolls):
+    query = TailQuery(compiled, rolls=rolls, horizon=64)
+    assert query.method == "spectral"
+    P, _ = markov.roll_matrices(compiled)
+    T = P if rolls else markov.turn_matrix(compiled, P)
+    exact = stepped_survival(T, compiled.start, 400)
+    got = np.array([query.log_survival(t) for t in range(401)])
+    np.testing.assert_allclose(got, np.log(exact), rtol=1e-7, atol=1e-7)
+    assert query.log_survival(-1) == 0.0
+
+
+def test_powering_matches_the_spectral_formula(compiled):
+    spectral = TailQuery(compiled, horizon=64)
+    powering = TailQuery(compiled, horizon=64)
+    powering.method = "powering"
+    for t in (65, 300, 5000, 10 ** 6):
+        assert powering.log_survival(t) == pytest.approx(spectral.log_survival(t), rel=1e-7)
+    # far below the smallest float, still a finite log probability
+    assert spectral.tail(10 ** 6) == 0.0 and math.isfinite(spectral.log_tail(10 ** 6))
+
+
+def test_players_race_for_the_last_finish(compiled):
+    one = TailQuery(compiled)
+    three = TailQuery(compiled, num_players=3)
+    for t in (5, 20, 80):
+        survival = one.tail(t)
+        assert three.tail(t) == pytest.approx(1 - (1 - survival) ** 3)
+    # far out only the slowest player matters
+    assert three.log_tail(4000) == pytest.approx(math.log(3) + one.log_tail(4000))
+
+
+def test_percentile_and_half_life(compiled):
+    query = TailQuery(compiled, num_players=2)
+    for q in (0.5, 0.99, 0.9999):
+        t = query.percentile(q)
+        assert query.log_tail(t) <= math.log(1 - q) < query.log_tail(t - 1)
+    # past the horizon, found from the spectral tail
+    t = query.length_for_tail(1e-30)
+    assert t > query.horizon
+    assert query.log_tail(t) <= math.log(1e-30) < query.log_tail(t - 1)
+    far = 2000
+    ratio = query.log_tail(far) - query.log_tail(far + 100)
+    assert ratio == pytest.approx(100 * math.log(2) / query.half_life(), rel=1e-6)
+    assert query.decay_rate() == pytest.approx(-math.log(query.decay))
+
+
+def test_bad_queries_are_rejected(compiled):
+    with pytest.raises(ValueError):
+        TailQuery(compiled, num_players=2, rolls=True)
+    with pytest.raises(ValueError):
+        TailQuery(compiled).length_for_tail(0.0)
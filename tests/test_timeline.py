@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from compiled_board import CompiledBoard
+from headless import HeadlessGame
+from timeline import GameTimeline
+from updated_Code import Board, BoardSetup, Snake, Wormhole
+
+
+def states(timeline):
+    """Every state of the timeline, replayed from the start without keyframes."""
+    game = HeadlessGame(timeline.compiled, timeline.num_players)
+    result = [GameTimeline._keyframe(game)]
+    for ix, dice_result in enumerate(timeline.dice):
+        u = None if timeline.draws is None else timeline.draws[ix]
+        game.apply_roll(dice_result, u)
+        result.append(GameTimeline._keyframe(game))
+    return result
+
+
+def branching_board():
+    board = Board(40)
+    board.set_moving_entity(6, Wormhole([3, 22, 35]))
+    board.set_moving_entity(30, Snake(9))
+    return CompiledBoard.from_board(board, 6)
+
+
+@pytest.mark.parametrize("compiled", [CompiledBoard.from_board(BoardSetup.setup(), 6),
+                                      branching_board()])
+@pytest.mark.parametrize("interval", [1, 7, 64])
+def test_seeks_in_any_order_match_a_replay(compiled, interval):
+    timeline = GameTimeline.record(compiled, 3, interval, rng=random.Random(4))
+    assert not timeline._head.can_play()
+    expected = states(timeline)
+    order = list(range(len(timeline) + 1))
+    random.Random(1).shuffle(order)
+    for roll in order + [0, 1, 2, len(timeline)]:
+        assert GameTimeline._keyframe(timeline.seek(roll)) == expected[roll]
+    state = timeline.state(len(timeline))
+    assert sorted(state["ranks"]) == [1, 2, 3]
+
+
+def test_keyframes_are_taken_every_interval():
+    compiled = CompiledBoard.from_board(BoardSetup.setup(), 6)
+    timeline = GameTimeline.record(compiled, 2, 10, rng=random.Random(2), max_rolls=35)
+    assert len(timeline) == 35 and len(timeline.keyframes) == 4
+    assert [keyframe[-1] for keyframe in timeline.keyframes] == [0, 10, 20, 30]
+    assert timeline.memory_bytes() > 35
+
+
+def test_bad_input_is_rejected():
+    with pytest.raises(ValueError):
+        GameTimeline(branching_board(), 2, 0)
+    timeline = GameTimeline(branching_board(), 2)
+    with pytest.raises(ValueError):
+        timeline.append(3)
+    timeline.append(3, 0.5)
+    with pytest.raises(IndexError):
+        timeline.seek(2)
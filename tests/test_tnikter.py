@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("tkinter")
+pytest.importorskip("PIL.ImageTk")
+
+from board import LADDERS  # noqa: E402
+from tnikter import GameWindow, new_game  # noqa: E402
+
+
+class FixedDice:
+    def __init__(self, result):
+        self.result = result
+
+    def roll(self):
+        return self.result
+
+
+class FakeRoot:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay, callback):
+        self.scheduled.append(callback)
+
+
+class FakeLabel:
+    text = ""
+
+    def config(self, text):
+        self.text = text
+
+
+def headless_window(game):
+    # GameWindow without Tk widgets: roll only needs root.after and the status
+    window = GameWindow.__new__(GameWindow)
+    window.root = FakeRoot()
+    window.game = game
+    window.status = FakeLabel()
+    window.shown = [float(p.get_pos()) for p in game.players]
+    window.paths = [[] for _ in game.players]
+    window.animating = False
+    return window
+
+
+def test_roll_onto_a_ladder_is_silent(capsys):
+    foot, top = min((f, t) for f, t in LADDERS.items() if f > 3)
+    game = new_game(2)
+    game.players[0].set_position(foot - 3)
+    game.dice = FixedDice(3)
+    window = headless_window(game)
+    window.roll()
+    assert capsys.readouterr().out == ""
+    assert game.players[0].get_pos() == top
+    assert window.paths[0] == [foot - 2, foot - 1, foot, top]
+    assert f"ladder at {foot}" in window.status.text
+    assert window.animating and window.root.scheduled
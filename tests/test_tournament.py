@@ -0,0 +1,69 @@
+import random
+
+import numpy as np
+import pytest
+
+from compiled_board import CompiledBoard
+from tournament import RatingIndex, Tournament
+from updated_Code import BoardSetup
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    return CompiledBoard.from_board(BoardSetup.setup(), 6)
+
+
+def test_rating_index_matches_sorting():
+    rng = random.Random(7)
+    index = RatingIndex(bucket_width=1.0)
+    ratings = {}
+    for player in range(500):
+        ratings[player] = rng.uniform(1000, 2000)
+        index.add(player, ratings[player])
+    for player in rng.sample(range(500), 200):
+        ratings[player] = rng.uniform(1000, 2000)
+        index.update(player, ratings[player])
+    for player in range(0, 500, 5):
+        index.remove(player)
+        del ratings[player]
+    assert len(index) == len(ratings)
+    best = sorted(ratings.items(), key=lambda item: -item[1])
+    assert index.top(10) == best[:10]
+    for position, (player, rating) in enumerate(best, 1):
+        # players sharing a bucket tie at the best position of the bucket
+        assert index.rank(player) <= position
+        assert index.rank(player) == 1 + sum(
+            index._bucket(other) > index._bucket(rating) for _, other in best)
+
+
+def test_ratings_are_zero_sum(compiled):
+    tournament = Tournament(compiled, 40, 4, seed=1)
+    tournament.run(3, processes=0)
+    assert tournament.games_played == 30
+    assert tournament.ratings.sum() == pytest.approx(40 * 1500.0)
+    leader, rating = tournament.top(1)[0]
+    assert rating == tournament.ratings.max() and tournament.rank(leader) == 1
+
+
+def test_winner_gains_rating(compiled):
+    tournament = Tournament(compiled, 4, 4, seed=2)
+    tournament.record(np.array([[0, 1, 2, 3]]), np.array([[1, 2, 3, 4]]))
+    assert list(np.argsort(-tournament.ratings)) == [0, 1, 2, 3]
+    assert tournament.ratings[0] - 1500.0 <= tournament.k_factor
+
+
+def test_pool_run_shares_the_board(compiled):
+    tournament = Tournament(compiled, 60, 3, seed=3)
+    tournament.run(2, processes=2, chunk_tables=7)
+    assert tournament.games_played == 40
+    assert len(tournament.top(100)) == 60
+
+
+def test_pool_and_in_process_runs_agree(compiled):
+    ratings = []
+    for processes in (0, 2, 2):
+        tournament = Tournament(compiled, 400, 4, seed=7)
+        tournament.run(4, processes=processes, chunk_tables=9)
+        ratings.append(tournament.ratings)
+    assert np.array_equal(ratings[0], ratings[1])
+    assert np.array_equal(ratings[0], ratings[2])
@@ -0,0 +1,74 @@
+from updated_Code import (BoardSetup, ExtraTurn, Game, Moved, RankAssigned,
+                          Rolled, TurnPassed, TurnStart)
+
+
+class ScriptedDice:
+    def __init__(self, rolls):
+        self.rolls = list(rolls)
+
+    def roll(self):
+        return self.rolls.pop(0)
+
+
+def new_game(players, rolls, game_class=Game):
+    game = game_class()
+    game.initialize_game(BoardSetup.setup(), 6, players)
+    game.dice = ScriptedDice(rolls)
+    return game
+
+
+def roll_ends(game, count):
+    """The ExtraTurn or TurnPassed event that ends each of the next rolls."""
+    ends = []
+    for event in game.events():
+        if isinstance(event, (ExtraTurn, TurnPassed)):
+            ends.append(event)
+            if len(ends) == count:
+                return ends
+    return ends
+
+
+def test_roll_events_in_order():
+    game = new_game(2, [2])
+    events = game.events()
+    kinds = [type(next(events)) for _ in range(4)]
+    assert kinds == [TurnStart, Rolled, Moved, TurnPassed]
+
+
+def test_sixes_give_extra_turns_up_to_three():
+    game = new_game(2, [6, 6, 6, 2])
+    ends = roll_ends(game, 4)
+    assert [type(e) for e in ends] == [ExtraTurn, ExtraTurn, TurnPassed, TurnPassed]
+    assert ends[2].three_sixes and [e.seat for e in ends] == [0, 0, 0, 1]
+
+
+def test_finishing_on_a_six_passes_the_turn():
+    game = new_game(2, [6])
+    game.players[0].set_position(game.board.get_size() - 6)
+    events = game.events()
+    for event in events:
+        if isinstance(event, RankAssigned):
+            break
+    assert event.seat == 0
+    end = next(events)
+    assert isinstance(end, TurnPassed) and not end.three_sixes
+
+
+class OnesAgainGame(Game):
+    """Rolling a one earns another roll instead of a six."""
+
+    def change_turn(self, dice_result):
+        if dice_result != 1:
+            self.turn = (self.turn + 1) % len(self.players)
+
+
+def test_events_follow_change_turn_of_subclasses():
+    game = new_game(2, [1, 6, 3], OnesAgainGame)
+    ends = roll_ends(game, 3)
+    assert [type(e) for e in ends] == [ExtraTurn, TurnPassed, TurnPassed]
+    assert [e.seat for e in ends] == [0, 0, 1]
+
+
+def test_single_player_extra_turns():
+    game = new_game(1, [6, 3])
+    assert [type(e) for e in roll_ends(game, 2)] == [ExtraTurn, TurnPassed]
@@ -0,0 +1,174 @@
+"""
+Seekable timeline of a game with periodic keyframes.
+
+A timeline records every roll of a game as a compact delta (the dice result,
+plus the branch draw on boards with multi-destination squares) and every k
+rolls a keyframe with the full game state: positions, ranks, turn, last rank,
+consecutive_six and the RNG position, which is the number of rolls consumed.
+Seeking to any roll, forwards or backwards, restores the nearest keyframe at
+or before it and replays at most k - 1 deltas with HeadlessGame.apply_roll,
+so a seek costs O(k) whatever the length of the game. A smaller k seeks
+faster and stores more keyframes.
+
+Classes:
+- GameTimeline: Roll deltas and keyframes of one game.
+"""
+
+import random
+from array import array
+
+from headless import HeadlessGame
+
+
+class GameTimeline:
+    """
+    Roll deltas and keyframes of one game.
+
+    Attributes:
+    - compiled: The CompiledBoard being played.
+    - num_players: The number of players.
+    - keyframe_interval: Rolls between keyframes.
+    - dice: Dice result of every roll.
+    - draws: Branch draw of every roll, only on non-deterministic boards.
+    - keyframes: Game state every keyframe_interval rolls.
+    """
+
+    def __init__(self, compiled, num_players, keyframe_interval=64):
+        """
+        Initialize a GameTimeline object for a game that has not started.
+
+        Parameters:
+        - compiled (CompiledBoard): The board to play on.
+        - num_players (int): The number of players.
+        - keyframe_interval (int, optional): Rolls between keyframes.
+        """
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        self.compiled = compiled
+        self.num_players = num_players
+        self.keyframe_interval = keyframe_interval
+        self.dice = array("B")
+        self.draws = None if compiled.deterministic else array("d")
+        self._head = HeadlessGame(compiled, num_players)
+        self.keyframes = [self._keyframe(self._head)]
+        # last game returned by seek, reused when seeking a little ahead
+        self._cursor = None
+
+    @classmethod
+    def record(cls, compiled, num_players, keyframe_interval=64, rng=None,
+               max_rolls=None):
+        """
+        Play a game and record its timeline.
+
+        Parameters:
+        - compiled (CompiledBoard): The board to play on.
+        - num_players (int): The number of players.
+        - keyframe_interval (int, optional): Rolls between keyframes.
+        - rng (random.Random, optional): Random source for the dice.
+        - max_rolls (int, optional): Stop after this many rolls.
+
+        Returns:
+        - GameTimeline: The recorded timeline.
+        """
+        timeline = cls(compiled, num_players, keyframe_interval)
+        rng = rng if rng is not None else random.Random()
+        head = timeline._head
+        while head.can_play() and (max_rolls is None or len(timeline) < max_rolls):
+            dice_result = rng.randint(1, compiled.dice_sides)
+            timeline.append(dice_result, None if compiled.deterministic else rng.random())
+        return timeline
+
+    @staticmethod
+    def _keyframe(game):
+        return (tuple(game.positions), tuple(game.ranks), game.turn,
+                game.last_rank, game.consecutive_six, game.rolls)
+
+    def _restore(self, keyframe):
+        positions, ranks, turn, last_rank, consecutive_six, rolls = keyframe
+        game = HeadlessGame(self.compiled, self.num_players)
+        game.positions = list(positions)
+        game.ranks = list(ranks)
+        game.turn = turn
+        game.last_rank = last_rank
+        game.consecutive_six = consecutive_six
+        game.rolls = rolls
+        return game
+
+    def __len__(self):
+        """Get the number of rolls recorded."""
+        return len(self.dice)
+
+    def append(self, dice_result, u=None):
+        """
+        Play and record the next roll.
+
+        Parameters:
+        - dice_result (int): The result of rolling the dice.
+        - u (float, optional): Branch draw, required on non-deterministic boards.
+
+        Returns:
+        - tuple: (seat, landing, end_pos) as returned by HeadlessGame.apply_roll.
+        """
+        if not self._head.can_play():
+            raise ValueError("the game is over")
+        if self.draws is not None:
+            if u is None:
+                raise ValueError("this board needs a branch draw for every roll")
+            self.draws.append(u)
+        self.dice.append(dice_result)
+        result = self._head.apply_roll(dice_result, u)
+        if len(self.dice) % self.keyframe_interval == 0:
+            self.keyframes.append(self._keyframe(self._head))
+        return result
+
+    def seek(self, roll):
+        """
+        Get the game as it was after a number of rolls.
+
+        Parameters:
+        - roll (int): Rolls played, 0 for the start of the game.
+
+        Returns:
+        - HeadlessGame: A game in that state. It is shared with later seeks,
+          so copy what you need before seeking again.
+        """
+        if not 0 <= roll <= len(self.dice):
+            raise IndexError(f"roll {roll} is outside 0..{len(self.dice)}")
+        game = self._cursor
+        # stepping forwards within a keyframe interval: carry on from the cursor
+        if game is None or not 0 <= roll - game.rolls < self.keyframe_interval:
+            game = self._restore(self.keyframes[roll // self.keyframe_interval])
+        while game.rolls < roll:
+            ix = game.rolls
+            game.apply_roll(self.dice[ix], None if self.draws is None else self.draws[ix])
+        self._cursor = game
+        return game
+
+    def state(self, roll):
+        """
+        Get the game state after a number of rolls.
+
+        Parameters:
+        - roll (int): Rolls played, 0 for the start of the game.
+
+        Returns:
+        - dict: positions, ranks, turn, last_rank, consecutive_six and rolls.
+        """
+        game = self.seek(roll)
+        return {"positions": list(game.positions), "ranks": list(game.ranks),
+                "turn": game.turn, "last_rank": game.last_rank,
+                "consecutive_six": game.consecutive_six, "rolls": game.rolls}
+
+    def memory_bytes(self):
+        """
+        Estimate the memory held by deltas and keyframes.
+
+        Returns:
+        - int: Approximate number of bytes.
+        """
+        deltas = self.dice.itemsize * len(self.dice)
+        if self.draws is not None:
+            deltas += self.draws.itemsize * len(self.draws)
+        # two tuples of num_players entries plus four small ints per keyframe
+        per_keyframe = 8 * (2 * self.num_players + 4) + 2 * 56 + 72
+        return deltas + per_keyframe * len(self.keyframes)
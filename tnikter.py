@@ -1,26 +1,268 @@
+"""
+Tkinter front-end for the Snake and Ladder game.
+
+The window is driven by the Tk event loop instead of input(): the Roll
+button plays one roll of the Game and the token is animated towards its new
+square with after() callbacks at a fixed frame rate, so the window keeps
+redrawing and resizing while a move is in progress.
+
+tk.PhotoImage can not decode JPEG, so the background picture is decoded once
+with Pillow and kept in a cache of pre-scaled ImageTk.PhotoImage objects keyed
+by window size; resizing back and forth reuses the scaled copies.
+
+Classes:
+- BackgroundCache: Decoded background image and its scaled copies.
+- GameWindow: The game window.
+"""
+
+import time
 import tkinter as tk
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+from board import LADDERS, SNAKES
+from updated_Code import Board, Game, Ladder, Snake
+
+BACKGROUND = "istockphoto-455302535-612x612.jpg"
+BOARD_SIZE = 10
+# 60 frames per second
+FRAME_MS = 16
+# seconds a token takes to move one square
+STEP_TIME = 0.08
+TOKEN_COLORS = ["red", "blue", "yellow", "purple", "orange", "cyan"]
+
+
+class BackgroundCache:
+    """
+    Background image decoded once, with scaled copies cached by size.
+
+    Attributes:
+    - image: The decoded PIL image.
+    """
+
+    def __init__(self, path, max_entries=8, step=20):
+        """
+        Initialize a BackgroundCache object.
+
+        Parameters:
+        - path (str): The image file.
+        - max_entries (int, optional): Number of scaled copies kept.
+        - step (int, optional): Sizes are rounded up to a multiple of step
+          pixels, so small resizes hit the cache.
+        """
+        self.image = Image.open(path)
+        self.image.load()
+        self.max_entries = max_entries
+        self.step = step
+        self._scaled = OrderedDict()
+
+    def get(self, width, height):
+        """
+        Get the background scaled to cover width x height.
+
+        Returns:
+        - ImageTk.PhotoImage: The scaled image.
+        """
+        key = (-(-width // self.step) * self.step, -(-height // self.step) * self.step)
+        if key in self._scaled:
+            self._scaled.move_to_end(key)
+            return self._scaled[key]
+        photo = ImageTk.PhotoImage(self.image.resize(key, Image.BILINEAR))
+        self._scaled[key] = photo
+        if len(self._scaled) > self.max_entries:
+            self._scaled.popitem(last=False)
+        return photo
 
-def main():
-    root = tk.Tk()
-    root.title("Background Image Example")
 
-    try:
-        # Load the image file
-        bg_image = tk.PhotoImage(file="istockphoto-455302535-612x612.jpg")
+def new_game(num_players):
+    """
+    Create a game on the board drawn by board.py.
 
-        # Create a label widget with the background image
-        bg_label = tk.Label(root, image=bg_image)
-        bg_label.place(x=0, y=0, relwidth=1, relheight=1)
+    Parameters:
+    - num_players (int): The number of players.
 
-        print("Image loaded successfully")
+    Returns:
+    - Game: The initialized game.
+    """
+    board = Board(BOARD_SIZE * BOARD_SIZE)
+    for start, end in SNAKES.items():
+        board.set_moving_entity(start, Snake(end))
+    for start, end in LADDERS.items():
+        board.set_moving_entity(start, Ladder(end))
+    game = Game()
+    game.initialize_game(board, 6, num_players)
+    return game
 
-        # Add other widgets on top of the background image
-        # For example, you can add buttons, labels, etc.
 
-        # Run the Tkinter main loop
-        root.mainloop()
-    except Exception as e:
-        print("Error loading image:", e)
+class GameWindow:
+    """
+    Tk window showing the board and animating the tokens of a Game.
+    """
+
+    def __init__(self, root, game):
+        """
+        Initialize a GameWindow object.
+
+        Parameters:
+        - root (tk.Tk): The root window.
+        - game (Game): The game to play.
+        """
+        self.root = root
+        self.game = game
+        self.background = BackgroundCache(BACKGROUND)
+        self.canvas = tk.Canvas(root, width=612, height=612, highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        controls = tk.Frame(root)
+        controls.pack(fill=tk.X)
+        self.roll_button = tk.Button(controls, text="Roll", command=self.roll)
+        self.roll_button.pack(side=tk.LEFT)
+        self.status = tk.Label(controls, anchor="w")
+        self.status.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        # token positions in board squares, fractional while animating
+        self.shown = [float(p.get_pos()) for p in game.players]
+        # squares each token still has to pass through
+        self.paths = [[] for _ in game.players]
+        self.animating = False
+        self._last_frame = 0.0
+        self._layout_pending = False
+        self.canvas.bind("<Configure>", self._on_resize)
+        self._set_status(f"Player {self.game.turn + 1} to roll")
+
+    def _set_status(self, text):
+        self.status.config(text=text)
+
+    def _on_resize(self, event):
+        # coalesce a burst of resize events into one redraw
+        if not self._layout_pending:
+            self._layout_pending = True
+            self.root.after_idle(self._layout)
+
+    def _square_center(self, square):
+        """Get the canvas coordinates of a square, numbered like BoardDrawer.draw_arrow."""
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        cell_w = width / BOARD_SIZE
+        cell_h = height / BOARD_SIZE
+        col = (square - 1) % BOARD_SIZE
+        row = (square - 1) // BOARD_SIZE
+        return (col + 0.5) * cell_w, height - (row + 0.5) * cell_h
+
+    def _token_center(self, seat):
+        """Interpolate between squares for a token that is part-way through a step."""
+        pos = self.shown[seat]
+        low = int(pos)
+        x0, y0 = self._square_center(low)
+        if pos == low:
+            x, y = x0, y0
+        else:
+            x1, y1 = self._square_center(self.paths[seat][0] if self.paths[seat] else low + 1)
+            frac = pos - low
+            x, y = x0 + (x1 - x0) * frac, y0 + (y1 - y0) * frac
+        # spread tokens sharing a square
+        return x + (seat - len(self.shown) / 2) * 6, y
+
+    def _layout(self):
+        """Redraw the static board for the current window size."""
+        self._layout_pending = False
+        canvas = self.canvas
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        canvas.delete("all")
+        canvas.create_image(0, 0, image=self.background.get(width, height),
+                            anchor="nw", tags="background")
+        cell_w, cell_h = width / BOARD_SIZE, height / BOARD_SIZE
+        for square in range(1, BOARD_SIZE * BOARD_SIZE + 1):
+            x, y = self._square_center(square)
+            canvas.create_rectangle(x - cell_w / 2, y - cell_h / 2,
+                                    x + cell_w / 2, y + cell_h / 2,
+                                    outline="white")
+            canvas.create_text(x - cell_w / 2 + 3, y - cell_h / 2 + 2, text=str(square),
+                               anchor="nw", fill="white")
+        for entities, color in ((SNAKES, "red"), (LADDERS, "green")):
+            for start, end in entities.items():
+                canvas.create_line(*self._square_center(start), *self._square_center(end),
+                                   fill=color, width=3, arrow=tk.LAST)
+        radius = min(cell_w, cell_h) / 4
+        for seat in range(len(self.shown)):
+            x, y = self._token_center(seat)
+            canvas.create_oval(x - radius, y - radius, x + radius, y + radius,
+                               fill=TOKEN_COLORS[seat % len(TOKEN_COLORS)],
+                               tags=f"token{seat}")
+
+    def _place_tokens(self):
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        radius = min(width, height) / BOARD_SIZE / 4
+        for seat in range(len(self.shown)):
+            x, y = self._token_center(seat)
+            self.canvas.coords(f"token{seat}", x - radius, y - radius,
+                               x + radius, y + radius)
+
+    def roll(self):
+        """Play one roll of the game and start animating the move."""
+        game = self.game
+        if self.animating or not game.can_play():
+            return
+        curr_player = game.get_next_player()
+        seat = game.turn
+        start = curr_player.get_pos()
+        dice_result = game.dice.roll()
+        landing = start + dice_result
+        # resolve rather than get_next_pos, which prints to the console
+        next_pos, entity = game.board.resolve(landing)
+        text = f"Player {seat + 1} rolled {dice_result}"
+        if game.can_move(curr_player, next_pos):
+            game.move_player(curr_player, next_pos)
+            # walk square by square to the landing square, then jump
+            self.paths[seat] = list(range(start + 1, landing + 1))
+            if next_pos != landing:
+                self.paths[seat].append(next_pos)
+                text += f", {entity.desc.lower()} at {landing}"
+        else:
+            text += ", can not move"
+        game.change_turn(dice_result)
+        if game.can_play():
+            text += f". Player {game.get_next_player()._id + 1} to roll"
+        else:
+            text += ". Game over: " + ", ".join(
+                f"Player {p._id + 1}: {p.get_rank()}"
+                for p in sorted(game.players, key=lambda x: x.get_rank()))
+        self._set_status(text)
+        self.animating = True
+        self._last_frame = time.monotonic()
+        self.root.after(FRAME_MS, self._animate)
+
+    def _animate(self):
+        """Advance every moving token by the time since the last frame."""
+        now = time.monotonic()
+        advance = (now - self._last_frame) / STEP_TIME
+        self._last_frame = now
+        moving = False
+        for seat, path in enumerate(self.paths):
+            remaining = advance
+            while path and remaining > 0:
+                low = int(self.shown[seat])
+                step_left = 1 - (self.shown[seat] - low)
+                if remaining >= step_left:
+                    self.shown[seat] = float(path.pop(0))
+                    remaining -= step_left
+                else:
+                    self.shown[seat] += remaining
+                    remaining = 0
+            moving = moving or bool(path)
+        self._place_tokens()
+        if moving:
+            self.root.after(FRAME_MS, self._animate)
+        else:
+            self.animating = False
+
+
+def main():
+    root = tk.Tk()
+    root.title("Snake and Ladder")
+    GameWindow(root, new_game(2))
+    root.mainloop()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,288 @@
+"""
+Mass tournament runner with an incremental leaderboard.
+
+Players are seated at tables every round, the tables are played on the
+headless engine across a process pool, and every finished table updates the
+players' Elo-style ratings in a RatingIndex. The index keeps players in rating
+buckets counted by a Fenwick tree, so the leaderboard never has to be sorted
+again: the rank of a player is a prefix sum and the top K are read bucket by
+bucket from the top. The compiled board is published once in shared memory
+and every worker attaches to it without copying it.
+
+Classes:
+- RatingIndex: Bucketed rating index with O(log n) rank and top-K queries.
+- Tournament: Schedules rounds of tables and feeds results into the index.
+"""
+
+import heapq
+import random
+from multiprocessing import Pool
+
+import numpy as np
+
+from headless import HeadlessGame
+from shared_board import SharedBoard, attach
+
+
+class _Fenwick:
+    """Fenwick (binary indexed) tree of counts over bucket indices 0..n-1."""
+
+    def __init__(self, n):
+        self.n = n
+        self.tree = [0] * (n + 1)
+
+    def add(self, index, delta):
+        """Add delta to the count of bucket index."""
+        index += 1
+        while index <= self.n:
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index):
+        """Get the total count of buckets 0..index."""
+        index += 1
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+    def find(self, k):
+        """Get the smallest bucket index whose prefix count reaches k >= 1."""
+        pos = 0
+        step = 1 << self.n.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and self.tree[nxt] < k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+
+class RatingIndex:
+    """
+    Leaderboard of player ratings supporting updates and rank queries in O(log n).
+
+    Ratings are grouped into buckets of bucket_width; a Fenwick tree counts
+    the players per bucket. Players sharing a bucket tie in rank, so
+    bucket_width is the rating resolution of the leaderboard.
+
+    Attributes:
+    - ratings: Map of player to rating.
+    """
+
+    def __init__(self, min_rating=0.0, max_rating=4000.0, bucket_width=0.01):
+        """
+        Initialize a RatingIndex object.
+
+        Parameters:
+        - min_rating (float, optional): Lowest rating with its own bucket.
+        - max_rating (float, optional): Highest rating with its own bucket.
+        - bucket_width (float, optional): Rating range covered by one bucket.
+        """
+        self.min_rating = min_rating
+        self.bucket_width = bucket_width
+        self.num_buckets = int((max_rating - min_rating) / bucket_width) + 1
+        self.counts = _Fenwick(self.num_buckets)
+        self.buckets = [None] * self.num_buckets
+        self.ratings = {}
+
+    def __len__(self):
+        return len(self.ratings)
+
+    def _bucket(self, rating):
+        bucket = int((rating - self.min_rating) // self.bucket_width)
+        return min(max(bucket, 0), self.num_buckets - 1)
+
+    def add(self, player, rating):
+        """
+        Add a player to the index.
+
+        Parameters:
+        - player (hashable): The player identifier.
+        - rating (float): The rating of the player.
+        """
+        if player in self.ratings:
+            self.remove(player)
+        bucket = self._bucket(rating)
+        if self.buckets[bucket] is None:
+            self.buckets[bucket] = {}
+        self.buckets[bucket][player] = rating
+        self.ratings[player] = rating
+        self.counts.add(bucket, 1)
+
+    def remove(self, player):
+        """Remove a player from the index."""
+        bucket = self._bucket(self.ratings.pop(player))
+        del self.buckets[bucket][player]
+        self.counts.add(bucket, -1)
+
+    def update(self, player, rating):
+        """Change the rating of a player already in the index."""
+        old_bucket = self._bucket(self.ratings[player])
+        new_bucket = self._bucket(rating)
+        if old_bucket == new_bucket:
+            self.buckets[old_bucket][player] = rating
+            self.ratings[player] = rating
+        else:
+            self.add(player, rating)
+
+    def rank(self, player):
+        """
+        Get the leaderboard position of a player.
+
+        Returns:
+        - int: 1 plus the number of players in higher rating buckets.
+        """
+        bucket = self._bucket(self.ratings[player])
+        return len(self.ratings) - self.counts.prefix(bucket) + 1
+
+    def top(self, k):
+        """
+        Get the k best rated players.
+
+        Returns:
+        - list: (player, rating) pairs, best first.
+        """
+        result = []
+        remaining = len(self.ratings)
+        while len(result) < k and remaining > 0:
+            # bucket holding the remaining-th lowest rated player
+            bucket = self.counts.find(remaining)
+            members = self.buckets[bucket]
+            result.extend(heapq.nlargest(k - len(result), members.items(),
+                                         key=lambda item: item[1]))
+            remaining -= len(members)
+        return result
+
+
+# state of a pool worker, set once by _init_worker
+_worker_board = None
+_worker_table_size = None
+
+
+def _init_worker(board, table_size):
+    """Set the worker's board, attaching to it if given a SharedBoard name."""
+    global _worker_board, _worker_table_size
+    _worker_board = attach(board) if isinstance(board, str) else board
+    _worker_table_size = table_size
+
+
+def _play_tables(job):
+    """Play a chunk of tables in a worker and return their rank matrix."""
+    seed, tables = job
+    rng = random.Random(seed)
+    ranks = np.empty(tables.shape, dtype=np.int16)
+    for ix in range(len(tables)):
+        game = HeadlessGame(_worker_board, _worker_table_size, rng)
+        ranks[ix] = game.play()
+    return tables, ranks
+
+
+class Tournament:
+    """
+    Runs rounds of tables for a large league and keeps a live leaderboard.
+
+    Attributes:
+    - index: RatingIndex of every player.
+    - games_played: Number of tables played so far.
+    """
+
+    def __init__(self, compiled, num_players, table_size, initial_rating=1500.0,
+                 k_factor=32.0, seed=None):
+        """
+        Initialize a Tournament object.
+
+        Parameters:
+        - compiled (CompiledBoard): The board every table plays on.
+        - num_players (int): The number of players in the league.
+        - table_size (int): The number of players per game.
+        - initial_rating (float, optional): Rating of a new player.
+        - k_factor (float, optional): Maximum rating change per game.
+        - seed (int, optional): Seed for scheduling and dice.
+        """
+        self.compiled = compiled
+        self.num_players = num_players
+        self.table_size = table_size
+        self.k_factor = k_factor
+        self.rng = np.random.default_rng(seed)
+        self.ratings = np.full(num_players, initial_rating)
+        self.index = RatingIndex()
+        for player in range(num_players):
+            self.index.add(player, initial_rating)
+        self.games_played = 0
+
+    def schedule_round(self):
+        """
+        Seat every player at a random table; leftover players sit out.
+
+        Returns:
+        - numpy.ndarray: Player ids of shape (tables, table_size).
+        """
+        order = self.rng.permutation(self.num_players)
+        tables = self.num_players // self.table_size
+        return order[:tables * self.table_size].reshape(tables, self.table_size)
+
+    def record(self, tables, ranks):
+        """
+        Apply the results of played tables to ratings and the leaderboard.
+
+        Every pair at a table is scored as one Elo game between the two
+        players, scaled so one table moves a rating by at most k_factor.
+
+        Parameters:
+        - tables (numpy.ndarray): Player ids of shape (tables, table_size).
+        - ranks (numpy.ndarray): Finishing rank of every seat, same shape.
+        """
+        rating = self.ratings[tables]
+        expected = 1.0 / (1.0 + 10 ** ((rating[:, None, :] - rating[:, :, None]) / 400))
+        score = (ranks[:, :, None] < ranks[:, None, :]).astype(float)
+        # diagonal pairs score 0 and expect 0.5, they cancel out with the +0.5
+        delta = self.k_factor / (self.table_size - 1) * (
+            (score - expected).sum(axis=2) + 0.5)
+        self.ratings[tables] = rating + delta
+        for player in tables.ravel().tolist():
+            self.index.update(player, float(self.ratings[player]))
+        self.games_played += len(tables)
+
+    def _round_jobs(self, chunk_tables):
+        """Schedule one round and split it into (seed, tables) chunks."""
+        tables = self.schedule_round()
+        return [(int(self.rng.integers(2 ** 63)), tables[start:start + chunk_tables])
+                for start in range(0, len(tables), chunk_tables)]
+
+    def run(self, rounds, processes=None, chunk_tables=1000):
+        """
+        Play rounds of tables, updating the leaderboard after every round.
+
+        Rounds are scheduled and recorded one at a time and chunks are
+        recorded in the order they were scheduled, so the ratings depend on
+        the seed only, not on the number of processes.
+
+        Parameters:
+        - rounds (int): The number of rounds to play.
+        - processes (int, optional): Worker processes; 0 plays in-process.
+          Defaults to one per CPU.
+        - chunk_tables (int, optional): Tables sent to a worker at once.
+        """
+        if processes == 0:
+            _init_worker(self.compiled, self.table_size)
+            for _ in range(rounds):
+                for job in self._round_jobs(chunk_tables):
+                    self.record(*_play_tables(job))
+            return
+        with SharedBoard(self.compiled) as shared, \
+                Pool(processes, _init_worker, (shared.name, self.table_size)) as pool:
+            for _ in range(rounds):
+                for tables, ranks in pool.imap(_play_tables,
+                                               self._round_jobs(chunk_tables)):
+                    self.record(tables, ranks)
+
+    def top(self, k):
+        """Get the k best rated players as (player, rating) pairs."""
+        return self.index.top(k)
+
+    def rank(self, player):
+        """Get the leaderboard position of a player."""
+        return self.index.rank(player)
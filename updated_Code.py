@@ -8,14 +8,27 @@ Classes:
 - MovingEntity: A base class for defining moving entities such as snakes or ladders.
 - Snake: Represents a snake entity on the game board.
 - Ladder: Represents a ladder entity on the game board.
+- Wormhole: Sends the player to one of several positions with given weights.
+- ConditionalLadder: A ladder that only works with a given probability.
+- ReturnToStart: Sends the player back to the starting position.
 - Board: Defines the game board with size and tracks the positions of moving entities.
 - Dice: Simulates the rolling of a dice with a given number of sides.
+- TurnEvent: Base class of the events yielded by Game.events.
+- TurnStart, Rolled, Jumped, Moved, Blocked, RankAssigned, ExtraTurn,
+  TurnPassed, GameOver: The turn events.
 - Game: Orchestrates the gameplay logic including player movements, turns, and game state.
+- BoardSetup: Builds the standard 100 square board.
 
 Functions:
 - sample_run: Executes a sample run of the game with predefined board configurations and player settings.
 """
 
+import random
+
+# starting position of every player
+START_POS = 1
+
+
 class GamePlayer:
     """
     Encapsulates a player's properties in the game.
@@ -35,7 +48,7 @@ class GamePlayer:
         """
         self._id = _id
         self.rank = -1
-        self.position = 1
+        self.position = START_POS
 
     def set_position(self, pos):
         """Set the position of the player on the board."""
@@ -83,6 +96,16 @@ class MovingEntity:
             raise Exception("no_end_position_defined")
         return self.end_pos
 
+    def get_destinations(self):
+        """
+        Get every position this entity can send the player to.
+
+        Returns:
+        - list: (position, probability) pairs. A position of None means the
+          player stays on the square of the entity.
+        """
+        return [(self.get_end_pos(), 1.0)]
+
 
 class Snake(MovingEntity):
     """Represents a snake entity on the game board."""
@@ -112,6 +135,74 @@ class Ladder(MovingEntity):
         self.desc = "Climbed Ladder"
 
 
+class Wormhole(MovingEntity):
+    """Sends the player to one of several positions, picked at random."""
+
+    def __init__(self, destinations, weights=None):
+        """
+        Initialize a Wormhole object.
+
+        Parameters:
+        - destinations (list): Positions the player can be sent to.
+        - weights (list, optional): Relative weight of each destination.
+          Destinations are equally likely by default.
+        """
+        super(Wormhole, self).__init__()
+        if weights is None:
+            weights = [1] * len(destinations)
+        if len(weights) != len(destinations) or not destinations:
+            raise Exception("invalid_wormhole_destinations")
+        self.destinations = list(destinations)
+        self.weights = list(weights)
+        self.desc = "Fell into Wormhole"
+
+    def get_end_pos(self):
+        """Pick the position where the player will be sent."""
+        return random.choices(self.destinations, self.weights)[0]
+
+    def get_destinations(self):
+        """Get every destination with its probability."""
+        total = sum(self.weights)
+        return [(pos, weight / total)
+                for pos, weight in zip(self.destinations, self.weights)]
+
+
+class ConditionalLadder(MovingEntity):
+    """A ladder that can only be climbed with a given probability."""
+
+    def __init__(self, end_pos=None, probability=0.5):
+        """
+        Initialize a ConditionalLadder object.
+
+        Parameters:
+        - end_pos (int, optional): The position at the top of the ladder.
+        - probability (float, optional): Chance that the player climbs it.
+        """
+        super(ConditionalLadder, self).__init__(end_pos)
+        self.probability = probability
+        self.desc = "Tried Ladder"
+
+    def get_end_pos(self):
+        """Get the top of the ladder, or None if the player failed to climb."""
+        if random.random() < self.probability:
+            return super(ConditionalLadder, self).get_end_pos()
+        return None
+
+    def get_destinations(self):
+        """Get the top of the ladder and staying put with their probabilities."""
+        return [(super(ConditionalLadder, self).get_end_pos(), self.probability),
+                (None, 1.0 - self.probability)]
+
+
+class ReturnToStart(MovingEntity):
+    """Sends the player back to the starting position."""
+
+    def __init__(self):
+        """Initialize a ReturnToStart object."""
+        super(ReturnToStart, self).__init__(START_POS)
+        self.desc = "Sent back to start"
+
+
 class Board:
     """
     Defines the game board with size and tracks the positions of moving entities.
@@ -149,12 +240,28 @@ class Board:
         Returns:
         - int: The next position of the player after encountering any moving entity.
         """
-        if player_pos > self.size:
-            return player_pos
-        if player_pos not in self.board:
-            return player_pos
-        print(f'{self.board[player_pos].desc} at {player_pos}')
-        return self.board[player_pos].get_end_pos()
+        next_pos, entity = self.resolve(player_pos)
+        if entity is not None:
+            print(f'{entity.desc} at {player_pos}')
+        return next_pos
+
+    def resolve(self, player_pos):
+        """
+        Get the next position of the player and the entity that sent them there, without printing.
+
+        Parameters:
+        - player_pos (int): The position the player landed on.
+
+        Returns:
+        - tuple: (next position, moving entity or None).
+        """
+        if player_pos > self.size or player_pos not in self.board:
+            return player_pos, None
+        entity = self.board[player_pos]
+        end_pos = entity.get_end_pos()
+        if end_pos is None:
+            return player_pos, entity
+        return end_pos, entity
 
     def at_last_pos(self, pos):
         """
@@ -200,6 +307,130 @@ class Dice:
         return ans
 
 
+class TurnEvent:
+    """
+    Base class of the events yielded by Game.events.
+
+    Events only hold a few numbers in __slots__, so a consumer can pull
+    millions of them without building per-event dictionaries.
+    """
+
+    __slots__ = ("seat",)
+
+    def __init__(self, seat):
+        self.seat = seat
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}"
+                           for cls in reversed(type(self).__mro__)
+                           for name in getattr(cls, "__slots__", ()))
+        return f"{type(self).__name__}({fields})"
+
+
+class TurnStart(TurnEvent):
+    """A player is about to roll; the dice are rolled when the next event is pulled."""
+
+    __slots__ = ("position",)
+
+    def __init__(self, seat, position):
+        super(TurnStart, self).__init__(seat)
+        self.position = position
+
+
+class Rolled(TurnEvent):
+    """A player rolled the dice; landing is the square the result points at."""
+
+    __slots__ = ("dice_result", "landing")
+
+    def __init__(self, seat, dice_result, landing):
+        super(Rolled, self).__init__(seat)
+        self.dice_result = dice_result
+        self.landing = landing
+
+
+class Jumped(TurnEvent):
+    """
+    A player landed on a moving entity.
+
+    end_pos equals landing when the entity did not move the player, e.g. a
+    ConditionalLadder that failed.
+    """
+
+    __slots__ = ("landing", "end_pos", "entity")
+
+    def __init__(self, seat, landing, end_pos, entity):
+        super(Jumped, self).__init__(seat)
+        self.landing = landing
+        self.end_pos = end_pos
+        self.entity = entity
+
+    @property
+    def kind(self):
+        """The kind of entity, e.g. "Snake" or "Ladder"."""
+        return type(self.entity).__name__
+
+
+class Moved(TurnEvent):
+    """A player's token moved."""
+
+    __slots__ = ("from_pos", "to_pos")
+
+    def __init__(self, seat, from_pos, to_pos):
+        super(Moved, self).__init__(seat)
+        self.from_pos = from_pos
+        self.to_pos = to_pos
+
+
+class Blocked(TurnEvent):
+    """A roll would overshoot the last square, the token stays."""
+
+    __slots__ = ("landing",)
+
+    def __init__(self, seat, landing):
+        super(Blocked, self).__init__(seat)
+        self.landing = landing
+
+
+class RankAssigned(TurnEvent):
+    """A player reached the last square."""
+
+    __slots__ = ("rank",)
+
+    def __init__(self, seat, rank):
+        super(RankAssigned, self).__init__(seat)
+        self.rank = rank
+
+
+class ExtraTurn(TurnEvent):
+    """A player rolled a six and rolls again; the last event of a roll."""
+
+    __slots__ = ("consecutive_six",)
+
+    def __init__(self, seat, consecutive_six):
+        super(ExtraTurn, self).__init__(seat)
+        self.consecutive_six = consecutive_six
+
+
+class TurnPassed(TurnEvent):
+    """The turn passed on; the last event of a roll."""
+
+    __slots__ = ("three_sixes",)
+
+    def __init__(self, seat, three_sixes):
+        super(TurnPassed, self).__init__(seat)
+        self.three_sixes = three_sixes
+
+
+class GameOver(TurnEvent):
+    """Every player has a rank; seat is None and ranks is indexed by seat."""
+
+    __slots__ = ("ranks",)
+
+    def __init__(self, ranks):
+        super(GameOver, self).__init__(None)
+        self.ranks = ranks
+
+
 class Game:
     """
     Orchestrates the gameplay logic including player movements, turns, and game state.
@@ -299,29 +530,75 @@ class Game:
         """
         self.consecutive_six = 0 if dice_result != 6 else self.consecutive_six + 1
         if dice_result != 6 or self.consecutive_six == 3:
-            if self.consecutive_six == 3:
-                print("Changing turn due to 3 consecutive sixes")
             self.turn = (self.turn + 1) % len(self.players)
-        else:
-            print(f"One more turn for player {self.turn+1} after rolling 6")
 
-    def play(self):
+    def events(self):
         """
-        Start the game and execute the gameplay logic until a winner is determined.
+        Play the game lazily, one event at a time.
+
+        Nothing happens until the caller pulls the next event: the dice are
+        rolled when the event after TurnStart is pulled, so the caller
+        controls the pace of the game. Every roll yields TurnStart, Rolled,
+        Jumped if the player landed on a moving entity, Moved or Blocked,
+        RankAssigned if the player finished, and ends with ExtraTurn when
+        change_turn left the turn with the player who rolled, TurnPassed
+        otherwise. GameOver is the last event.
+
+        Yields:
+        - TurnEvent: The next event of the game.
         """
         while self.can_play():
             curr_player = self.get_next_player()
-            player_input = input(
-                f"Player {self.turn+1}, Press enter to roll the dice")
+            seat = self.turn
+            start = curr_player.get_pos()
+            yield TurnStart(seat, start)
             dice_result = self.dice.roll()
-            print(f'dice_result: {dice_result}')
-            _next_pos = self.board.get_next_pos(
-                curr_player.get_pos() + dice_result)
-            if self.can_move(curr_player, _next_pos):
-                self.move_player(curr_player, _next_pos)
+            landing = start + dice_result
+            yield Rolled(seat, dice_result, landing)
+            next_pos, entity = self.board.resolve(landing)
+            if entity is not None:
+                yield Jumped(seat, landing, next_pos, entity)
+            if self.can_move(curr_player, next_pos):
+                self.move_player(curr_player, next_pos)
+                yield Moved(seat, start, next_pos)
+                if curr_player.get_rank() != -1:
+                    yield RankAssigned(seat, curr_player.get_rank())
+            else:
+                yield Blocked(seat, landing)
             self.change_turn(dice_result)
-            self.print_game_state()
-        self.print_game_result()
+            # the rules live in change_turn (subclasses may change them): the
+            # roll earned another one when the same active player is still to
+            # roll, which a one-player game can only tell from the streak
+            if len(self.players) > 1:
+                again = self.turn == seat and curr_player.get_rank() == -1
+            else:
+                again = curr_player.get_rank() == -1 and 0 < self.consecutive_six < 3
+            if again:
+                yield ExtraTurn(seat, self.consecutive_six)
+            else:
+                yield TurnPassed(seat, self.consecutive_six == 3)
+        yield GameOver(tuple(p.get_rank() for p in self.players))
+
+    def play(self):
+        """
+        Start the game and execute the gameplay logic until a winner is determined.
+        """
+        for event in self.events():
+            if isinstance(event, TurnStart):
+                input(f"Player {event.seat+1}, Press enter to roll the dice")
+            elif isinstance(event, Rolled):
+                print(f'dice_result: {event.dice_result}')
+            elif isinstance(event, Jumped):
+                print(f'{event.entity.desc} at {event.landing}')
+            elif isinstance(event, ExtraTurn):
+                print(f"One more turn for player {event.seat+1} after rolling 6")
+                self.print_game_state()
+            elif isinstance(event, TurnPassed):
+                if event.three_sixes:
+                    print("Changing turn due to 3 consecutive sixes")
+                self.print_game_state()
+            elif isinstance(event, GameOver):
+                self.print_game_result()
 
     def print_game_state(self):
         """Print the state of the game after every turn."""
@@ -337,6 +614,28 @@ class Game:
             print(f'Player: {_p._id+1} , Rank: {_p.get_rank()}')
 
 
+class BoardSetup:
+    """Builds the standard 100 square board of the command-line game."""
+
+    SNAKES = {17: 7, 62: 19, 87: 24, 54: 34, 64: 60, 93: 73, 95: 75, 98: 79}
+    LADDERS = {1: 38, 4: 14, 9: 31, 21: 42, 28: 84, 51: 67, 71: 91, 80: 100}
+
+    @staticmethod
+    def setup():
+        """
+        Create the standard board.
+
+        Returns:
+        - Board: A board of size 100 with the standard snakes and ladders.
+        """
+        board = Board(100)
+        for start, end in BoardSetup.SNAKES.items():
+            board.set_moving_entity(start, Snake(end))
+        for start, end in BoardSetup.LADDERS.items():
+            board.set_moving_entity(start, Ladder(end))
+        return board
+
+
 def sample_run():
     """
     Execute a sample run of the game with predefined board configurations and player settings.